@@ -0,0 +1,236 @@
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from operator import attrgetter
+
+from telebot import TeleBot
+
+import homework
+from checkpoints import open_store
+from homework import CURRENT_ACCOUNT, Account, PollState
+from leases import open_leases
+from log_config import LazyMessage, setup_logging
+from metrics import METRICS_PORT, start_metrics_server
+from outbound import GLOBAL_RATE, OutboundQueue
+from recording import open_recorder
+from retries import RetryPolicy
+from scheduling import PollScheduler
+
+logger = logging.getLogger(__name__)
+
+ACCOUNTS_FILE = os.getenv('ACCOUNTS_FILE', 'accounts.json')
+MAX_WORKERS = int(os.getenv('ACCOUNTS_MAX_WORKERS', 32))
+CONTROL_INTERVAL = 1
+
+ACCOUNTS_FORMAT_ERROR = (
+    'Файл аккаунтов {path} должен содержать список объектов, получен '
+    '{actual_type}.'
+)
+ACCOUNT_KEY_ERROR = 'В аккаунте №{index} отсутствует ключ "{key}".'
+DUPLICATE_NAME_ERROR = (
+    'Имя аккаунта №{index} "{name}" уже занято: имена аккаунтов должны '
+    'быть уникальны.'
+)
+ACCOUNTS_LOADED_LOG = 'Загружено аккаунтов: {count}.'
+ASSIGNED_LOG = 'Назначение аккаунтов: добавлено {added}, убрано {removed}.'
+ACCOUNT_KEYS = ('practicum_token', 'chat_id')
+
+
+def load_accounts(path):
+    """Загрузка пар (токен Практикума, чат Telegram) из JSON-файла.
+
+    Имя аккаунта — ключ его состояния, кэша, аренды и расписания, поэтому
+    повтор имени, в том числе совпадение с номером аккаунта без имени,
+    поднимает ValueError.
+    """
+    with open(path, encoding='utf-8') as file:
+        data = json.load(file)
+    if not isinstance(data, list):
+        raise TypeError(ACCOUNTS_FORMAT_ERROR.format(
+            path=path, actual_type=type(data).__name__
+        ))
+    accounts = []
+    names = set()
+    for index, item in enumerate(data):
+        for key in ACCOUNT_KEYS:
+            if key not in item:
+                raise KeyError(ACCOUNT_KEY_ERROR.format(index=index, key=key))
+        name = item.get('name', str(index))
+        if name in names:
+            raise ValueError(DUPLICATE_NAME_ERROR.format(
+                index=index, name=name
+            ))
+        names.add(name)
+        accounts.append(Account(
+            name=name,
+            practicum_token=item['practicum_token'],
+            chat_id=item['chat_id'],
+        ))
+    return accounts
+
+
+def poll_account(bot, account, state):
+    """Цикл опроса одного аккаунта в контексте этого аккаунта."""
+    token = CURRENT_ACCOUNT.set(account)
+    try:
+        return homework.run_once(bot, state)
+    finally:
+        CURRENT_ACCOUNT.reset(token)
+
+
+def submit_due(executor, scheduler, running, poll, states, limit):
+    """Запуск опросов наступивших аккаунтов на свободные места пула.
+
+    running — словарь выполняемых опросов: future -> аккаунт. Опрос
+    получает состояние аккаунта из states при запуске, поэтому аккаунт
+    можно убрать из states, не дожидаясь конца его опроса.
+    """
+    for account in scheduler.pop_due(limit - len(running)):
+        future = executor.submit(poll, account, states[account])
+        running[future] = account
+
+
+def wait_timeout(scheduler, running, limit, cap=None):
+    """Сколько ждать завершения опроса до следующего запуска по расписанию.
+
+    None — ждать только завершения: пул занят или все аккаунты опрашиваются.
+    cap — предельное ожидание, например для проверки новых назначений.
+    """
+    due = scheduler.next_due()
+    timeout = None
+    if len(running) < limit and due is not None:
+        timeout = max(0, due - scheduler.clock())
+    if cap is not None and (timeout is None or timeout > cap):
+        return cap
+    return timeout
+
+
+def assign(scheduler, states, accounts, store=None):
+    """Переход к новому списку аккаунтов процесса.
+
+    Ушедшие аккаунты убираются из расписания, новые получают состояние и
+    распределяются по периоду; остальные продолжают опрос как были.
+    """
+    timestamp = int(time.time())
+    kept = set(accounts)
+    removed = [account for account in states if account not in kept]
+    for account in removed:
+        scheduler.discard(account)
+        del states[account]
+    added = [account for account in accounts if account not in states]
+    for account in added:
+        states[account] = PollState(timestamp, key=account.name, store=store)
+    scheduler.spread(added)
+    logger.info(LazyMessage(
+        ASSIGNED_LOG, added=len(added), removed=len(removed)
+    ))
+
+
+def collect_done(scheduler, running, timeout):
+    """Ожидание первого завершённого опроса не дольше timeout секунд.
+
+    Завершённые аккаунты сразу переносятся на свои паузы, не дожидаясь
+    остальных опросов.
+    """
+    if not running:
+        time.sleep(timeout)
+        return
+    done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+    for future in done:
+        scheduler.reschedule(running.pop(future), future.result())
+
+
+def run_accounts(bot, accounts, max_workers=MAX_WORKERS, assignments=None):
+    """Опрос всех аккаунтов из одного процесса.
+
+    Первые опросы распределяются по RETRY_PERIOD, дальше каждый аккаунт
+    опрашивается со своим адаптивным интервалом. Каждый аккаунт
+    запускается в пуле отдельно, как только наступило его время и
+    освободилось место, поэтому медленный аккаунт не задерживает
+    остальные. Раз в RETRY_PERIOD в журнал пишется сводка дрейфа
+    расписания и пика одновременных опросов.
+
+    assignments — функция без аргументов, которая возвращает новый
+    список аккаунтов процесса или None, если он не менялся. Она
+    вызывается не реже раза в CONTROL_INTERVAL секунд, и процесс с ней
+    работает, даже когда аккаунтов не осталось.
+    """
+    store = open_store()
+    states = {}
+    scheduler = PollScheduler(
+        homework.RETRY_PERIOD, key=attrgetter('name')
+    )
+    assign(scheduler, states, accounts, store)
+    cap = None if assignments is None else CONTROL_INTERVAL
+    report_at = time.monotonic() + homework.RETRY_PERIOD
+    running = {}
+    poll = partial(poll_account, bot)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while len(scheduler) or assignments is not None:
+            submit_due(
+                executor, scheduler, running, poll, states, max_workers
+            )
+            collect_done(
+                scheduler, running,
+                wait_timeout(scheduler, running, max_workers, cap)
+            )
+            update = assignments and assignments()
+            if update is not None:
+                assign(scheduler, states, update, store)
+            if time.monotonic() >= report_at:
+                logger.info(scheduler.report())
+                report_at += homework.RETRY_PERIOD
+
+
+def serve(
+    accounts, global_rate=GLOBAL_RATE, metrics_port=METRICS_PORT,
+    assignments=None
+):
+    """Опрос аккаунтов с очередью отправки, пулом соединений и метриками.
+
+    assignments — функция без аргументов, которая возвращает новые
+    аккаунты процесса и его лимит Telegram или None без изменений.
+    """
+    homework.configure_telegram_api()
+    bot = OutboundQueue(
+        TeleBot(token=homework.TELEGRAM_TOKEN), global_rate=global_rate
+    ).start()
+    homework.setup_session(max(homework.HTTP_POOL_SIZE, MAX_WORKERS))
+    homework.API_RETRY = RetryPolicy()
+    homework.LEASES = open_leases()
+    homework.RECORDER = open_recorder()
+    start_metrics_server(port=metrics_port)
+    updates = None
+    if assignments is not None:
+        def updates():
+            update = assignments()
+            if update is None:
+                return None
+            items, rate = update
+            bot.set_global_rate(rate)
+            return items
+    run_accounts(bot, accounts, assignments=updates)
+
+
+def main():
+    """Запуск опроса аккаунтов из файла конфигурации."""
+    if not homework.TELEGRAM_TOKEN:
+        logger.critical(LazyMessage(
+            homework.CRITICAL_MISSING_TOKENS,
+            missing_tokens=['TELEGRAM_TOKEN']
+        ))
+        return
+    path = sys.argv[1] if len(sys.argv) > 1 else ACCOUNTS_FILE
+    accounts = load_accounts(path)
+    logger.info(LazyMessage(ACCOUNTS_LOADED_LOG, count=len(accounts)))
+    serve(accounts)
+
+
+if __name__ == '__main__':
+    setup_logging(CURRENT_ACCOUNT)
+
+    main()
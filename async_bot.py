@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import sys
+import time
+from http import HTTPStatus
+
+import aiohttp
+from telebot import asyncio_helper
+from telebot.async_telebot import AsyncTeleBot
+
+import homework
+from accounts import ACCOUNTS_FILE, load_accounts
+from checkpoints import open_store
+from circuit_breaker import CircuitOpenError
+from deadlines import (API_STAGE, SEND_STAGE, deadline_scope, overrun,
+                       socket_timeout)
+from homework import (CURRENT_ACCOUNT, NO_NEW_HOMEWORK_LOG, PollState,
+                      build_messages, check_response, get_account_key,
+                      get_chat_id, get_headers, log_changes)
+from leases import open_leases
+from log_config import LazyMessage, setup_logging
+from metrics import (API_REQUEST_SECONDS, LAST_POLL, LOOP_ITERATION_SECONDS,
+                     SEND_MESSAGE_SECONDS, start_metrics_server, timed)
+from outbound import (CHAT_RATE, GLOBAL_RATE, MAX_SEND_ATTEMPTS, TokenBucket,
+                      get_retry_after)
+from records import Homework
+from response_cache import ResponseCache
+from retries import RETRY_STATUSES, RetryPolicy, TransientError
+from scheduling import spread_offsets
+from validation import loads
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRateLimiter:
+    """Общий лимит Telegram и лимит на чат для корутин."""
+
+    def __init__(self, global_rate=GLOBAL_RATE, chat_rate=CHAT_RATE):
+        """Лимиты в сообщениях в секунду: общий и на один чат."""
+        self.global_bucket = TokenBucket(global_rate, capacity=global_rate)
+        self.chat_rate = chat_rate
+        self.chat_buckets = {}
+
+    async def wait(self, chat_id):
+        """Ожидание права на отправку сообщения в чат."""
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.chat_rate)
+        now = time.monotonic()
+        at = max(bucket.reserve(now), self.global_bucket.reserve(now))
+        if at > now:
+            await asyncio.sleep(at - now)
+
+
+def create_client_session(pool_size=homework.HTTP_POOL_SIZE):
+    """Сессия aiohttp с пулом соединений и таймаутами."""
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=pool_size),
+        timeout=aiohttp.ClientTimeout(
+            sock_connect=homework.CONNECT_TIMEOUT,
+            sock_read=homework.READ_TIMEOUT,
+        ),
+    )
+
+
+@timed(API_REQUEST_SECONDS)
+async def get_api_answer(session, timestamp):
+    """Асинхронный запрос к API сервиса Практикум Домашка."""
+    params = {'from_date': timestamp}
+    headers = get_headers()
+    request_headers = headers
+    key = get_account_key()
+    cache = homework.RESPONSE_CACHE
+    if cache is not None:
+        request_headers = {**headers, **cache.request_headers(key, params)}
+    return await homework.API_RETRY.call_async(
+        lambda: request_api(session, params, request_headers, headers, key)
+    )
+
+
+async def request_api(session, params, request_headers, headers, key):
+    """Асинхронный аналог homework.request_api: тело ответа API."""
+    timeout = aiohttp.ClientTimeout(
+        sock_connect=socket_timeout(API_STAGE, homework.CONNECT_TIMEOUT),
+        sock_read=socket_timeout(API_STAGE, homework.READ_TIMEOUT),
+    )
+    homework.API_BREAKER.before_call()
+    try:
+        async with session.get(
+            homework.ENDPOINT, headers=request_headers, params=params,
+            timeout=timeout
+        ) as response:
+            homework.API_BREAKER.record_status(response.status)
+            if response.status in RETRY_STATUSES:
+                homework.raise_transient_status(
+                    response.status, response.headers, params
+                )
+            return await read_response(response, key, params)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+        homework.API_BREAKER.record_failure()
+        exceeded = overrun(API_STAGE)
+        if exceeded is not None:
+            raise exceeded from error
+        raise TransientError(homework.REQUEST_EXCEPTION_MESSAGE.format(
+            error=error, params=params, headers=headers,
+            endpoint=homework.ENDPOINT
+        ))
+
+
+async def read_response(response, key, params):
+    """Асинхронный аналог homework.read_response."""
+    cache = homework.RESPONSE_CACHE
+    if cache is not None and response.status == HTTPStatus.NOT_MODIFIED:
+        cached = cache.cached(key, params)
+        if cached is not None:
+            return cached
+
+    if response.status != HTTPStatus.OK:
+        raise ConnectionError(homework.STATUS_CODE_ERROR_MESSAGE.format(
+            status_code=response.status, params=params,
+            headers=get_headers(), endpoint=homework.ENDPOINT
+        ))
+
+    body = await response.read()
+    if cache is None:
+        return loads(body)
+    return cache.parse(key, params, body, response.headers, loads=loads)
+
+
+@timed(SEND_MESSAGE_SECONDS)
+async def send_message(bot, limiter, message):
+    """Асинхронная отправка сообщения в Telegram-чат."""
+    chat_id = get_chat_id()
+    last_error = None
+    for _ in range(MAX_SEND_ATTEMPTS):
+        await limiter.wait(chat_id)
+        try:
+            await bot.send_message(
+                chat_id=chat_id, text=message,
+                timeout=socket_timeout(SEND_STAGE, homework.SEND_TIMEOUT)
+            )
+        except Exception as error:
+            last_error = error
+            retry_after = get_retry_after(error)
+            if retry_after is None:
+                break
+            await asyncio.sleep(retry_after)
+            continue
+        logger.debug(LazyMessage(
+            homework.DEBUG_MESSAGE_SENT, message=message
+        ))
+        return True
+    logger.error(LazyMessage(
+        homework.EXCEPTION_MESSAGE, message=message, error=last_error
+    ))
+    return False
+
+
+@timed(LOOP_ITERATION_SECONDS)
+async def poll_cycle(bot, limiter, session, state):
+    """Асинхронный аналог homework.poll_cycle.
+
+    Аренда и контрольные точки обращаются к SQLite с ожиданием блокировки
+    до BUSY_TIMEOUT, поэтому выполняются в отдельном потоке, а не в цикле
+    событий, общем для всех аккаунтов.
+    """
+    leases = homework.LEASES
+    if leases is not None and not await asyncio.to_thread(
+        state.claim, leases
+    ):
+        logger.debug(LazyMessage(homework.LEASE_BUSY_LOG, key=state.key))
+        return leases.ttl
+    homeworks = None
+    try:
+        with deadline_scope():
+            response = await get_api_answer(session, state.timestamp)
+            homeworks = list(map(
+                Homework.from_dict,
+                state.index.changed(check_response(response))
+            ))
+            LAST_POLL.mark()
+
+            if homeworks:
+                log_changes(homeworks)
+                for message in build_messages(homeworks):
+                    if not await send_message(bot, limiter, message):
+                        break
+                else:
+                    await asyncio.to_thread(
+                        state.advance, response, homeworks
+                    )
+            else:
+                logger.debug(NO_NEW_HOMEWORK_LOG)
+
+    except CircuitOpenError as error:
+        homeworks = None
+        logger.debug(error)
+
+    except Exception as error:
+        homeworks = None
+        message = state.new_error_message(error)
+        if message and await send_message(bot, limiter, message):
+            await asyncio.to_thread(state.error_sent, message)
+    delay = state.interval.next_interval(homeworks)
+    if leases is not None:
+        leases.expect(state.key, delay)
+    return delay
+
+
+async def run_account(bot, limiter, session, account, state, offset=0):
+    """Бесконечный цикл опроса одного аккаунта в отдельной задаче.
+
+    Первый опрос откладывается на offset секунд.
+    """
+    CURRENT_ACCOUNT.set(account)
+    await asyncio.sleep(offset)
+    while True:
+        delay = await poll_cycle(bot, limiter, session, state)
+        await asyncio.sleep(delay)
+
+
+async def main(accounts):
+    """Опрос всех аккаунтов в одном цикле событий."""
+    if homework.TELEGRAM_API_URL:
+        asyncio_helper.API_URL = homework.TELEGRAM_API_URL
+    bot = AsyncTeleBot(token=homework.TELEGRAM_TOKEN)
+    limiter = AsyncRateLimiter()
+    store = open_store()
+    timestamp = int(time.time())
+    offsets = spread_offsets(
+        [account.name for account in accounts], homework.RETRY_PERIOD
+    )
+    async with create_client_session() as session:
+        await asyncio.gather(*(
+            run_account(
+                bot, limiter, session, account,
+                PollState(timestamp, key=account.name, store=store),
+                offsets[account.name]
+            )
+            for account in accounts
+        ))
+
+
+if __name__ == '__main__':
+    setup_logging(CURRENT_ACCOUNT)
+
+    path = sys.argv[1] if len(sys.argv) > 1 else ACCOUNTS_FILE
+    homework.RESPONSE_CACHE = ResponseCache()
+    homework.API_RETRY = RetryPolicy()
+    homework.LEASES = open_leases()
+    start_metrics_server()
+    asyncio.run(main(load_accounts(path)))
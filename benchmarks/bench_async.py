@@ -0,0 +1,114 @@
+"""Один цикл опроса N аккаунтов: пул потоков против asyncio.
+
+Запуск: python -m benchmarks.bench_async [число_аккаунтов] [потоков]
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from operator import attrgetter
+
+import accounts
+import async_bot
+import homework
+from fake_servers import (HOMEWORK_STATUSES_PATH, HomeworkStatusesHandler,
+                          server_url, start_server)
+from scheduling import PollScheduler
+
+REPORT = '{label}: {elapsed:.2f} s, {rate:.0f} опросов/с, пик памяти {peak} КБ'
+
+
+class NullBot:
+    """Бот, который ничего не отправляет."""
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        """Сообщения отбрасываются."""
+
+
+def make_accounts(count):
+    """Синтетические аккаунты."""
+    return [
+        homework.Account(str(index), f'token-{index}', index)
+        for index in range(count)
+    ]
+
+
+def make_states(account_list):
+    """Свежие состояния опроса для аккаунтов."""
+    return {
+        account: homework.PollState(0, key=account.name)
+        for account in account_list
+    }
+
+
+def run_threaded(account_list, workers):
+    """Цикл опроса в пуле потоков с общей сессией requests.
+
+    Опросы запускаются и собираются так же, как в run_accounts; все
+    аккаунты наступают сразу, а цикл заканчивается, когда каждый опрошен
+    и перенесён на следующую паузу.
+    """
+    homework.setup_session(workers)
+    states = make_states(account_list)
+    scheduler = PollScheduler(0, key=attrgetter('name'))
+    scheduler.spread(account_list)
+    poll = partial(accounts.poll_account, NullBot())
+    running = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            accounts.submit_due(
+                executor, scheduler, running, poll, states, workers
+            )
+            if not running:
+                break
+            accounts.collect_done(scheduler, running, None)
+
+
+def run_async(account_list, workers):
+    """Цикл опроса в одном цикле событий."""
+    async def cycle():
+        limiter = async_bot.AsyncRateLimiter()
+        async with async_bot.create_client_session(workers) as session:
+            await asyncio.gather(*(
+                poll(limiter, session, account, state)
+                for account, state in make_states(account_list).items()
+            ))
+
+    async def poll(limiter, session, account, state):
+        homework.CURRENT_ACCOUNT.set(account)
+        await async_bot.poll_cycle(NullBot(), limiter, session, state)
+
+    asyncio.run(cycle())
+
+
+def measure(label, runner, account_list, workers):
+    """Время и пик памяти Python одного цикла опроса."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    runner(account_list, workers)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] // 1024
+    tracemalloc.stop()
+    print(REPORT.format(
+        label=label, elapsed=elapsed, rate=len(account_list) / elapsed,
+        peak=peak
+    ))
+
+
+def main(count=1000, workers=32):
+    """Сравнение потоковой и асинхронной версий."""
+    server = start_server(HomeworkStatusesHandler)
+    homework.ENDPOINT = server_url(server, HOMEWORK_STATUSES_PATH)
+    account_list = make_accounts(count)
+    try:
+        measure('threads', run_threaded, account_list, workers)
+        measure('asyncio', run_async, account_list, workers)
+    finally:
+        homework.HTTP_SESSION = None
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
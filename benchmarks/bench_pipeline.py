@@ -0,0 +1,227 @@
+"""Пропускная способность цикла опроса на локальных заглушках.
+
+Каждый цикл — get_api_answer -> check_response -> parse_status ->
+send_message для одного аккаунта. Заглушки работают в отдельном
+процессе, чтобы не делить с ботом GIL, процессорное время и память.
+Для каждого числа аккаунтов измеряются циклы в секунду, перцентили
+каждого этапа, процессорное время и память процесса. Результаты
+пишутся в JSON, чтобы сравнивать их между коммитами:
+
+    python -m benchmarks.bench_pipeline --output before.json
+    python -m benchmarks.bench_pipeline --compare before.json
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from telebot import TeleBot
+
+import homework
+from benchmarks.bench_async import make_accounts
+from benchmarks.common import percentile
+
+ACCOUNT_COUNTS = (1, 100, 1000, 10000)
+STAGES = ('get_api_answer', 'check_response', 'parse_status', 'send_message')
+PERCENTILES = (0.5, 0.9, 0.99)
+OUTPUT_FILE = 'bench_pipeline.json'
+BENCH_TOKEN = '1234:bench'
+
+LEVEL_REPORT = (
+    '{accounts} аккаунтов: {cycles_per_second:.0f} циклов/с, '
+    'CPU {cpu_seconds:.2f} с, RSS {rss_kb} КБ (пик {peak_rss_kb} КБ)'
+)
+STAGE_REPORT = (
+    '  {stage}: p50={p50:.2f} ms, p90={p90:.2f} ms, p99={p99:.2f} ms'
+)
+COMPARE_REPORT = (
+    '{accounts} аккаунтов: {old:.0f} -> {new:.0f} циклов/с ({change:+.1%})'
+)
+
+
+def current_rss_kb():
+    """Текущий RSS процесса в КБ или None, если /proc недоступен."""
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * resource.getpagesize() // 1024
+
+
+def peak_rss_kb():
+    """Пиковый RSS процесса в КБ (на Linux ru_maxrss уже в КБ)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if platform.system() == 'Darwin':
+        return peak // 1024
+    return peak
+
+
+def git_commit():
+    """Хэш текущего коммита или None вне репозитория."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_stand_ins(homeworks, latency):
+    """Заглушки в дочернем процессе и их адреса из его вывода."""
+    process = subprocess.Popen(
+        [
+            sys.executable, '-u', '-m', 'fake_servers',
+            '--practicum-port', '0', '--telegram-port', '0',
+            '--homeworks', str(homeworks), '--latency', str(latency),
+        ],
+        stdout=subprocess.PIPE, text=True
+    )
+    urls = dict(
+        process.stdout.readline().strip().split('=', 1) for _ in range(2)
+    )
+    return process, urls['PRACTICUM_ENDPOINT'], urls['TELEGRAM_API_URL']
+
+
+def run_cycle(bot, account, samples):
+    """Один цикл опроса аккаунта с замером каждого этапа."""
+    token = homework.CURRENT_ACCOUNT.set(account)
+    try:
+        start = time.perf_counter()
+        response = homework.get_api_answer(0)
+        checked = time.perf_counter()
+        homeworks = homework.check_response(response)
+        parsed = time.perf_counter()
+        messages = [homework.parse_status(item) for item in homeworks]
+        sent = time.perf_counter()
+        for message in messages:
+            homework.send_message(bot, message)
+        done = time.perf_counter()
+    finally:
+        homework.CURRENT_ACCOUNT.reset(token)
+    samples['get_api_answer'].append(checked - start)
+    samples['check_response'].append(parsed - checked)
+    samples['parse_status'].append(sent - parsed)
+    samples['send_message'].append(done - sent)
+
+
+def stage_summary(stage_samples):
+    """Перцентили этапа в миллисекундах."""
+    summary = {
+        f'p{round(fraction * 100)}': percentile(stage_samples, fraction) * 1000
+        for fraction in PERCENTILES
+    }
+    summary['max'] = max(stage_samples, default=0) * 1000
+    return summary
+
+
+def run_level(bot, count, workers):
+    """Один проход по count аккаунтам в пуле из workers потоков."""
+    account_list = make_accounts(count)
+    samples = {stage: [] for stage in STAGES}
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [
+            executor.submit(run_cycle, bot, account, samples)
+            for account in account_list
+        ]:
+            future.result()
+    elapsed = time.perf_counter() - start
+    return {
+        'accounts': count,
+        'workers': workers,
+        'elapsed_seconds': elapsed,
+        'cycles_per_second': count / elapsed,
+        'cpu_seconds': time.process_time() - cpu_start,
+        'rss_kb': current_rss_kb(),
+        'peak_rss_kb': peak_rss_kb(),
+        'stages': {
+            stage: stage_summary(stage_samples)
+            for stage, stage_samples in samples.items()
+        },
+    }
+
+
+def print_level(result):
+    """Отчёт об одном уровне нагрузки."""
+    print(LEVEL_REPORT.format(**result))
+    for stage, summary in result['stages'].items():
+        print(STAGE_REPORT.format(stage=stage, **summary))
+
+
+def compare(previous, results):
+    """Изменение пропускной способности относительно прошлого запуска."""
+    old_rates = {
+        level['accounts']: level['cycles_per_second']
+        for level in previous['results']
+    }
+    for level in results:
+        old = old_rates.get(level['accounts'])
+        if old:
+            new = level['cycles_per_second']
+            print(COMPARE_REPORT.format(
+                accounts=level['accounts'], old=old, new=new,
+                change=new / old - 1
+            ))
+
+
+def parse_args(argv=None):
+    """Параметры бенчмарка из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--accounts', type=int, nargs='+', default=list(ACCOUNT_COUNTS)
+    )
+    parser.add_argument('--workers', type=int, default=homework.HTTP_POOL_SIZE)
+    parser.add_argument('--homeworks', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=0)
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    parser.add_argument('--compare')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Прогон всех уровней нагрузки и запись результатов в JSON."""
+    args = parse_args(argv)
+    previous = None
+    if args.compare:
+        # Файл сравнения читается до записи: он может совпадать с --output.
+        with open(args.compare) as compare_file:
+            previous = json.load(compare_file)
+    stand_ins, homework.ENDPOINT, telegram_url = start_stand_ins(
+        args.homeworks, args.latency
+    )
+    homework.configure_telegram_api(telegram_url)
+    homework.setup_session(args.workers, cache=False)
+    bot = TeleBot(token=BENCH_TOKEN)
+    results = []
+    try:
+        for count in sorted(args.accounts):
+            results.append(run_level(bot, count, args.workers))
+            print_level(results[-1])
+    finally:
+        homework.HTTP_SESSION = None
+        stand_ins.terminate()
+        stand_ins.wait()
+    report = {
+        'benchmark': 'pipeline',
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'created': int(time.time()),
+        'homeworks_per_response': args.homeworks,
+        'latency': args.latency,
+        'results': results,
+    }
+    with open(args.output, 'w') as output:
+        json.dump(report, output, indent=2)
+    if previous is not None:
+        compare(previous, results)
+
+
+if __name__ == '__main__':
+    main()
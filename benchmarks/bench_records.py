@@ -0,0 +1,64 @@
+"""Память под работы: словари из JSON, записи Homework и индекс статусов.
+
+Индекс статусов — то, что бот держит между опросами для каждой работы:
+пару (status, date_updated) с общими строками статусов.
+
+Запуск: python -m benchmarks.bench_records [число_работ]
+"""
+import gc
+import json
+import sys
+import tracemalloc
+
+from benchmarks.common import make_response_body
+from records import Homework
+from status_index import StatusIndex
+
+
+def traced(build):
+    """Объект, который вернула build, и память, которую он удерживает."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def report(label, size, count):
+    """Строка отчёта с общим объёмом и байтами на работу."""
+    return '{label}: {total:.1f} МБ, {per_item:.0f} Б на работу'.format(
+        label=label, total=size / 1024 / 1024, per_item=size / count
+    )
+
+
+def fill_index(homeworks):
+    """Индекс статусов, запомнивший все работы."""
+    index = StatusIndex(capacity=len(homeworks))
+    index.remember(homeworks)
+    return index
+
+
+def main(count=100000):
+    """Сравнение памяти под count работ в трёх представлениях."""
+    body = make_response_body(count)
+    dicts, dicts_size = traced(lambda: json.loads(body)['homeworks'])
+    del dicts
+    records, records_size = traced(lambda: [
+        Homework.from_dict(item) for item in json.loads(body)['homeworks']
+    ])
+    del records
+    index, index_size = traced(
+        lambda: fill_index(json.loads(body)['homeworks'])
+    )
+    print(report('dict', dicts_size, count))
+    print(report('Homework', records_size, count))
+    print(report('StatusIndex', index_size, len(index)))
+    print(f'Homework от dict: {records_size / dicts_size:.0%}')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,33 @@
+"""Задержка get_api_answer с общей keep-alive сессией и без неё.
+
+Запуск: python -m benchmarks.bench_session [число_запросов]
+"""
+import sys
+
+import homework
+from benchmarks.common import format_latency, timed
+from fake_servers import (HOMEWORK_STATUSES_PATH, HomeworkStatusesHandler,
+                          server_url, start_server)
+
+
+def measure(polls):
+    """Задержки последовательных опросов в секундах."""
+    return [timed(homework.get_api_answer, 0) for _ in range(polls)]
+
+
+def main(polls=500):
+    """Сравнение опроса с пулом соединений и без него."""
+    server = start_server(HomeworkStatusesHandler)
+    homework.ENDPOINT = server_url(server, HOMEWORK_STATUSES_PATH)
+    try:
+        homework.HTTP_SESSION = None
+        print(format_latency('requests.get', measure(polls)))
+        homework.setup_session()
+        print(format_latency('pooled session', measure(polls)))
+    finally:
+        homework.HTTP_SESSION = None
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,66 @@
+"""Разбор и проверка большого ответа API.
+
+Сравнивает json и orjson, а также прежнюю проверку в несколько проходов
+(ключи ошибки, check_response, проверки parse_status для каждой работы)
+с однопроходным ResponseValidator.
+
+Запуск: python -m benchmarks.bench_validation [число_работ] [повторы]
+"""
+import json
+import sys
+
+import homework
+import validation
+from benchmarks.common import format_latency, make_response_body, timed
+
+
+def legacy_validate(response):
+    """Проверки в несколько проходов, как до ResponseValidator."""
+    for error_key in ['code', 'error']:
+        if error_key in response:
+            raise ConnectionError(error_key)
+    if not isinstance(response, dict):
+        raise TypeError
+    if 'homeworks' not in response:
+        raise KeyError('homeworks')
+    homeworks = response['homeworks']
+    if not isinstance(homeworks, list):
+        raise TypeError
+    for item in homeworks:
+        if 'homework_name' not in item:
+            raise KeyError('homework_name')
+        if 'status' not in item:
+            raise KeyError('status')
+        if item['status'] not in homework.HOMEWORK_VERDICTS:
+            raise ValueError(item['status'])
+    return homeworks
+
+
+def measure(func, arg, repeats):
+    """Длительности повторных вызовов в секундах."""
+    return [timed(func, arg) for _ in range(repeats)]
+
+
+def main(count=10000, repeats=50):
+    """Сравнение декодеров и проверок на одном теле ответа."""
+    body = make_response_body(count)
+    response = json.loads(body)
+    print(f'Работ: {count}, тело: {len(body) / 1024:.0f} КБ')
+    print(format_latency('json.loads', measure(json.loads, body, repeats)))
+    if validation.orjson is None:
+        print('orjson не установлен')
+    else:
+        print(format_latency(
+            'orjson.loads', measure(validation.orjson.loads, body, repeats)
+        ))
+    print(format_latency(
+        'legacy validation', measure(legacy_validate, response, repeats)
+    ))
+    print(format_latency(
+        'ResponseValidator',
+        measure(homework.RESPONSE_VALIDATOR.validate, response, repeats)
+    ))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
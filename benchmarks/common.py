@@ -0,0 +1,38 @@
+import json
+import time
+
+from fake_servers import make_homeworks
+
+
+def percentile(samples, fraction):
+    """Перцентиль по отсортированной выборке (ближайший ранг)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def timed(func, *args):
+    """Время выполнения вызова в секундах."""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def format_latency(label, samples):
+    """Строка отчёта с p50 и p99 в миллисекундах."""
+    return '{label}: p50={p50:.2f} ms, p99={p99:.2f} ms, n={count}'.format(
+        label=label,
+        p50=percentile(samples, 0.5) * 1000,
+        p99=percentile(samples, 0.99) * 1000,
+        count=len(samples),
+    )
+
+
+def make_response_body(count):
+    """Тело ответа API с count синтетическими работами."""
+    return json.dumps(
+        {'homeworks': make_homeworks(count), 'current_date': 1700000000},
+        ensure_ascii=False
+    ).encode()
@@ -0,0 +1,106 @@
+import logging
+import os
+import sqlite3
+import threading
+
+from log_config import LazyMessage
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DB = os.getenv('CHECKPOINT_DB')
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS checkpoints ('
+    ' account TEXT PRIMARY KEY,'
+    ' timestamp INTEGER NOT NULL,'
+    ' last_error TEXT)',
+    'CREATE TABLE IF NOT EXISTS homework_statuses ('
+    ' account TEXT NOT NULL,'
+    ' homework_id INTEGER NOT NULL,'
+    ' status TEXT NOT NULL,'
+    ' date_updated TEXT,'
+    ' PRIMARY KEY (account, homework_id))',
+)
+RESTORED_LOG = (
+    'Состояние аккаунта {account} восстановлено: timestamp={timestamp}, '
+    'статусов работ — {count}.'
+)
+
+
+class CheckpointStore:
+    """Хранилище состояния опроса в SQLite (режим WAL).
+
+    Для каждого аккаунта хранит последний current_date, отпечаток
+    последней отправленной ошибки и последний известный статус каждой
+    работы.
+    """
+
+    def __init__(self, path):
+        """Хранилище в файле SQLite path."""
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+
+    def restore(self, state):
+        """Заполнение состояния сохранёнными данными аккаунта."""
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT timestamp, last_error FROM checkpoints '
+                'WHERE account = ?', (state.key,)
+            ).fetchone()
+            statuses = self.connection.execute(
+                'SELECT homework_id, status, date_updated '
+                'FROM homework_statuses '
+                'WHERE account = ?', (state.key,)
+            ).fetchall()
+        if row is None:
+            return False
+        state.timestamp, last_error = row
+        state.errors.restore(last_error)
+        for homework_id, status, date_updated in statuses:
+            state.index.put(homework_id, status, date_updated)
+        logger.info(LazyMessage(
+            RESTORED_LOG, account=state.key, timestamp=state.timestamp,
+            count=len(statuses)
+        ))
+        return True
+
+    def save(self, state, homeworks=()):
+        """Атомарная запись состояния после успешной отправки."""
+        statuses = [
+            (
+                state.key, homework['id'], homework['status'],
+                homework.get('date_updated')
+            )
+            for homework in homeworks if 'id' in homework
+        ]
+        with self.lock, self.connection:
+            self.connection.execute(
+                'INSERT INTO checkpoints (account, timestamp, last_error) '
+                'VALUES (?, ?, ?) ON CONFLICT (account) DO UPDATE SET '
+                'timestamp = excluded.timestamp, '
+                'last_error = excluded.last_error',
+                (state.key, state.timestamp, state.errors.fingerprint)
+            )
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO homework_statuses '
+                '(account, homework_id, status, date_updated) '
+                'VALUES (?, ?, ?, ?)',
+                statuses
+            )
+
+    def close(self):
+        """Закрытие соединения с базой."""
+        with self.lock:
+            self.connection.close()
+
+
+def open_store(path=CHECKPOINT_DB):
+    """Хранилище по пути из CHECKPOINT_DB или None, если оно отключено."""
+    if not path:
+        return None
+    return CheckpointStore(path)
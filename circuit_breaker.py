@@ -0,0 +1,114 @@
+import logging
+import os
+import threading
+import time
+from http import HTTPStatus
+
+from log_config import LazyMessage
+from metrics import CIRCUIT_TRANSITIONS
+
+logger = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 5))
+RESET_TIMEOUT = float(os.getenv('BREAKER_RESET_TIMEOUT', 60))
+
+CLOSED = 'closed'
+HALF_OPEN = 'half_open'
+OPEN = 'open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+STATE_CHANGE_LOG = 'Предохранитель {name}: {old} -> {new}.'
+CIRCUIT_OPEN_MESSAGE = (
+    'Предохранитель {name} разомкнут, запрос пропущен.'
+)
+
+
+class CircuitOpenError(ConnectionError):
+    """Запрос не выполнялся: предохранитель разомкнут."""
+
+
+class CircuitBreaker:
+    """Предохранитель, общий для всех аккаунтов.
+
+    После failure_threshold сбоев подряд размыкается и отклоняет запросы.
+    Через reset_timeout пропускает один пробный запрос: успех замыкает
+    предохранитель, сбой снова размыкает. Если проба не завершилась за
+    reset_timeout, разрешается следующая.
+    """
+
+    def __init__(
+        self, name, failure_threshold=FAILURE_THRESHOLD,
+        reset_timeout=RESET_TIMEOUT, clock=time.monotonic
+    ):
+        """Замкнутый предохранитель с именем name для журнала и метрик."""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started = None
+
+    def _set_state(self, state):
+        if state == self.state:
+            return
+        logger.warning(LazyMessage(
+            STATE_CHANGE_LOG, name=self.name, old=self.state, new=state
+        ))
+        CIRCUIT_TRANSITIONS.inc(self.name, state)
+        self.state = state
+
+    def before_call(self):
+        """Разрешение запроса; CircuitOpenError, если он запрещён."""
+        if self.state == CLOSED:
+            return
+        with self.lock:
+            now = self.clock()
+            if self.state == OPEN:
+                if now - self.opened_at < self.reset_timeout:
+                    raise CircuitOpenError(
+                        CIRCUIT_OPEN_MESSAGE.format(name=self.name)
+                    )
+                self._set_state(HALF_OPEN)
+            elif self.state == HALF_OPEN and (
+                now - self.probe_started < self.reset_timeout
+            ):
+                raise CircuitOpenError(
+                    CIRCUIT_OPEN_MESSAGE.format(name=self.name)
+                )
+            self.probe_started = now
+
+    def record_success(self):
+        """Успешный ответ сервиса."""
+        if self.state == CLOSED and not self.failures:
+            return
+        with self.lock:
+            self.failures = 0
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        """Сбой сервиса."""
+        with self.lock:
+            self.failures += 1
+            if (
+                self.state == HALF_OPEN
+                or self.failures >= self.failure_threshold
+            ):
+                self.opened_at = self.clock()
+                self._set_state(OPEN)
+
+    def record_status(self, status_code):
+        """Учёт HTTP-статуса: 5xx и 429 — сбой сервиса, прочие — успех."""
+        if (
+            status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+            or status_code == HTTPStatus.TOO_MANY_REQUESTS
+        ):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def state_value(self):
+        """Состояние числом для метрик: 0 — замкнут, 2 — разомкнут."""
+        return STATE_VALUES[self.state]
@@ -0,0 +1,94 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from metrics import DEADLINE_EXCEEDED
+
+LOOP_DEADLINE = float(os.getenv('LOOP_DEADLINE', 60))
+API_DEADLINE_SHARE = float(os.getenv('API_DEADLINE_SHARE', 0.5))
+API_STAGE = 'api'
+SEND_STAGE = 'send'
+STAGE_SHARES = {API_STAGE: API_DEADLINE_SHARE, SEND_STAGE: 1}
+
+DEADLINE_EXCEEDED_MESSAGE = (
+    'Превышен бюджет времени цикла опроса на этапе {stage}: '
+    '{limit:.1f} с из {budget:.1f} с.'
+)
+
+CURRENT_DEADLINE = ContextVar('current_deadline', default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Этап цикла опроса не уложился в свою часть бюджета времени."""
+
+
+class Deadline:
+    """Бюджет времени одной итерации цикла опроса.
+
+    Бюджет делится между этапами: запрос к API вместе с повторами должен
+    завершиться в первые API_DEADLINE_SHARE бюджета, отправка сообщений —
+    до конца бюджета. Остаток времени этапа передаётся в запросы как
+    таймаут сокета. Таймаут чтения в requests ограничивает ожидание
+    каждого блока данных, а не всего ответа, поэтому бюджет — граница
+    для каждого ожидания, а не жёсткий предел длительности.
+    """
+
+    def __init__(self, budget=LOOP_DEADLINE, clock=time.monotonic):
+        """Бюджет budget секунд, отсчитываемый от текущего момента clock."""
+        self.budget = budget
+        self.clock = clock
+        self.started = clock()
+
+    def remaining(self, stage):
+        """Секунды до конца части бюджета этапа stage."""
+        limit = self.budget * STAGE_SHARES[stage]
+        return self.started + limit - self.clock()
+
+    def exceeded(self, stage):
+        """Исключение о превышении бюджета с учётом в метрике."""
+        DEADLINE_EXCEEDED.inc(stage)
+        return DeadlineExceeded(DEADLINE_EXCEEDED_MESSAGE.format(
+            stage=stage, limit=self.budget * STAGE_SHARES[stage],
+            budget=self.budget
+        ))
+
+    def timeout(self, stage, limit):
+        """Таймаут сокета для этапа: не больше limit и остатка бюджета.
+
+        Если часть бюджета этапа исчерпана, поднимает DeadlineExceeded.
+        """
+        remaining = self.remaining(stage)
+        if remaining <= 0:
+            raise self.exceeded(stage)
+        return min(limit, remaining)
+
+
+@contextmanager
+def deadline_scope(budget=LOOP_DEADLINE, clock=time.monotonic):
+    """Бюджет времени для вызовов внутри блока with."""
+    token = CURRENT_DEADLINE.set(Deadline(budget, clock))
+    try:
+        yield CURRENT_DEADLINE.get()
+    finally:
+        CURRENT_DEADLINE.reset(token)
+
+
+def socket_timeout(stage, limit):
+    """Таймаут сокета по текущему бюджету или limit вне бюджета."""
+    deadline = CURRENT_DEADLINE.get()
+    if deadline is None:
+        return limit
+    return deadline.timeout(stage, limit)
+
+
+def overrun(stage):
+    """DeadlineExceeded, если часть бюджета этапа исчерпана, иначе None.
+
+    Вызывается после ошибки сокета, чтобы отличить исчерпанный бюджет
+    от обычного сбоя сети.
+    """
+    deadline = CURRENT_DEADLINE.get()
+    if deadline is None or deadline.remaining(stage) > 0:
+        return None
+    return deadline.exceeded(stage)
@@ -0,0 +1,92 @@
+import hashlib
+import os
+import re
+import time
+
+ERROR_DEDUP_WINDOW = float(os.getenv('ERROR_DEDUP_WINDOW', 60 * 60))
+ERROR_DEDUP_SIZE = 16
+REPEATED_ERROR_MESSAGE = (
+    '{message} Ошибка повторилась {count} раз за {minutes} мин.'
+)
+
+# Подставляемые в шаблоны ошибок значения: словари параметров и
+# заголовков, адреса объектов, числа (порты, статусы, временные метки).
+VOLATILE_PARTS = (
+    (re.compile(r'\{[^{}]*\}'), '{}'),
+    (re.compile(r'0x[0-9a-fA-F]+'), '0x'),
+    (re.compile(r'\d+'), '0'),
+)
+
+
+def fingerprint(error):
+    """Отпечаток ошибки: тип исключения и текст без изменчивых значений."""
+    text = str(error)
+    for pattern, replacement in VOLATILE_PARTS:
+        text = pattern.sub(replacement, text)
+    return hashlib.blake2b(
+        f'{type(error).__name__}:{text}'.encode(), digest_size=8
+    ).hexdigest()
+
+
+class ErrorDeduplicator:
+    """Подавление повторных уведомлений об одних и тех же ошибках.
+
+    Ошибка с тем же отпечатком, что и одна из недавно отправленных, не
+    отправляется, пока не пройдёт window секунд с её отправки. После этого
+    вместо очередного уведомления отправляется сводка с числом повторов.
+    Отпечатки хранятся для нескольких ошибок сразу (не больше
+    ERROR_DEDUP_SIZE), поэтому чередующиеся во время сбоя ошибки, например
+    таймаут и ответы 502 и 503, тоже подавляются.
+    """
+
+    def __init__(self, window=ERROR_DEDUP_WINDOW, clock=time.time):
+        """Окно подавления window в секундах, clock — источник времени."""
+        self.window = window
+        self.clock = clock
+        self.fingerprint = None
+        self.recent = {}
+        self.pending = None
+
+    def restore(self, fingerprint):
+        """Отпечаток ошибки, отправленной до перезапуска."""
+        self.fingerprint = fingerprint
+        self.recent = {fingerprint: [self.clock(), 0]} if fingerprint else {}
+
+    def message(self, error, text):
+        """Текст уведомления об ошибке или None, если его нужно подавить."""
+        key = fingerprint(error)
+        now = self.clock()
+        self.pending = key
+        entry = self.recent.get(key)
+        if entry is None:
+            return text
+        sent_at, repeats = entry
+        if now - sent_at < self.window:
+            entry[1] += 1
+            self.pending = None
+            return None
+        if not repeats:
+            return text
+        return REPEATED_ERROR_MESSAGE.format(
+            message=text, count=repeats + 1,
+            minutes=round((now - sent_at) / 60)
+        )
+
+    def sent(self):
+        """Отметка об отправке последнего возвращённого уведомления."""
+        if self.pending is None:
+            return
+        now = self.clock()
+        self.fingerprint = self.pending
+        self.recent[self.pending] = [now, 0]
+        self.pending = None
+        self._prune(now)
+
+    def _prune(self, now):
+        # Ошибки без повторов после окна снова отправились бы сразу,
+        # поэтому их отпечатки больше не нужны.
+        for key, (sent_at, repeats) in list(self.recent.items()):
+            if not repeats and now - sent_at >= self.window:
+                del self.recent[key]
+        while len(self.recent) > ERROR_DEDUP_SIZE:
+            del self.recent[min(self.recent, key=lambda key: self.recent[key])]
@@ -0,0 +1,279 @@
+"""Локальные заглушки API Практикума и Telegram Bot API.
+
+Запуск обеих заглушек для нагрузочной проверки без сети:
+
+    python fake_servers.py --latency 0.05 --error-rate 0.01 --homeworks 5
+
+Скрипт печатает переменные окружения, которые направляют бота на них.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+HOMEWORK_STATUSES_PATH = '/api/user_api/homework_statuses/'
+TELEGRAM_API_PATH = '/bot{0}/{1}'
+STATUSES = ('approved', 'reviewing', 'rejected')
+SERVERS_LOG = (
+    'PRACTICUM_ENDPOINT={practicum}\n'
+    'TELEGRAM_API_URL={telegram}'
+)
+
+
+def make_homeworks(count):
+    """Синтетические работы (count штук) с полями, как в ответе API."""
+    return [
+        {
+            'id': index,
+            'status': STATUSES[index % len(STATUSES)],
+            'homework_name': f'student__hw{index}.zip',
+            'reviewer_comment': 'Отличная работа!' * 3,
+            'date_updated': '2024-01-01T00:00:00Z',
+            'lesson_name': f'Урок {index % 20}',
+        }
+        for index in range(count)
+    ]
+
+
+class Stats:
+    """Счётчики запросов заглушки и принятые сообщения."""
+
+    def __init__(self):
+        """Нулевые счётчики и пустой список сообщений."""
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.messages = []
+
+    def count(self, field):
+        """Увеличение счётчика field."""
+        with self.lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Общая часть заглушек: задержка, ошибки 500 и ответы 429.
+
+    latency — задержка каждого ответа в секундах, error_rate и
+    throttle_rate — доли ответов 500 и 429, retry_after — пауза,
+    которую заглушка просит выдержать после 429.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    latency = 0
+    error_rate = 0
+    throttle_rate = 0
+    retry_after = 1
+    random = random.Random(0)
+    stats = Stats()
+
+    def send_json(self, status, data, headers=()):
+        """Ответ с JSON-телом."""
+        body = json.dumps(data, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def misbehave(self):
+        """Задержка и, с заданной вероятностью, ответ 500 или 429."""
+        self.stats.count('requests')
+        if self.latency:
+            time.sleep(self.latency)
+        roll = self.random.random()
+        if roll < self.error_rate:
+            self.stats.count('errors')
+            self.send_error_response(HTTPStatus.INTERNAL_SERVER_ERROR)
+            return True
+        if roll < self.error_rate + self.throttle_rate:
+            self.stats.count('throttled')
+            self.send_error_response(HTTPStatus.TOO_MANY_REQUESTS)
+            return True
+        return False
+
+    def send_error_response(self, status):
+        """Ответ с ошибкой в формате конкретного API."""
+        self.send_json(status, {'error': status.phrase})
+
+    def log_message(self, format, *args):
+        """Заглушка не пишет журнал запросов."""
+
+
+class HomeworkStatusesHandler(StandInHandler):
+    """Заглушка эндпоинта homework_statuses API Практикума.
+
+    Если задан etag, ответ содержит ETag, а запрос с совпадающим
+    If-None-Match получает 304. Если задан current_date, тело ответа
+    не меняется между запросами. homeworks — число работ в ответе.
+    """
+
+    etag = None
+    current_date = None
+    homeworks = 0
+
+    def do_GET(self):
+        """Ответ со статусами домашних работ."""
+        if self.misbehave():
+            return
+        if self.etag and self.headers.get('If-None-Match') == self.etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', self.etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        headers = [('ETag', self.etag)] if self.etag else []
+        self.send_json(HTTPStatus.OK, {
+            'homeworks': make_homeworks(self.homeworks),
+            'current_date': self.current_date or int(time.time()),
+        }, headers)
+
+    def send_error_response(self, status):
+        """Ошибка с заголовком Retry-After для 429."""
+        headers = []
+        if status == HTTPStatus.TOO_MANY_REQUESTS:
+            headers.append(('Retry-After', str(self.retry_after)))
+        self.send_json(status, {'error': status.phrase}, headers)
+
+
+class TelegramHandler(StandInHandler):
+    """Заглушка Telegram Bot API: метод sendMessage.
+
+    Принятые сообщения сохраняются в stats.messages как (chat_id, text).
+    Ответ 429 повторяет формат Telegram с parameters.retry_after.
+    """
+
+    def _params(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            body = self.rfile.read(length).decode()
+            if self.headers.get('Content-Type', '').startswith(
+                'application/json'
+            ):
+                params.update(json.loads(body))
+            else:
+                params.update(parse_qsl(body))
+        return url.path.rsplit('/', 1)[-1], params
+
+    def do_POST(self):
+        """Ответ на вызов метода Bot API."""
+        method, params = self._params()
+        if self.misbehave():
+            return
+        if method == 'getMe':
+            self.send_json(HTTPStatus.OK, {'ok': True, 'result': {
+                'id': 1, 'is_bot': True, 'first_name': 'stand-in',
+                'username': 'stand_in_bot',
+            }})
+            return
+        if method != 'sendMessage':
+            self.send_json(HTTPStatus.NOT_FOUND, {
+                'ok': False, 'error_code': HTTPStatus.NOT_FOUND,
+                'description': 'Not Found: method not found',
+            })
+            return
+        with self.stats.lock:
+            self.stats.messages.append((params['chat_id'], params['text']))
+            message_id = len(self.stats.messages)
+        self.send_json(HTTPStatus.OK, {'ok': True, 'result': {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': int(params['chat_id']), 'type': 'private'},
+            'text': params['text'],
+        }})
+
+    do_GET = do_POST
+
+    def send_error_response(self, status):
+        """Ошибка в формате Telegram Bot API."""
+        data = {
+            'ok': False, 'error_code': status.value,
+            'description': status.phrase,
+        }
+        if status == HTTPStatus.TOO_MANY_REQUESTS:
+            data['description'] = (
+                f'Too Many Requests: retry after {self.retry_after}'
+            )
+            data['parameters'] = {'retry_after': self.retry_after}
+        self.send_json(status, data)
+
+
+def configured(handler_class, seed=0, **attributes):
+    """Подкласс заглушки с заданными параметрами и своими счётчиками."""
+    attributes.update(random=random.Random(seed), stats=Stats())
+    return type(handler_class.__name__, (handler_class,), attributes)
+
+
+def start_server(handler_class, host='127.0.0.1', port=0):
+    """Запуск сервера-заглушки в фоновом потоке."""
+    server = ThreadingHTTPServer((host, port), handler_class)
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={'poll_interval': 0.05},
+        daemon=True
+    )
+    thread.start()
+    return server
+
+
+def server_url(server, path=''):
+    """Адрес запущенного сервера-заглушки."""
+    host, port = server.server_address[:2]
+    return f'http://{host}:{port}{path}'
+
+
+def parse_args(argv=None):
+    """Параметры заглушек из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--practicum-port', type=int, default=8080)
+    parser.add_argument('--telegram-port', type=int, default=8081)
+    parser.add_argument('--latency', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--throttle-rate', type=float, default=0)
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--homeworks', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Запуск обеих заглушек до прерывания."""
+    args = parse_args(argv)
+    options = dict(
+        latency=args.latency, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+        seed=args.seed
+    )
+    practicum = start_server(
+        configured(HomeworkStatusesHandler, homeworks=args.homeworks,
+                   **options),
+        args.host, args.practicum_port
+    )
+    telegram = start_server(
+        configured(TelegramHandler, **options), args.host, args.telegram_port
+    )
+    print(SERVERS_LOG.format(
+        practicum=server_url(practicum, HOMEWORK_STATUSES_PATH),
+        telegram=server_url(telegram, TELEGRAM_API_PATH)
+    ))
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        practicum.shutdown()
+        telegram.shutdown()
+
+
+if __name__ == '__main__':
+    main()
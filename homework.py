@@ -1,12 +1,40 @@
 import logging
 import os
+import sqlite3
 import time
+from collections import namedtuple
+from concurrent.futures import CancelledError, Future
+from contextvars import ContextVar
+from functools import partial
 from http import HTTPStatus
+from itertools import groupby
 
 import requests
-from telebot import TeleBot
+from requests.adapters import HTTPAdapter
+from telebot import TeleBot, apihelper
 from dotenv import load_dotenv
 
+from checkpoints import open_store
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from deadlines import (API_STAGE, CURRENT_DEADLINE, SEND_STAGE, Deadline,
+                       DeadlineExceeded, deadline_scope, overrun,
+                       socket_timeout)
+from error_dedup import ErrorDeduplicator
+from leases import open_leases
+from log_config import LazyMessage, setup_logging
+from metrics import (API_REQUEST_SECONDS, LAST_POLL, LOOP_ITERATION_SECONDS,
+                     SEND_MESSAGE_SECONDS, VALIDATION_ERRORS, CounterFunction,
+                     Gauge, count_errors, start_metrics_server, timed)
+from outbound import OutboundQueue
+from recording import open_recorder
+from records import Homework
+from response_cache import ResponseCache
+from retries import (RETRY_STATUSES, RetryPolicy, TransientError,
+                     parse_retry_after)
+from scheduling import AdaptiveInterval
+from status_index import INDEX_TOTALS, StatusIndex
+from validation import ResponseValidator, loads
+
 
 load_dotenv()
 
@@ -19,8 +47,43 @@ logger = logging.getLogger(__name__)
 
 ERROR_NOTIFIED = False
 RETRY_PERIOD = 600
-ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+ENDPOINT = os.getenv(
+    'PRACTICUM_ENDPOINT',
+    'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+)
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL')
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
+CONNECT_TIMEOUT = float(os.getenv('CONNECT_TIMEOUT', 5))
+READ_TIMEOUT = float(os.getenv('READ_TIMEOUT', 30))
+SEND_TIMEOUT = float(os.getenv('SEND_TIMEOUT', 30))
+HTTP_SESSION = None
+RESPONSE_CACHE = None
+API_BREAKER = CircuitBreaker('practicum_api')
+API_CIRCUIT_STATE = Gauge(
+    'homework_bot_api_circuit_state',
+    'Предохранитель API: 0 — замкнут, 1 — проба, 2 — разомкнут.',
+    API_BREAKER.state_value
+)
+RESPONSE_CACHE_COUNTERS = {
+    'not_modified': 'Ответы API 304, отданные из кэша.',
+    'unchanged': 'Ответы API с тем же телом, разбор JSON пропущен.',
+    'misses': 'Ответы API, тело которых разобрано заново.',
+    'bytes_saved': 'Байты, которые API не передал благодаря ответам 304.',
+}
+STATUS_INDEX_COUNTERS = {
+    'hits': 'Работы, отброшенные индексом статусов как неизменившиеся.',
+    'misses': (
+        'Работы, пропущенные индексом статусов как новые или изменившиеся.'
+    ),
+}
+API_RETRY = RetryPolicy(attempts=1)
+LEASES = None
+RECORDER = None
+SEND_THROUGH_QUEUE = False
+
+
+TELEGRAM_MESSAGE_LIMIT = 4096
 
 
 HOMEWORK_VERDICTS = {
@@ -28,6 +91,7 @@ HOMEWORK_VERDICTS = {
     'reviewing': 'Работа взята на проверку ревьюером.',
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
+RESPONSE_VALIDATOR = ResponseValidator(HOMEWORK_VERDICTS)
 
 ERROR_MISSING_NAME = 'Отсутствует ключ "homework_name".'
 ERROR_MISSING_STATUS = 'Отсутствует ключ "status".'
@@ -50,22 +114,157 @@ STATUS_CODE_ERROR_MESSAGE = (
     'API вернул статус: {status_code}. '
     'Параметры запроса: {params}, заголовки: {headers}, эндпоинт: {endpoint}'
 )
-API_RESPONSE_ERROR_MESSAGE = (
-    'Ошибка в ответе API: ключ — {error_key}, значение — {error_value}. '
-    'Параметры запроса: {params}, заголовки: {headers}, эндпоинт: {endpoint}'
-)
-API_RESPONSE_TYPE_ERROR = 'Ответ API должен быть словарём, а не {actual_type}.'
-API_RESPONSE_KEY_ERROR = 'Отсутствуют ожидаемые ключи в ответе API.'
-API_HOMEWORKS_TYPE_ERROR = (
-    'Неверный формат данных в ответе API: '
-    'ожидается список, получен {actual_type}.'
-)
 API_SUCCESS_LOG = 'Ответ API успешно проверен. Данные корректны.'
 EXIT_MESSAGE = 'Программа остановлена из-за отсутствия переменных окружения.'
 NO_NEW_HOMEWORK_LOG = 'Отсутствуют новые статусы домашних заданий.'
+HOMEWORK_CHANGED_LOG = 'Новый статус домашней работы: {status}.'
+LEASE_BUSY_LOG = 'Аккаунт {key} опрашивает другой экземпляр бота.'
+DELIVERY_PENDING_LOG = (
+    'Сообщения аккаунта {key} ещё в очереди отправки: цикл отложен.'
+)
+LEASE_ERROR_LOG = 'Не удалось проверить аренду аккаунта {key}: {error}'
+CHECKPOINT_ERROR_LOG = 'Не удалось сохранить состояние аккаунта {key}: {error}'
 ERROR_MESSAGE = 'Сбой в работе программы: {error}.'
 TOKEN_NAMES = ['PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID']
 
+Account = namedtuple('Account', ('name', 'practicum_token', 'chat_id'))
+CURRENT_ACCOUNT = ContextVar('current_account', default=None)
+
+
+DEFAULT_ACCOUNT_KEY = 'default'
+
+
+class PollState:
+    """Состояние цикла опроса одного аккаунта.
+
+    Если передано хранилище, состояние восстанавливается из него при
+    создании и сохраняется после каждой успешной отправки. clock —
+    источник времени с методами time и sleep: модуль time или
+    виртуальные часы симуляции.
+    """
+
+    def __init__(
+        self, timestamp, key=DEFAULT_ACCOUNT_KEY, store=None, clock=time
+    ):
+        """Состояние с отметкой времени timestamp для аккаунта key."""
+        self.timestamp = timestamp
+        self.clock = clock
+        self.next_poll_at = None
+        self.errors = ErrorDeduplicator(clock=clock.time)
+        self.index = StatusIndex()
+        self.interval = AdaptiveInterval(base=RETRY_PERIOD)
+        self.key = key
+        self.store = store
+        self.pending = None
+        if store is not None:
+            store.restore(self)
+
+    def checkpoint(self, homeworks=()):
+        """Сохранение состояния в хранилище, если оно подключено.
+
+        Ошибка базы только журналируется: состояние в памяти уже новое и
+        будет сохранено следующей контрольной точкой.
+        """
+        self.index.remember(homeworks)
+        if self.store is not None:
+            try:
+                self.store.save(self, homeworks)
+            except sqlite3.Error as error:
+                logger.error(LazyMessage(
+                    CHECKPOINT_ERROR_LOG, key=self.key, error=error
+                ))
+
+    def claim(self, leases):
+        """Аренда аккаунта; при её получении состояние перечитывается.
+
+        Прежний владелец мог отправить уведомления, о которых этот
+        экземпляр ещё не знает. Ошибка базы (например, «database is
+        locked» после BUSY_TIMEOUT) считается неполученной арендой.
+        """
+        was_held = leases.holds(self.key)
+        try:
+            if not leases.acquire(self.key):
+                return False
+            if not was_held and self.store is not None:
+                self.store.restore(self)
+        except sqlite3.Error as error:
+            leases.forget(self.key)
+            logger.error(LazyMessage(
+                LEASE_ERROR_LOG, key=self.key, error=error
+            ))
+            return False
+        return True
+
+    def defer(self, deliveries, on_delivered, deadline):
+        """Отложенный учёт отправки до доставки сообщений из очереди.
+
+        Доставка ждётся не дольше части бюджета deadline для отправки.
+        """
+        self.pending = (deliveries, on_delivered, deadline)
+
+    def settle(self):
+        """Учёт доставки сообщений, поставленных в очередь прошлым циклом.
+
+        Если все они доставлены, вызывается отложенный учёт отправки;
+        если хоть одно не доставлено, учёта нет, и сообщения уйдут снова.
+        Если бюджет отправки вышел, а доставка не завершилась (например,
+        поток-отправитель остановился), недоставленные сообщения
+        отменяются и считаются неотправленными. Возвращает False, пока
+        доставка не завершилась и бюджет не вышел.
+        """
+        if self.pending is None:
+            return True
+        deliveries, on_delivered, deadline = self.pending
+        if not all(delivery.done() for delivery in deliveries):
+            if deadline.remaining(SEND_STAGE) > 0:
+                return False
+            for delivery in deliveries:
+                delivery.cancel()
+            logger.error(deadline.exceeded(SEND_STAGE))
+            self.pending = None
+            return True
+        self.pending = None
+        if not any(map(delivery_error, deliveries)):
+            on_delivered()
+        return True
+
+    def advance(self, response, homeworks):
+        """Переход к current_date ответа после отправки всех уведомлений."""
+        self.timestamp = response.get('current_date', self.timestamp)
+        self.checkpoint(homeworks)
+
+    def new_error_message(self, error):
+        """Текст ошибки цикла или None, если о ней недавно сообщали."""
+        error_formatted = ERROR_MESSAGE.format(error=error)
+        logger.error(error_formatted)
+        return self.errors.message(error, error_formatted)
+
+    def error_sent(self, message):
+        """Запоминание отправленной ошибки."""
+        self.errors.sent()
+        self.checkpoint()
+
+
+def cache_counter(field):
+    """Чтение счётчика кэша ответов; 0, если кэш выключен."""
+    return lambda: getattr(RESPONSE_CACHE, field, 0)
+
+
+RESPONSE_CACHE_METRICS = [
+    CounterFunction(
+        f'homework_bot_response_cache_{field}_total', documentation,
+        cache_counter(field)
+    )
+    for field, documentation in RESPONSE_CACHE_COUNTERS.items()
+]
+STATUS_INDEX_METRICS = [
+    CounterFunction(
+        f'homework_bot_status_index_{field}_total', documentation,
+        partial(INDEX_TOTALS.get, field)
+    )
+    for field, documentation in STATUS_INDEX_COUNTERS.items()
+]
+
 
 def check_tokens():
     """Проверка доступности переменных окружения."""
@@ -79,74 +278,238 @@ def check_tokens():
     return True
 
 
+def configure_telegram_api(url=TELEGRAM_API_URL):
+    """Адрес Telegram Bot API, например локальной заглушки.
+
+    Шаблон с местами для токена и метода: http://host:port/bot{0}/{1}.
+    """
+    if url:
+        apihelper.API_URL = url
+
+
+def create_session(pool_size=HTTP_POOL_SIZE):
+    """Сессия requests с пулом keep-alive соединений."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=pool_size
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def setup_session(pool_size=HTTP_POOL_SIZE, cache=True):
+    """Включение общей сессии и кэша ответов для запросов к API."""
+    global HTTP_SESSION, RESPONSE_CACHE
+    HTTP_SESSION = create_session(pool_size)
+    RESPONSE_CACHE = ResponseCache() if cache else None
+    return HTTP_SESSION
+
+
+def get_account_key():
+    """Ключ текущего аккаунта для кэша и хранилища состояния."""
+    account = CURRENT_ACCOUNT.get()
+    if account is None:
+        return DEFAULT_ACCOUNT_KEY
+    return account.name
+
+
+def get_headers():
+    """Заголовки запроса к API для текущего аккаунта."""
+    account = CURRENT_ACCOUNT.get()
+    if account is None:
+        return HEADERS
+    return {'Authorization': f'OAuth {account.practicum_token}'}
+
+
+def get_chat_id():
+    """Идентификатор Telegram-чата для текущего аккаунта."""
+    account = CURRENT_ACCOUNT.get()
+    if account is None:
+        return TELEGRAM_CHAT_ID
+    return account.chat_id
+
+
+@timed(SEND_MESSAGE_SECONDS)
 def send_message(bot, message):
-    """Отправка сообщения в Telegram-чат."""
+    """Отправка сообщения в Telegram-чат.
+
+    Возвращает, удалась ли отправка. Очередь отправки только принимает
+    сообщение: тогда сразу возвращается Future доставки, а её итог
+    журналируется, когда станет известен.
+    """
+    start = time.perf_counter()
+    key, chat_id = get_account_key(), get_chat_id()
     try:
-        bot.send_message(chat_id=TELEGRAM_CHAT_ID,
-                         text=message,
-                         )
-        logger.debug(DEBUG_MESSAGE_SENT.format(message=message))
-        return True
-    except Exception as error:
-        logger.exception(
-            EXCEPTION_MESSAGE.format(message=message, error=error)
+        result = bot.send_message(
+            chat_id=chat_id,
+            text=message,
+            timeout=socket_timeout(SEND_STAGE, SEND_TIMEOUT),
         )
+    except Exception as error:
+        if not isinstance(error, DeadlineExceeded):
+            error = overrun(SEND_STAGE) or error
+        report_delivery(key, chat_id, message, start, error)
         return False
+    if isinstance(result, Future):
+        result.add_done_callback(lambda delivery: report_delivery(
+            key, chat_id, message, start, delivery_error(delivery)
+        ))
+        return result
+    report_delivery(key, chat_id, message, start)
+    return True
 
 
+def delivery_error(delivery):
+    """Ошибка завершённой доставки или None, если сообщение доставлено."""
+    if delivery.cancelled():
+        return CancelledError()
+    return delivery.exception()
+
+
+def report_delivery(key, chat_id, message, start, error=None):
+    """Журнал и запись итога отправки сообщения."""
+    if error is None:
+        logger.debug(
+            LazyMessage(DEBUG_MESSAGE_SENT, message=message),
+            extra={'latency': time.perf_counter() - start}
+        )
+    else:
+        logger.error(
+            LazyMessage(EXCEPTION_MESSAGE, message=message, error=error),
+            exc_info=error
+        )
+    if RECORDER is not None:
+        RECORDER.message(key, chat_id, message, error is None)
+
+
+def deliver(bot, state, messages, on_delivered):
+    """Отправка сообщений и учёт отправки после доставки всех.
+
+    Бот отвечает сразу, и on_delivered вызывается в этом же цикле.
+    Очередь отправки только принимает сообщения: учёт откладывается до
+    следующего цикла, чтобы цикл опроса не ждал доставки. Доставка
+    ограничена бюджетом текущего цикла, а вне него — новым бюджетом
+    LOOP_DEADLINE.
+    """
+    deliveries = []
+    for message in messages:
+        sent = send_message(bot, message)
+        if not sent:
+            return
+        if isinstance(sent, Future):
+            deliveries.append(sent)
+    if deliveries:
+        state.defer(
+            deliveries, on_delivered, CURRENT_DEADLINE.get() or Deadline()
+        )
+    else:
+        on_delivered()
+
+
+@timed(API_REQUEST_SECONDS)
 def get_api_answer(timestamp):
     """Запрос к API сервиса Практикум Домашка."""
     params = {'from_date': timestamp}
+    headers = get_headers()
+    request_headers = headers
+    key = get_account_key()
+    if RESPONSE_CACHE is not None:
+        request_headers = {
+            **headers, **RESPONSE_CACHE.request_headers(key, params)
+        }
+    client = requests if HTTP_SESSION is None else HTTP_SESSION
+    response = API_RETRY.call(
+        lambda: request_api(client, params, request_headers, headers)
+    )
+    return read_response(response, key, params)
+
+
+def request_api(client, params, request_headers, headers):
+    """Одна попытка запроса к API через предохранитель.
+
+    Сетевые ошибки и статусы из RETRY_STATUSES поднимают TransientError.
+    Таймауты сокета ограничены бюджетом цикла опроса; если он исчерпан,
+    поднимается DeadlineExceeded, и повторов больше нет.
+    """
+    timeout = (
+        socket_timeout(API_STAGE, CONNECT_TIMEOUT),
+        socket_timeout(API_STAGE, READ_TIMEOUT)
+    )
+    API_BREAKER.before_call()
+    start = time.perf_counter()
     try:
-        response = requests.get(
+        response = client.get(
             ENDPOINT,
-            headers=HEADERS,
-            params=params
+            headers=request_headers,
+            params=params,
+            timeout=timeout
         )
     except requests.RequestException as error:
-        raise ConnectionError(REQUEST_EXCEPTION_MESSAGE.format(
-            error=error, params=params, headers=HEADERS, endpoint=ENDPOINT))
+        if RECORDER is not None:
+            RECORDER.api(
+                get_account_key(), params,
+                duration=time.perf_counter() - start, error=error
+            )
+        API_BREAKER.record_failure()
+        exceeded = overrun(API_STAGE)
+        if exceeded is not None:
+            raise exceeded from error
+        raise TransientError(REQUEST_EXCEPTION_MESSAGE.format(
+            error=error, params=params, headers=headers, endpoint=ENDPOINT))
+    if RECORDER is not None:
+        RECORDER.api(
+            get_account_key(), params, response, time.perf_counter() - start
+        )
+    API_BREAKER.record_status(response.status_code)
+    if response.status_code in RETRY_STATUSES:
+        raise_transient_status(
+            response.status_code, response.headers, params
+        )
+    return response
+
+
+def raise_transient_status(status_code, response_headers, params):
+    """Временная ошибка статуса с паузой из заголовка Retry-After."""
+    raise TransientError(
+        STATUS_CODE_ERROR_MESSAGE.format(
+            status_code=status_code, params=params, headers=get_headers(),
+            endpoint=ENDPOINT
+        ),
+        retry_after=parse_retry_after(response_headers.get('Retry-After'))
+    )
+
+
+def read_response(response, key, params):
+    """Тело ответа API: из кэша, если оно не изменилось."""
+    if RESPONSE_CACHE is not None:
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            cached = RESPONSE_CACHE.cached(key, params)
+            if cached is not None:
+                return cached
 
     if response.status_code != HTTPStatus.OK:
         raise ConnectionError(STATUS_CODE_ERROR_MESSAGE.format(
             status_code=response.status_code,
-            params=params, headers=HEADERS, endpoint=ENDPOINT)
+            params=params, headers=get_headers(), endpoint=ENDPOINT)
         )
 
-    response_json = response.json()
-
-    for error_key in ['code', 'error']:
-        if error_key in response_json:
-            error_value = response_json[error_key]
-            raise ConnectionError(API_RESPONSE_ERROR_MESSAGE.format(
-                error_key=error_key, error_value=error_value,
-                params=params, headers=HEADERS, endpoint=ENDPOINT)
-            )
-
-    return response_json
+    if RESPONSE_CACHE is None:
+        return response.json()
+    return RESPONSE_CACHE.parse(
+        key, params, response.content, response.headers, loads=loads
+    )
 
 
+@count_errors(VALIDATION_ERRORS)
 def check_response(response):
     """Проверка ответа API на корректность."""
-    if not isinstance(response, dict):
-        raise TypeError(
-            API_RESPONSE_TYPE_ERROR.format(actual_type=type(response).__name__)
-        )
-    if 'homeworks' not in response:
-        raise KeyError(API_RESPONSE_KEY_ERROR)
-
-    homeworks = response['homeworks']
-
-    if not isinstance(homeworks, list):
-        raise TypeError(
-            API_HOMEWORKS_TYPE_ERROR.format(
-                actual_type=type(homeworks).__name__
-            )
-        )
+    homeworks = RESPONSE_VALIDATOR.validate(response)
     logger.debug(API_SUCCESS_LOG)
     return homeworks
 
 
+@count_errors(VALIDATION_ERRORS)
 def parse_status(homework):
     """Извлечение статуса домашней работы."""
     if 'homework_name' not in homework:
@@ -154,59 +517,135 @@ def parse_status(homework):
     if 'status' not in homework:
         raise KeyError(ERROR_MISSING_STATUS)
 
-    homework_name = homework['homework_name']
     homework_status = homework['status']
+    verdict = HOMEWORK_VERDICTS.get(homework_status)
+    if verdict is None:
+        raise ValueError(ERROR_UNKNOWN_STATUS.format(
+            homework_status=homework_status
+        ))
 
-    if homework_status not in HOMEWORK_VERDICTS:
-        error_message = ERROR_UNKNOWN_STATUS.format(
-            homework_status=homework_status)
-        raise ValueError(error_message)
-
-    verdict = HOMEWORK_VERDICTS[homework_status]
     info_message = INFO_STATUS_CHANGE.format(
-        homework_name=homework_name, verdict=verdict
+        homework_name=homework['homework_name'], verdict=verdict
     )
     return info_message
 
 
+def build_messages(homeworks):
+    """Сообщения о новых статусах всех работ из ответа API.
+
+    Одинаковые подряд идущие обновления схлопываются, остальные
+    объединяются в как можно меньшее число сообщений Telegram.
+    """
+    statuses = [
+        status for status, _ in groupby(map(parse_status, homeworks))
+    ]
+    messages = []
+    for status in statuses:
+        if messages and (
+            len(messages[-1]) + len(status) < TELEGRAM_MESSAGE_LIMIT
+        ):
+            messages[-1] = f'{messages[-1]}\n{status}'
+        else:
+            messages.append(status)
+    return messages
+
+
+def log_changes(homeworks):
+    """Запись в журнал новых статусов с id работ."""
+    for homework in homeworks:
+        status = homework.get('status')
+        logger.debug(
+            LazyMessage(HOMEWORK_CHANGED_LOG, status=status),
+            extra={'homework_id': homework.get('id')}
+        )
+
+
+@timed(LOOP_ITERATION_SECONDS)
+def poll_cycle(bot, state):
+    """Один цикл опроса API и отправки уведомлений.
+
+    Возвращает паузу в секундах до следующего цикла. Если аккаунт
+    арендован другим экземпляром бота, цикл пропускается до истечения
+    аренды. Запрос к API и отправка уведомлений укладываются в бюджет
+    LOOP_DEADLINE; уведомление об ошибке отправляется вне бюджета. Пока
+    очередь отправки не доставила сообщения прошлого цикла, новый цикл
+    откладывается, чтобы не отправить их повторно.
+    """
+    if LEASES is not None and not state.claim(LEASES):
+        logger.debug(LazyMessage(LEASE_BUSY_LOG, key=state.key))
+        return LEASES.ttl
+    if not state.settle():
+        logger.debug(LazyMessage(DELIVERY_PENDING_LOG, key=state.key))
+        return state.interval.minimum
+    homeworks = None
+    try:
+        with deadline_scope():
+            response = get_api_answer(state.timestamp)
+            homeworks = list(map(
+                Homework.from_dict,
+                state.index.changed(check_response(response))
+            ))
+            LAST_POLL.mark()
+
+            if homeworks:
+                log_changes(homeworks)
+                deliver(
+                    bot, state, build_messages(homeworks),
+                    partial(state.advance, response, homeworks)
+                )
+            else:
+                logger.debug(NO_NEW_HOMEWORK_LOG)
+
+    except CircuitOpenError as error:
+        homeworks = None
+        logger.debug(error)
+
+    except Exception as error:
+        homeworks = None
+        message = state.new_error_message(error)
+        if message:
+            deliver(bot, state, [message], partial(state.error_sent, message))
+    delay = state.interval.next_interval(homeworks)
+    if LEASES is not None:
+        LEASES.expect(state.key, delay)
+    return delay
+
+
+def run_once(bot, state):
+    """Один шаг основного цикла без паузы.
+
+    Возвращает паузу до следующего шага и запоминает его время по часам
+    state.clock. Паузу выдерживает вызывающий: main — через time.sleep,
+    симуляция — переводом виртуальных часов.
+    """
+    delay = poll_cycle(bot, state)
+    state.next_poll_at = state.clock.time() + delay
+    return delay
+
+
 def main():
     """Основная логика работы бота."""
     if not check_tokens():
         return
 
     bot = TeleBot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
-    last_error_message = None
+    if SEND_THROUGH_QUEUE:
+        bot = OutboundQueue(bot).start()
+    state = PollState(timestamp=int(time.time()), store=open_store())
 
     while True:
-        try:
-            response = get_api_answer(timestamp)
-            homeworks = check_response(response)
-
-            if homeworks:
-                message = parse_status(homeworks[0])
-                if send_message(bot, message):
-                    timestamp = response.get('current_date', timestamp)
-            else:
-                logger.debug(NO_NEW_HOMEWORK_LOG)
-
-        except Exception as error:
-            error_formatted = ERROR_MESSAGE.format(error=error)
-            logger.error(error_formatted)
-            if error_formatted != last_error_message:
-                if send_message(bot, error_formatted):
-                    last_error_message = error_formatted
-        time.sleep(RETRY_PERIOD)
+        delay = run_once(bot, state)
+        time.sleep(delay)
 
 
 if __name__ == '__main__':
-    logging.basicConfig(
-        format='%(asctime)s %(levelname)s %(message)s',
-        level=logging.INFO,
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler('bot.log', encoding='utf-8')
-        ]
-    )
-
+    setup_logging(CURRENT_ACCOUNT)
+
+    setup_session()
+    configure_telegram_api()
+    API_RETRY = RetryPolicy()
+    LEASES = open_leases()
+    RECORDER = open_recorder()
+    start_metrics_server()
+    SEND_THROUGH_QUEUE = True
     main()
@@ -0,0 +1,168 @@
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+from log_config import LazyMessage
+
+logger = logging.getLogger(__name__)
+
+LEASE_DB = os.getenv('LEASE_DB')
+LEASE_TTL = float(os.getenv('LEASE_TTL', 60))
+BUSY_TIMEOUT = 5
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS leases ('
+    ' name TEXT PRIMARY KEY,'
+    ' owner TEXT NOT NULL,'
+    ' expires_at REAL NOT NULL)'
+)
+ACQUIRED_LOG = 'Аренда {name} получена владельцем {owner}.'
+LOST_LOG = 'Аренда {name} потеряна владельцем {owner}.'
+RENEW_ERROR = 'Не удалось продлить аренды: {error}'
+
+
+def default_owner():
+    """Имя владельца: хост, pid и случайный суффикс."""
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+class LeaseStore:
+    """Аренды аккаунтов в общей базе SQLite.
+
+    Аккаунт опрашивает только владелец аренды. Аренда действует ttl
+    секунд и продлевается при каждом acquire и фоновым потоком раз в
+    ttl / 3. Фоновый поток продлевает только аренды аккаунтов, цикл
+    которых идёт по расписанию: после acquire цикл сообщает через expect,
+    когда будет следующий. Если цикл завис или опоздал больше чем на ttl,
+    аренда перестаёт продлеваться. Если владелец остановился или завис,
+    аренда истекает, и её забирает следующий экземпляр, обратившийся
+    к ней: не позже чем через 2 * ttl плюс его пауза между попытками.
+
+    Время — общие для всех процессов часы time.time.
+    """
+
+    def __init__(self, path, ttl=LEASE_TTL, owner=None, clock=time.time):
+        """Хранилище в файле path; owner по умолчанию — хост, pid и суффикс."""
+        self.ttl = ttl
+        self.owner = owner or default_owner()
+        self.clock = clock
+        self.held = set()
+        self.due = {}
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            path, timeout=BUSY_TIMEOUT, check_same_thread=False,
+            isolation_level=None
+        )
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute(SCHEMA)
+        self.heartbeat = None
+        self.stopped = threading.Event()
+
+    def holds(self, name):
+        """Считает ли этот экземпляр аренду своей."""
+        return name in self.held
+
+    def acquire(self, name):
+        """Получение или продление аренды; False, если она занята."""
+        now = self.clock()
+        with self.lock:
+            cursor = self.connection.execute(
+                'INSERT INTO leases (name, owner, expires_at) '
+                'VALUES (?, ?, ?) ON CONFLICT (name) DO UPDATE SET '
+                'owner = excluded.owner, expires_at = excluded.expires_at '
+                'WHERE leases.owner = excluded.owner '
+                'OR leases.expires_at < ?',
+                (name, self.owner, now + self.ttl, now)
+            )
+            acquired = cursor.rowcount == 1
+            if acquired:
+                self.due[name] = now
+            if acquired and name not in self.held:
+                self.held.add(name)
+                logger.info(LazyMessage(
+                    ACQUIRED_LOG, name=name, owner=self.owner
+                ))
+            elif not acquired and name in self.held:
+                self.held.discard(name)
+                self.due.pop(name, None)
+                logger.warning(LazyMessage(
+                    LOST_LOG, name=name, owner=self.owner
+                ))
+        return acquired
+
+    def expect(self, name, delay):
+        """Следующий цикл аккаунта name начнётся через delay секунд."""
+        with self.lock:
+            if name in self.held:
+                self.due[name] = self.clock() + delay
+
+    def forget(self, name):
+        """Сброс аренды в памяти: следующий acquire — новое получение."""
+        with self.lock:
+            self.held.discard(name)
+            self.due.pop(name, None)
+
+    def renew(self):
+        """Продление ещё не истёкших аренд аккаунтов, идущих по расписанию.
+
+        Аренда аккаунта, цикл которого опоздал больше чем на ttl, не
+        продлевается: зависший цикл не удерживает аккаунт.
+        """
+        now = self.clock()
+        with self.lock:
+            names = [
+                name for name in self.held
+                if self.due.get(name, now) + self.ttl >= now
+            ]
+            if not names:
+                return 0
+            cursor = self.connection.execute(
+                'UPDATE leases SET expires_at = ? '
+                'WHERE owner = ? AND expires_at >= ? AND name IN ({})'.format(
+                    ', '.join('?' * len(names))
+                ),
+                (now + self.ttl, self.owner, now, *names)
+            )
+        return cursor.rowcount
+
+    def release(self):
+        """Освобождение всех аренд этого экземпляра."""
+        with self.lock:
+            self.connection.execute(
+                'DELETE FROM leases WHERE owner = ?', (self.owner,)
+            )
+            self.held.clear()
+            self.due.clear()
+
+    def _renew_forever(self):
+        while not self.stopped.wait(self.ttl / 3):
+            try:
+                self.renew()
+            except sqlite3.Error as error:
+                logger.error(LazyMessage(RENEW_ERROR, error=error))
+
+    def start(self):
+        """Запуск фонового продления аренд."""
+        self.heartbeat = threading.Thread(
+            target=self._renew_forever, name='lease-heartbeat', daemon=True
+        )
+        self.heartbeat.start()
+        return self
+
+    def stop(self):
+        """Остановка продления и освобождение аренд."""
+        self.stopped.set()
+        if self.heartbeat is not None:
+            self.heartbeat.join()
+        self.release()
+
+
+def open_leases(path=LEASE_DB):
+    """Запущенное хранилище аренд по пути из LEASE_DB или None."""
+    if not path:
+        return None
+    return LeaseStore(path).start()
@@ -0,0 +1,264 @@
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FILE = os.getenv('LOG_FILE', 'bot.log')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+TEXT_FORMAT = '%(asctime)s %(levelname)s %(message)s'
+STRUCTURED_FIELDS = ('account', 'homework_id', 'latency')
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 5))
+LOG_ROTATE_INTERVAL = int(os.getenv('LOG_ROTATE_INTERVAL', 24 * 60 * 60))
+LOG_FLUSH_INTERVAL = float(os.getenv('LOG_FLUSH_INTERVAL', 1))
+LOG_SAMPLE_WINDOW = float(os.getenv('LOG_SAMPLE_WINDOW', 60))
+LOG_SAMPLE_BURST = int(os.getenv('LOG_SAMPLE_BURST', 1))
+SAMPLER_MAX_KEYS = 10000
+SUPPRESSED_TEMPLATE = '{message} (подавлено одинаковых сообщений: {count})'
+
+
+class LazyMessage:
+    """Сообщение журнала, которое форматируется только при записи."""
+
+    __slots__ = ('template', 'kwargs')
+
+    def __init__(self, template, **kwargs):
+        """Шаблон template с аргументами для str.format."""
+        self.template = template
+        self.kwargs = kwargs
+
+    def __str__(self):
+        """Подстановка значений в шаблон."""
+        return self.template.format(**self.kwargs)
+
+
+class AccountFilter(logging.Filter):
+    """Добавление в запись имени текущего аккаунта."""
+
+    def __init__(self, account_var):
+        """Фильтр, читающий аккаунт из контекстной переменной."""
+        super().__init__()
+        self.account_var = account_var
+
+    def filter(self, record):
+        """Запись имени аккаунта из контекста в record.account."""
+        if not hasattr(record, 'account'):
+            account = self.account_var.get()
+            record.account = None if account is None else account.name
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Одна JSON-строка на запись с полями аккаунта, работы и задержки."""
+
+    def format(self, record):
+        """Запись в виде JSON-строки."""
+        data = {
+            'time': datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Ограничение повторов одинаковых сообщений.
+
+    В каждом окне window секунд пропускаются первые burst одинаковых
+    сообщений, остальные подавляются. Первое сообщение следующего окна
+    сообщает, сколько повторов было подавлено.
+    """
+
+    def __init__(
+        self, window=LOG_SAMPLE_WINDOW, burst=LOG_SAMPLE_BURST,
+        clock=time.monotonic
+    ):
+        """Не больше burst одинаковых записей за window секунд."""
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.windows = {}
+
+    def filter(self, record):
+        """Пропуск записи, если лимит её окна не исчерпан."""
+        key = (record.levelno, record.getMessage())
+        now = self.clock()
+        with self.lock:
+            started, passed, suppressed = self.windows.get(key, (None, 0, 0))
+            if started is None or now - started >= self.window:
+                if len(self.windows) >= SAMPLER_MAX_KEYS:
+                    self._prune(now)
+                self.windows[key] = (now, 1, 0)
+            elif passed < self.burst:
+                self.windows[key] = (started, passed + 1, suppressed)
+                return True
+            else:
+                self.windows[key] = (started, passed, suppressed + 1)
+                return False
+        if suppressed:
+            record.msg = LazyMessage(
+                SUPPRESSED_TEMPLATE, message=key[1], count=suppressed
+            )
+            record.args = None
+        return True
+
+    def _prune(self, now):
+        self.windows = {
+            key: value for key, value in self.windows.items()
+            if now - value[0] < self.window
+        }
+
+
+def compress(source, destination):
+    """Сжатие файла в gzip с удалением исходного."""
+    with open(source, 'rb') as src, gzip.open(destination, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+class CompressedRotatingFileHandler(RotatingFileHandler):
+    """Файл журнала с ротацией по размеру и по времени.
+
+    Ротированные файлы сжимаются в gzip в фоновом потоке, хранится не
+    больше backup_count архивов. Буфер сбрасывается на диск не чаще раза
+    в flush_interval секунд и сразу для записей уровня ERROR и выше;
+    отложенный сброс выполняет таймер, поэтому последняя запись попадает
+    на диск не позже чем через flush_interval. Размер файла считается
+    по записанным байтам: проверка размера в RotatingFileHandler
+    перемещается в конец файла и этим сбрасывает буфер на каждой записи.
+    """
+
+    def __init__(
+        self, filename, max_bytes=LOG_MAX_BYTES,
+        backup_count=LOG_BACKUP_COUNT, interval=LOG_ROTATE_INTERVAL,
+        flush_interval=LOG_FLUSH_INTERVAL
+    ):
+        """Обработчик файла filename с ротацией по размеру и времени."""
+        super().__init__(
+            filename, maxBytes=max_bytes, backupCount=backup_count,
+            encoding='utf-8'
+        )
+        self.interval = interval
+        self.rollover_at = time.time() + interval
+        self.flush_interval = flush_interval
+        self.flushed_at = time.monotonic()
+        self.flush_timer = None
+        self.size = self.stream.tell() if self.stream else 0
+        self.record_size = 0
+        self.compressor = None
+        self.namer = lambda name: f'{name}.gz'
+        self.rotator = self._rotate
+
+    def shouldRollover(self, record):
+        """Ротация по размеру файла или по истечении интервала."""
+        self.record_size = len(
+            (self.format(record) + self.terminator).encode(self.encoding)
+        )
+        if self.interval and time.time() >= self.rollover_at:
+            return True
+        return 0 < self.maxBytes <= self.size + self.record_size
+
+    def doRollover(self):
+        """Ротация после завершения предыдущего сжатия."""
+        if self.compressor is not None:
+            self.compressor.join()
+        super().doRollover()
+        self.size = 0
+        self.rollover_at = time.time() + self.interval
+
+    def _rotate(self, source, destination):
+        pending = f'{destination[:-len(".gz")]}.pending'
+        os.replace(source, pending)
+        self.compressor = threading.Thread(
+            target=compress, args=(pending, destination), daemon=True
+        )
+        self.compressor.start()
+
+    def emit(self, record):
+        """Запись без сброса буфера на каждое сообщение."""
+        super().emit(record)
+        self.size += self.record_size
+        if record.levelno >= logging.ERROR:
+            self.flush(force=True)
+
+    def flush(self, force=False):
+        """Сброс буфера на диск не чаще раза в flush_interval."""
+        with self.lock:
+            now = time.monotonic()
+            wait = self.flushed_at + self.flush_interval - now
+            if force or wait <= 0:
+                self.flushed_at = now
+                super().flush()
+            elif self.flush_timer is None:
+                self.flush_timer = threading.Timer(wait, self._flush_later)
+                self.flush_timer.daemon = True
+                self.flush_timer.start()
+
+    def _flush_later(self):
+        with self.lock:
+            self.flush_timer = None
+            self.flush(force=True)
+
+    def close(self):
+        """Сброс буфера, закрытие файла и ожидание сжатия."""
+        with self.lock:
+            if self.flush_timer is not None:
+                self.flush_timer.cancel()
+                self.flush_timer = None
+            self.flush_interval = 0
+        super().close()
+        if self.compressor is not None:
+            self.compressor.join()
+
+
+def setup_logging(
+    account_var=None, log_file=LOG_FILE, json_lines=LOG_FORMAT == 'json',
+    level=LOG_LEVEL
+):
+    """Журнал через очередь: запись в файл и консоль в отдельном потоке.
+
+    Возвращает запущенный QueueListener; он останавливается при выходе.
+    """
+    formatter = (
+        JsonLinesFormatter() if json_lines else logging.Formatter(TEXT_FORMAT)
+    )
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(CompressedRotatingFileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter())
+    if account_var is not None:
+        queue_handler.addFilter(AccountFilter(account_var))
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(queue_handler)
+
+    listener = QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,266 @@
+import inspect
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from log_config import LazyMessage
+
+logger = logging.getLogger(__name__)
+
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', 9108))
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30
+)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+METRICS_SERVER_LOG = 'Метрики доступны по адресу http://{host}:{port}/metrics'
+METRICS_SERVER_ERROR = 'Не удалось запустить сервер метрик: {error}'
+
+REGISTRY = []
+
+
+def format_labels(names, values):
+    """Метки в формате Prometheus."""
+    if not names:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('"', '\\"'))
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+class Counter:
+    """Счётчик с метками."""
+
+    def __init__(self, name, documentation, labelnames=()):
+        """Счётчик, зарегистрированный в REGISTRY."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values = {}
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, *labels, amount=1):
+        """Увеличение счётчика для набора меток."""
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def collect(self):
+        """Строки с текущими значениями."""
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} counter'
+        with self.lock:
+            values = list(self.values.items())
+        for labels, value in values:
+            yield '{}{} {}'.format(
+                self.name, format_labels(self.labelnames, labels), value
+            )
+
+
+class Gauge:
+    """Значение, вычисляемое в момент чтения метрик."""
+
+    metric_type = 'gauge'
+
+    def __init__(self, name, documentation, function):
+        """Метрика, значение которой возвращает function."""
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+        REGISTRY.append(self)
+
+    def collect(self):
+        """Строки с текущим значением."""
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} {self.metric_type}'
+        yield f'{self.name} {self.function()}'
+
+
+class CounterFunction(Gauge):
+    """Счётчик, который ведёт другой объект; читается в момент сбора."""
+
+    metric_type = 'counter'
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин."""
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        """Гистограмма с границами корзин buckets в секундах."""
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value):
+        """Добавление наблюдения."""
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @property
+    def count(self):
+        """Общее число наблюдений."""
+        return sum(self.counts)
+
+    def collect(self):
+        """Строки с накопленными значениями корзин."""
+        with self.lock:
+            counts = list(self.counts)
+            total = self.sum
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), counts):
+            cumulative += count
+            yield f'{self.name}_bucket{{le="{bound}"}} {cumulative}'
+        yield f'{self.name}_sum {total}'
+        yield f'{self.name}_count {cumulative}'
+
+
+def timed(histogram):
+    """Декоратор: длительность вызова функции или корутины."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def count_errors(counter):
+    """Декоратор: число исключений функции по их типу."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except Exception as error:
+                counter.inc(func.__name__, type(error).__name__)
+                raise
+        return wrapper
+    return decorator
+
+
+class LastSuccess:
+    """Момент последнего успешного опроса API."""
+
+    def __init__(self):
+        """Успешных опросов ещё не было."""
+        self.moment = None
+
+    def mark(self):
+        """Отметка успешного опроса."""
+        self.moment = time.monotonic()
+
+    def seconds_since(self):
+        """Секунды с последнего успешного опроса или -1, если его не было."""
+        if self.moment is None:
+            return -1
+        return time.monotonic() - self.moment
+
+
+API_REQUEST_SECONDS = Histogram(
+    'homework_bot_api_request_seconds',
+    'Длительность get_api_answer.'
+)
+SEND_MESSAGE_SECONDS = Histogram(
+    'homework_bot_send_message_seconds',
+    'Длительность send_message.'
+)
+LOOP_ITERATION_SECONDS = Histogram(
+    'homework_bot_loop_iteration_seconds',
+    'Длительность одного цикла опроса.'
+)
+SCHEDULE_DRIFT_SECONDS = Histogram(
+    'homework_bot_schedule_drift_seconds',
+    'Опоздание начала опроса аккаунта относительно расписания.'
+)
+VALIDATION_ERRORS = Counter(
+    'homework_bot_validation_errors_total',
+    'Исключения check_response и parse_status по типам.',
+    ('function', 'exception')
+)
+CIRCUIT_TRANSITIONS = Counter(
+    'homework_bot_circuit_transitions_total',
+    'Переходы предохранителей по состояниям.',
+    ('breaker', 'state')
+)
+DEADLINE_EXCEEDED = Counter(
+    'homework_bot_deadline_exceeded_total',
+    'Превышения бюджета времени цикла опроса по этапам.',
+    ('stage',)
+)
+LAST_POLL = LastSuccess()
+SECONDS_SINCE_LAST_POLL = Gauge(
+    'homework_bot_seconds_since_last_poll',
+    'Секунды с последнего успешного опроса API.',
+    LAST_POLL.seconds_since
+)
+
+
+def render():
+    """Все метрики в текстовом формате Prometheus."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.collect())
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Отдача метрик по GET /metrics."""
+
+    def do_GET(self):
+        """Ответ со всеми метриками."""
+        if self.path != '/metrics':
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        body = render().encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Запросы к метрикам не попадают в журнал."""
+
+
+def start_metrics_server(host=METRICS_HOST, port=METRICS_PORT):
+    """Запуск HTTP-сервера метрик в фоновом потоке."""
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as error:
+        logger.error(LazyMessage(METRICS_SERVER_ERROR, error=error))
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(LazyMessage(
+        METRICS_SERVER_LOG, host=host, port=server.server_address[1]
+    ))
+    return server
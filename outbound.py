@@ -0,0 +1,249 @@
+import heapq
+import itertools
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from http import HTTPStatus
+
+from telebot.apihelper import ApiTelegramException
+
+from deadlines import CURRENT_DEADLINE, SEND_STAGE, DeadlineExceeded
+from log_config import LazyMessage
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_RATE = float(os.getenv('TELEGRAM_GLOBAL_RATE', 30))
+CHAT_RATE = float(os.getenv('TELEGRAM_CHAT_RATE', 1))
+MAX_SEND_ATTEMPTS = 5
+
+SENT_LOG = 'Сообщение доставлено в чат {chat_id}.'
+RETRY_AFTER_LOG = (
+    'Telegram ограничил отправку в чат {chat_id}: '
+    'повтор через {retry_after} с.'
+)
+DELIVERY_ERROR = 'Не удалось доставить сообщение в чат {chat_id}: {error}'
+DROPPED_ERROR = (
+    'Сообщение в чат {chat_id} отброшено после {attempts} попыток.'
+)
+
+
+class TokenBucket:
+    """Ведро токенов с резервированием.
+
+    reserve() всегда забирает токен и возвращает момент, когда он
+    становится доступен: при пустом ведре токены берутся в долг.
+    """
+
+    def __init__(self, rate, capacity=1):
+        """Ведро на rate токенов в секунду, вмещающее capacity."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = None
+
+    def reserve(self, now):
+        """Резервирование токена; возвращает момент его доступности."""
+        if self.updated is not None:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return now
+        return now - self.tokens / self.rate
+
+
+def get_retry_after(error):
+    """Пауза из ответа 429 Telegram или None для других ошибок."""
+    if not isinstance(error, ApiTelegramException):
+        return None
+    if error.error_code != HTTPStatus.TOO_MANY_REQUESTS:
+        return None
+    return error.result_json.get('parameters', {}).get('retry_after', 1)
+
+
+class OutboundQueue:
+    """Очередь исходящих сообщений с отдельным потоком-отправителем.
+
+    Повторяет интерфейс send_message бота, но только ставит сообщение
+    в очередь и сразу возвращает Future с результатом доставки.
+    Поток-отправитель соблюдает общий лимит Telegram и лимит на чат, а
+    при ответе 429 приостанавливает отправку в этот чат на retry_after
+    и повторяет её; сообщения в другие чаты уходят без паузы. Если
+    сообщение доставить не удалось, Future завершается ошибкой, и
+    вызывающий решает, отправлять ли его снова.
+
+    Сообщение уносит с собой бюджет цикла опроса, в котором его
+    поставили в очередь. Таймаут отправки считается по этому бюджету в
+    момент доставки; если время этапа отправки вышло или выйдет, пока
+    сообщение ждёт своей очереди, оно не отправляется, и Future
+    завершается DeadlineExceeded. Отменённые Future не отправляются.
+    """
+
+    def __init__(
+        self, bot, global_rate=GLOBAL_RATE, chat_rate=CHAT_RATE,
+        clock=time.monotonic, sleep=time.sleep
+    ):
+        """Очередь перед ботом bot; поток отправки ещё не запущен."""
+        self.bot = bot
+        self.global_bucket = TokenBucket(global_rate, capacity=global_rate)
+        self.chat_rate = chat_rate
+        self.chat_buckets = {}
+        self.clock = clock
+        self.sleep = sleep
+        self.queue = queue.Queue()
+        self.pending = []
+        self.sequence = itertools.count()
+        self.paused_until = {}
+        self.thread = None
+
+    def start(self):
+        """Запуск потока-отправителя."""
+        self.thread = threading.Thread(
+            target=self._run, name='telegram-sender', daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def set_global_rate(self, rate):
+        """Новый общий лимит отправки, например после смены числа процессов."""
+        self.global_bucket = TokenBucket(rate, capacity=rate)
+
+    def stop(self, timeout=None):
+        """Отправка оставшихся сообщений и остановка потока."""
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        """Постановка сообщения в очередь без ожидания отправки.
+
+        Возвращает Future: его результат — ответ Telegram, исключение —
+        последняя ошибка отправки. Таймаут из kwargs — верхняя граница
+        таймаута, который будет посчитан при доставке.
+        """
+        delivery = Future()
+        self.queue.put(
+            (chat_id, text, kwargs, CURRENT_DEADLINE.get(), delivery)
+        )
+        return delivery
+
+    def _schedule(self, item, attempt=1, not_before=0):
+        chat_id, _, _, deadline, delivery = item
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.chat_rate)
+        now = self.clock()
+        ready = max(
+            bucket.reserve(now), not_before,
+            self.paused_until.get(chat_id, 0)
+        )
+        if (
+            deadline is not None
+            and deadline.remaining(SEND_STAGE) <= ready - now
+        ):
+            # Очередь сообщения подойдёт уже после бюджета отправки.
+            self._fail(chat_id, delivery, deadline.exceeded(SEND_STAGE))
+            return
+        heapq.heappush(
+            self.pending, (ready, next(self.sequence), attempt, item)
+        )
+
+    def _run(self):
+        stopping = False
+        while not stopping or self.pending:
+            timeout = None
+            if self.pending:
+                timeout = max(0, self.pending[0][0] - self.clock())
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                self._deliver_next()
+                continue
+            if item is None:
+                stopping = True
+            else:
+                self._schedule(item)
+
+    @staticmethod
+    def _fail(chat_id, delivery, error):
+        logger.error(LazyMessage(
+            DELIVERY_ERROR, chat_id=chat_id, error=error
+        ))
+        try:
+            delivery.set_exception(error)
+        except InvalidStateError:
+            # Вызывающий уже отменил ожидание доставки.
+            pass
+
+    def _send(self, chat_id, text, kwargs, deadline, wait):
+        """Отправка через wait секунд с таймаутом по бюджету deadline.
+
+        Если бюджет этапа отправки кончится раньше, чем подойдёт очередь
+        сообщения, DeadlineExceeded поднимается сразу, без ожидания.
+        """
+        if deadline is not None and deadline.remaining(SEND_STAGE) <= wait:
+            raise deadline.exceeded(SEND_STAGE)
+        if wait > 0:
+            self.sleep(wait)
+        if deadline is None:
+            return self.bot.send_message(chat_id=chat_id, text=text, **kwargs)
+        timeout = deadline.timeout(
+            SEND_STAGE, kwargs.get('timeout', math.inf)
+        )
+        try:
+            return self.bot.send_message(
+                chat_id=chat_id, text=text, **{**kwargs, 'timeout': timeout}
+            )
+        except Exception as error:
+            if deadline.remaining(SEND_STAGE) > 0:
+                raise
+            raise deadline.exceeded(SEND_STAGE) from error
+
+    def _deliver_next(self):
+        ready, _, attempt, item = heapq.heappop(self.pending)
+        chat_id, text, kwargs, deadline, delivery = item
+        paused_until = self.paused_until.get(chat_id, 0)
+        if paused_until > ready:
+            # Чат приостановлен ответом 429 после постановки в расписание.
+            heapq.heappush(self.pending, (
+                paused_until, next(self.sequence), attempt, item
+            ))
+            return
+        if attempt == 1 and not delivery.set_running_or_notify_cancel():
+            return
+        now = self.clock()
+        wait = max(ready, self.global_bucket.reserve(now)) - now
+        try:
+            result = self._send(chat_id, text, kwargs, deadline, wait)
+        except DeadlineExceeded as error:
+            self._fail(chat_id, delivery, error)
+            return
+        except Exception as error:
+            retry_after = get_retry_after(error)
+            if retry_after is None:
+                logger.error(LazyMessage(
+                    DELIVERY_ERROR, chat_id=chat_id, error=error
+                ))
+            elif attempt >= MAX_SEND_ATTEMPTS:
+                logger.error(LazyMessage(
+                    DROPPED_ERROR, chat_id=chat_id, attempts=attempt
+                ))
+            else:
+                logger.warning(LazyMessage(
+                    RETRY_AFTER_LOG, chat_id=chat_id,
+                    retry_after=retry_after
+                ))
+                self.paused_until[chat_id] = self.clock() + retry_after
+                self._schedule(
+                    item, attempt + 1, self.paused_until[chat_id]
+                )
+                return
+            delivery.set_exception(error)
+            return
+        logger.debug(LazyMessage(SENT_LOG, chat_id=chat_id))
+        delivery.set_result(result)
@@ -0,0 +1,73 @@
+import json
+import os
+import threading
+import time
+
+RECORD_FILE = os.getenv('RECORD_FILE')
+API_EVENT = 'api'
+MESSAGE_EVENT = 'msg'
+
+
+class Recorder:
+    """Дозапись событий бота в файл, по строке JSON на событие.
+
+    Включается переменной RECORD_FILE; файл воспроизводит replay.py.
+
+    Ключи сокращены: t — время, k — тип события, a — аккаунт.
+    Для запроса к API: p — параметры, s — статус или None при сетевой
+    ошибке, h — заголовки, d — длительность, b — тело, e — ошибка.
+    Для сообщения: c — чат, m — текст, ok — удалась ли отправка.
+    """
+
+    def __init__(self, path, clock=time.time):
+        """Запись, дописываемая в конец файла path."""
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def write(self, event):
+        """Дозапись одного события."""
+        line = json.dumps(event, ensure_ascii=False, separators=(',', ':'))
+        with self.lock:
+            self.file.write(line + '\n')
+            self.file.flush()
+
+    def api(self, key, params, response=None, duration=0, error=None):
+        """Запись попытки запроса к API."""
+        event = {
+            't': self.clock(), 'k': API_EVENT, 'a': key, 'p': params,
+            'd': round(duration, 6),
+        }
+        if response is None:
+            event.update(s=None, e=str(error))
+        else:
+            event.update(
+                s=response.status_code, h=dict(response.headers),
+                b=response.content.decode('utf-8', 'replace')
+            )
+        self.write(event)
+
+    def message(self, key, chat_id, text, sent):
+        """Запись отправляемого сообщения."""
+        self.write({
+            't': self.clock(), 'k': MESSAGE_EVENT, 'a': key, 'c': chat_id,
+            'm': text, 'ok': sent,
+        })
+
+    def close(self):
+        """Закрытие файла записи."""
+        with self.lock:
+            self.file.close()
+
+
+def open_recorder(path=RECORD_FILE):
+    """Запись в файл из RECORD_FILE или None, если она не включена."""
+    if not path:
+        return None
+    return Recorder(path)
+
+
+def read_recording(path):
+    """События из файла записи в порядке записи."""
+    with open(path, encoding='utf-8') as recording:
+        return [json.loads(line) for line in recording if line.strip()]
@@ -0,0 +1,77 @@
+import sys
+
+FIELDS = ('id', 'homework_name', 'status', 'date_updated')
+
+
+def intern_status(status):
+    """Один общий объект строки на каждый статус."""
+    if isinstance(status, str):
+        return sys.intern(status)
+    return status
+
+
+class Homework:
+    """Работа из ответа API только с полями, которые использует бот.
+
+    Занимает меньше памяти, чем словарь из JSON: нет __dict__ и полей
+    вроде reviewer_comment и lesson_name, а строки статусов общие.
+    Поддерживает чтение как словарь (homework['status'], get, in), поэтому
+    принимается там же, где раньше работа передавалась словарём.
+    Отсутствующие поля хранятся как None и считаются отсутствующими.
+
+    Записи строятся только для изменившихся работ, которые уходят в
+    уведомления и хранятся до учёта их доставки; проверка ответа API
+    работает со словарями, чтобы не строить запись на каждую работу в
+    каждом опросе.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(
+        self, id=None, homework_name=None, status=None, date_updated=None
+    ):
+        """Запись из значений полей; отсутствующие поля — None."""
+        self.id = id
+        self.homework_name = homework_name
+        self.status = status
+        self.date_updated = date_updated
+
+    @classmethod
+    def from_dict(cls, data):
+        """Запись из словаря ответа API."""
+        return cls(
+            data.get('id'), data.get('homework_name'),
+            intern_status(data.get('status')), data.get('date_updated')
+        )
+
+    def get(self, key, default=None):
+        """Значение поля или default, если поля нет."""
+        if key not in FIELDS:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        """Значение поля; KeyError, если поля нет."""
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        """Есть ли у работы поле."""
+        return self.get(key) is not None
+
+    def __eq__(self, other):
+        """Сравнение по всем полям."""
+        if not isinstance(other, Homework):
+            return NotImplemented
+        return all(
+            getattr(self, field) == getattr(other, field) for field in FIELDS
+        )
+
+    def __repr__(self):
+        """Поля записи в виде Homework(id=..., ...)."""
+        return 'Homework({})'.format(', '.join(
+            f'{field}={getattr(self, field)!r}' for field in FIELDS
+        ))
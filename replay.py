@@ -0,0 +1,202 @@
+"""Воспроизведение записи трафика бота без сети.
+
+Запись, сделанная с RECORD_FILE, проходит через тот же цикл опроса,
+что и в работе бота:
+
+    python replay.py traffic.jsonl            # как можно быстрее
+    python replay.py traffic.jsonl --speed 1  # в исходном темпе
+
+После воспроизведения печатается сравнение отправленных сообщений с
+записанными.
+"""
+import argparse
+import logging
+import time
+from collections import defaultdict, deque, namedtuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import homework
+from recording import API_EVENT, MESSAGE_EVENT, read_recording
+from retries import RetryPolicy
+from simulation import VirtualClock, simulated_api
+from validation import loads
+
+MAX_DIFFERENCES = 5
+
+REPORT = (
+    'Запросов к API: {requests}, циклов опроса: {cycles}.\n'
+    'Сообщений в записи: {recorded}, при воспроизведении: {replayed}, '
+    'расхождений: {different}.'
+)
+DIFFERENCE_LOG = '{key}: записано {recorded!r}, отправлено {replayed!r}'
+MISSING_RESPONSE = 'В записи нет ответа для аккаунта {key}.'
+
+ReplayReport = namedtuple(
+    'ReplayReport', 'requests cycles recorded replayed differences'
+)
+
+
+class ReplayResponse:
+    """Ответ API, восстановленный из записи."""
+
+    def __init__(self, event):
+        """Ответ из записанного события запроса к API."""
+        self.status_code = event['s']
+        self.headers = CaseInsensitiveDict(event.get('h') or {})
+        self.content = event.get('b', '').encode()
+
+    def json(self):
+        """Тело ответа."""
+        return loads(self.content)
+
+
+class ReplaySession:
+    """Записанные ответы API по очереди для каждого аккаунта.
+
+    Подставляется в homework.HTTP_SESSION. Если speed задан, перед
+    ответом выдерживается записанная длительность запроса.
+    """
+
+    def __init__(self, events, speed=None, sleep=time.sleep):
+        """Очереди ответов по аккаунтам; speed — множитель темпа."""
+        self.queues = defaultdict(deque)
+        for event in events:
+            self.queues[event['a']].append(event)
+        self.speed = speed
+        self.sleep = sleep
+        self.requests = 0
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        """Следующий записанный ответ для текущего аккаунта."""
+        key = homework.get_account_key()
+        if not self.queues[key]:
+            raise requests.ConnectionError(MISSING_RESPONSE.format(key=key))
+        event = self.queues[key].popleft()
+        self.requests += 1
+        if self.speed:
+            self.sleep(event['d'] / self.speed)
+        if event['s'] is None:
+            raise requests.ConnectionError(event['e'])
+        return ReplayResponse(event)
+
+
+class ReplayBot:
+    """Бот, который запоминает сообщения вместо отправки."""
+
+    def __init__(self):
+        """Бот без отправленных сообщений."""
+        self.messages = defaultdict(list)
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        """Сообщение записывается для сравнения с записью."""
+        self.messages[homework.get_account_key()].append(text)
+
+
+def compare_messages(recorded, replayed):
+    """Расхождения записанных и отправленных сообщений по аккаунтам."""
+    differences = []
+    for key in sorted(recorded.keys() | replayed.keys()):
+        expected, actual = recorded.get(key, []), replayed.get(key, [])
+        for index in range(max(len(expected), len(actual))):
+            pair = (
+                expected[index] if index < len(expected) else None,
+                actual[index] if index < len(actual) else None,
+            )
+            if pair[0] != pair[1]:
+                differences.append((key, *pair))
+    return differences
+
+
+def account_for(key):
+    """Аккаунт для контекста цикла опроса по ключу из записи."""
+    if key == homework.DEFAULT_ACCOUNT_KEY:
+        return None
+    return homework.Account(key, None, None)
+
+
+def replay(events, speed=None, sleep=time.sleep):
+    """Воспроизведение записи через цикл опроса бота.
+
+    Цикл запускается в момент каждого записанного запроса, который не
+    был израсходован повторами предыдущего цикла. Ошибки дедуплицируются
+    по виртуальным часам, идущим по времени записи. speed — множитель
+    темпа (1 — исходный), None — как можно быстрее.
+    """
+    api_events = [event for event in events if event['k'] == API_EVENT]
+    recorded = defaultdict(list)
+    for event in events:
+        if event['k'] == MESSAGE_EVENT:
+            recorded[event['a']].append(event['m'])
+    if not api_events:
+        return ReplayReport(0, 0, sum(map(len, recorded.values())), 0, [])
+    clock = VirtualClock(start=api_events[0]['t'])
+    session = ReplaySession(api_events, speed, sleep)
+    bot = ReplayBot()
+    states = {}
+    cycles = 0
+    saved_retry = homework.API_RETRY
+    homework.API_RETRY = RetryPolicy(
+        clock=clock.monotonic, sleep=clock.sleep
+    )
+    try:
+        with simulated_api(session, clock):
+            for event in api_events:
+                key = event['a']
+                queue = session.queues[key]
+                if not queue or queue[0] is not event:
+                    continue
+                if speed:
+                    sleep(max(0, event['t'] - clock.time()) / speed)
+                clock.now = max(clock.now, event['t'])
+                state = states.setdefault(key, homework.PollState(
+                    event['p']['from_date'], key=key, clock=clock
+                ))
+                token = homework.CURRENT_ACCOUNT.set(account_for(key))
+                try:
+                    homework.run_once(bot, state)
+                finally:
+                    homework.CURRENT_ACCOUNT.reset(token)
+                cycles += 1
+    finally:
+        homework.API_RETRY = saved_retry
+    return ReplayReport(
+        session.requests, cycles, sum(map(len, recorded.values())),
+        sum(map(len, bot.messages.values())),
+        compare_messages(recorded, bot.messages)
+    )
+
+
+def format_report(report):
+    """Текст отчёта о воспроизведении."""
+    lines = [REPORT.format(
+        requests=report.requests, cycles=report.cycles,
+        recorded=report.recorded, replayed=report.replayed,
+        different=len(report.differences)
+    )]
+    lines.extend(
+        DIFFERENCE_LOG.format(key=key, recorded=expected, replayed=actual)
+        for key, expected, actual in report.differences[:MAX_DIFFERENCES]
+    )
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    """Параметры воспроизведения из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('recording')
+    parser.add_argument('--speed', type=float)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Воспроизведение файла записи и отчёт о расхождениях."""
+    args = parse_args(argv)
+    # Ошибки из записи ожидаемы и попадают в отчёт.
+    logging.disable(logging.CRITICAL)
+    print(format_report(replay(read_recording(args.recording), args.speed)))
+
+
+if __name__ == '__main__':
+    main()
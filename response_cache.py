@@ -0,0 +1,84 @@
+import hashlib
+import json
+import threading
+from collections import namedtuple
+
+CacheEntry = namedtuple(
+    'CacheEntry',
+    ('params', 'etag', 'last_modified', 'digest', 'size', 'data')
+)
+
+
+def body_digest(body):
+    """Короткий хэш тела ответа."""
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+class ResponseCache:
+    """Последний ответ API для каждого аккаунта.
+
+    Если сервер прислал ETag или Last-Modified, следующий запрос с теми же
+    параметрами становится условным, и ответ 304 отдаётся из кэша. Иначе
+    при совпадении хэша тела повторный разбор JSON пропускается.
+
+    Счётчики: not_modified — ответы 304, unchanged — тела с тем же хэшем,
+    misses — разобранные ответы, bytes_saved — байты, которые сервер не
+    передал благодаря 304.
+    """
+
+    def __init__(self):
+        """Пустой кэш с нулевыми счётчиками."""
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.not_modified = 0
+        self.unchanged = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def _entry(self, key, params):
+        entry = self.entries.get(key)
+        if entry is None or entry.params != params:
+            return None
+        return entry
+
+    def request_headers(self, key, params):
+        """Заголовки условного запроса для аккаунта."""
+        entry = self._entry(key, params)
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def cached(self, key, params):
+        """Закэшированный ответ для 304 или None, если его нет."""
+        entry = self._entry(key, params)
+        if entry is None:
+            return None
+        with self.lock:
+            self.not_modified += 1
+            self.bytes_saved += entry.size
+        return entry.data
+
+    def parse(self, key, params, body, headers, loads=json.loads):
+        """Разбор тела ответа с пропуском, если тело не изменилось."""
+        digest = body_digest(body)
+        entry = self._entry(key, params)
+        if entry is not None and entry.digest == digest:
+            with self.lock:
+                self.unchanged += 1
+            return entry.data
+        data = loads(body)
+        self.entries[key] = CacheEntry(
+            params=dict(params),
+            etag=headers.get('ETag'),
+            last_modified=headers.get('Last-Modified'),
+            digest=digest,
+            size=len(body),
+            data=data,
+        )
+        with self.lock:
+            self.misses += 1
+        return data
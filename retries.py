@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+
+from deadlines import API_STAGE, CURRENT_DEADLINE
+from log_config import LazyMessage
+
+logger = logging.getLogger(__name__)
+
+API_MAX_ATTEMPTS = int(os.getenv('API_MAX_ATTEMPTS', 4))
+API_RETRY_BASE = float(os.getenv('API_RETRY_BASE', 1))
+API_RETRY_CAP = float(os.getenv('API_RETRY_CAP', 10))
+API_RETRY_BUDGET = float(os.getenv('API_RETRY_BUDGET', 30))
+RETRY_STATUSES = frozenset({
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+})
+
+RETRY_LOG = (
+    'Попытка {attempt} не удалась: {error}. Повтор через {delay:.1f} с.'
+)
+
+
+class TransientError(ConnectionError):
+    """Временный сбой, после которого запрос можно повторить.
+
+    retry_after — пауза из заголовка Retry-After, если сервер её указал.
+    """
+
+    def __init__(self, message, retry_after=None):
+        """Ошибка с паузой retry_after в секундах, которую просит сервер."""
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value, now=time.time):
+    """Пауза в секундах из заголовка Retry-After или None.
+
+    Заголовок содержит либо число секунд, либо HTTP-дату.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, moment.timestamp() - now())
+
+
+class RetryPolicy:
+    """Повтор идемпотентного запроса при временных сбоях.
+
+    Пауза между попытками растёт экспоненциально от base до cap со
+    случайным разбросом от нуля (full jitter); пауза из Retry-After
+    соблюдается без сокращения. Все попытки укладываются в budget секунд
+    с начала первой, а внутри цикла опроса — ещё и в часть его бюджета
+    для запроса к API: если следующая попытка не успевает, поднимается
+    последняя ошибка, и цикл опроса не сдвигается.
+    """
+
+    def __init__(
+        self, attempts=API_MAX_ATTEMPTS, base=API_RETRY_BASE,
+        cap=API_RETRY_CAP, budget=API_RETRY_BUDGET, clock=time.monotonic,
+        sleep=time.sleep, jitter=random.random
+    ):
+        """Не больше attempts попыток за budget секунд."""
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+        self.budget = budget
+        self.clock = clock
+        self.sleep = sleep
+        self.jitter = jitter
+
+    def next_delay(self, attempt, error, deadline):
+        """Пауза перед следующей попыткой или None, если повтора не будет."""
+        if attempt >= self.attempts:
+            return None
+        if error.retry_after is not None:
+            delay = error.retry_after
+        else:
+            delay = self.jitter() * min(
+                self.cap, self.base * 2 ** (attempt - 1)
+            )
+        if self.clock() + delay > deadline:
+            return None
+        loop_deadline = CURRENT_DEADLINE.get()
+        if (
+            loop_deadline is not None
+            and delay >= loop_deadline.remaining(API_STAGE)
+        ):
+            return None
+        logger.warning(LazyMessage(
+            RETRY_LOG, attempt=attempt, error=error, delay=delay
+        ))
+        return delay
+
+    def call(self, request):
+        """Вызов request() с повторами при TransientError."""
+        deadline = self.clock() + self.budget
+        attempt = 1
+        while True:
+            try:
+                return request()
+            except TransientError as error:
+                delay = self.next_delay(attempt, error, deadline)
+                if delay is None:
+                    raise
+            self.sleep(delay)
+            attempt += 1
+
+    async def call_async(self, request):
+        """Асинхронный аналог call для корутинной функции request."""
+        deadline = self.clock() + self.budget
+        attempt = 1
+        while True:
+            try:
+                return await request()
+            except TransientError as error:
+                delay = self.next_delay(attempt, error, deadline)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -0,0 +1,220 @@
+import hashlib
+import heapq
+import itertools
+import logging
+import os
+import time
+
+from log_config import LazyMessage
+from metrics import SCHEDULE_DRIFT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+MIN_RETRY_PERIOD = int(os.getenv('MIN_RETRY_PERIOD', 60))
+MAX_RETRY_PERIOD = int(os.getenv('MAX_RETRY_PERIOD', 3600))
+REVIEWING_RETRY_PERIOD = int(os.getenv('REVIEWING_RETRY_PERIOD', 120))
+BACKOFF_FACTOR = 2
+REVIEWING_STATUS = 'reviewing'
+SCHEDULE_JITTER = float(os.getenv('SCHEDULE_JITTER', 0.05))
+
+REASON_UPDATE = 'update'
+REASON_REVIEWING = 'reviewing'
+REASON_IDLE = 'idle'
+REASON_ERROR = 'error'
+REASONS = {
+    REASON_UPDATE: 'получены новые статусы',
+    REASON_REVIEWING: 'работа на проверке',
+    REASON_IDLE: 'нет изменений {count} раз подряд',
+    REASON_ERROR: 'ошибка {count} раз подряд',
+}
+INTERVAL_LOG = 'Следующий опрос через {interval} с: {reason}.'
+SCHEDULE_REPORT = (
+    'Планировщик: опросов {polls}, дрейф p50 {median:.3f} с, '
+    'max {maximum:.3f} с, пик одновременных опросов {peak}.'
+)
+
+
+class AdaptiveInterval:
+    """Интервал опроса, зависящий от результата предыдущего цикла.
+
+    Пока работа на проверке, опрос учащается до REVIEWING_RETRY_PERIOD.
+    После повторных ошибок или циклов без изменений интервал растёт
+    экспоненциально от base. Результат всегда лежит в [minimum, maximum].
+    """
+
+    def __init__(
+        self, base, minimum=MIN_RETRY_PERIOD, maximum=MAX_RETRY_PERIOD,
+        reviewing=REVIEWING_RETRY_PERIOD, factor=BACKOFF_FACTOR
+    ):
+        """Интервал с базовым значением base секунд."""
+        self.base = base
+        self.minimum = minimum
+        self.maximum = maximum
+        self.reviewing = reviewing
+        self.factor = factor
+        self.errors = 0
+        self.idle = 0
+        self.in_review = False
+        self.reason = None
+
+    def _backoff(self, count):
+        return self.base * self.factor ** (count - 1)
+
+    def next_interval(self, homeworks):
+        """Интервал до следующего опроса.
+
+        homeworks — новые работы из ответа API; None, если цикл
+        завершился ошибкой.
+        """
+        if homeworks is None:
+            self.errors += 1
+            self.idle = 0
+            self.reason = REASON_ERROR
+            interval = self._backoff(self.errors)
+        elif homeworks:
+            self.errors = self.idle = 0
+            self.in_review = any(
+                homework.get('status') == REVIEWING_STATUS
+                for homework in homeworks
+            )
+            self.reason = REASON_UPDATE
+            interval = self.base
+        else:
+            self.errors = 0
+            self.idle += 1
+            self.reason = REASON_IDLE
+            interval = self._backoff(self.idle)
+        if self.in_review and self.reason != REASON_ERROR:
+            self.reason = REASON_REVIEWING
+            interval = self.reviewing
+        interval = min(self.maximum, max(self.minimum, interval))
+        logger.debug(LazyMessage(
+            INTERVAL_LOG, interval=interval, reason=self.describe()
+        ))
+        return interval
+
+    def describe(self):
+        """Человекочитаемая причина выбора последнего интервала."""
+        count = self.errors if self.reason == REASON_ERROR else self.idle
+        return REASONS[self.reason].format(count=count)
+
+
+def unit_hash(*parts):
+    """Детерминированное число из [0, 1) по строковым частям."""
+    digest = hashlib.blake2b(
+        '\0'.join(map(str, parts)).encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, 'big') / 2 ** 64
+
+
+def spread_offsets(keys, period):
+    """Смещения первых опросов, равномерно распределённые по period.
+
+    Ключи упорядочиваются по хэшу, и каждый получает свой слот длиной
+    period / n со смещением внутри слота, тоже зависящим от хэша. Один и
+    тот же набор ключей всегда даёт одно и то же расписание.
+    """
+    keys = sorted(keys, key=unit_hash)
+    slot = period / max(1, len(keys))
+    return {
+        key: (position + unit_hash(key, 'slot')) * slot
+        for position, key in enumerate(keys)
+    }
+
+
+class PollScheduler:
+    """Расписание опросов множества аккаунтов на куче.
+
+    Первые опросы распределяются по period через spread_offsets, дальше
+    каждый аккаунт переносится на свою паузу со случайным, но
+    детерминированным разбросом ±jitter / 2, чтобы аккаунты с одинаковым
+    интервалом не собирались в одну секунду. Добавление и извлечение
+    аккаунта — O(log n).
+
+    Дрейф — насколько позже запланированного аккаунт извлечён из
+    расписания; пик — наибольшее число аккаунтов, извлечённых и ещё не
+    перенесённых обратно, то есть опросов, выполняемых одновременно.
+    """
+
+    def __init__(
+        self, period, jitter=SCHEDULE_JITTER, key=str, clock=time.monotonic
+    ):
+        """Пустое расписание с периодом period секунд."""
+        self.period = period
+        self.jitter = jitter
+        self.key = key
+        self.clock = clock
+        self.heap = []
+        self.sequence = itertools.count()
+        self.rounds = {}
+        self.in_flight = set()
+        self.peak = 0
+        self.drifts = []
+
+    def __len__(self):
+        """Число аккаунтов в расписании, включая опрашиваемые."""
+        return len(self.heap) + len(self.in_flight)
+
+    def _push(self, item, due):
+        heapq.heappush(self.heap, (due, next(self.sequence), item))
+
+    def spread(self, items):
+        """Добавление аккаунтов с первыми опросами по всему period."""
+        now = self.clock()
+        items = {self.key(item): item for item in items}
+        for key, offset in spread_offsets(items, self.period).items():
+            self.rounds[key] = 0
+            self._push(items[key], now + offset)
+
+    def next_due(self):
+        """Момент ближайшего опроса или None, если расписание пусто."""
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, limit=None):
+        """Аккаунты, время опроса которых наступило, не больше limit."""
+        now = self.clock()
+        ready = []
+        while (
+            self.heap and self.heap[0][0] <= now
+            and (limit is None or len(ready) < limit)
+        ):
+            due, _, item = heapq.heappop(self.heap)
+            drift = now - due
+            self.drifts.append(drift)
+            SCHEDULE_DRIFT_SECONDS.observe(drift)
+            self.in_flight.add(item)
+            ready.append(item)
+        self.peak = max(self.peak, len(self.in_flight))
+        return ready
+
+    def discard(self, item):
+        """Удаление аккаунта из расписания.
+
+        Аккаунт, который сейчас опрашивается, после опроса не переносится.
+        """
+        self.in_flight.discard(item)
+        self.heap = [entry for entry in self.heap if entry[2] != item]
+        heapq.heapify(self.heap)
+        self.rounds.pop(self.key(item), None)
+
+    def reschedule(self, item, delay):
+        """Перенос опрошенного аккаунта на delay секунд с разбросом."""
+        if item not in self.in_flight:
+            return
+        key = self.key(item)
+        self.rounds[key] = self.rounds.get(key, 0) + 1
+        factor = 1 + self.jitter * (unit_hash(key, self.rounds[key]) - 0.5)
+        self.in_flight.discard(item)
+        self._push(item, self.clock() + delay * factor)
+
+    def report(self):
+        """Сводка дрейфа и пика с момента прошлой сводки."""
+        drifts = sorted(self.drifts)
+        message = LazyMessage(
+            SCHEDULE_REPORT, polls=len(drifts),
+            median=drifts[len(drifts) // 2] if drifts else 0.0,
+            maximum=drifts[-1] if drifts else 0.0, peak=self.peak
+        )
+        self.drifts = []
+        self.peak = len(self.in_flight)
+        return message
@@ -0,0 +1,272 @@
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+import accounts
+import homework
+from homework import CURRENT_ACCOUNT
+from log_config import LOG_FILE, LazyMessage, setup_logging
+from metrics import METRICS_PORT
+from outbound import GLOBAL_RATE
+
+logger = logging.getLogger(__name__)
+
+WORKER_PROCESSES = int(os.getenv('WORKER_PROCESSES', os.cpu_count() or 1))
+RING_REPLICAS = 100
+START_METHOD = os.getenv('WORKER_START_METHOD', 'spawn')
+RESTART_DELAY = 1
+MAX_RESTART_DELAY = 60
+STABLE_UPTIME = 60
+WATCH_INTERVAL = 1
+
+WORKER_STARTED_LOG = 'Запущен процесс {name} (pid {pid}), аккаунтов: {count}.'
+WORKER_EXITED_LOG = (
+    'Процесс {name} завершился с кодом {exitcode}, '
+    'перезапуск через {delay} с.'
+)
+RESIZE_LOG = 'Число процессов: {old} -> {new}, перенесено аккаунтов: {moved}.'
+
+
+def ring_hash(value):
+    """Позиция значения на кольце."""
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+class HashRing:
+    """Кольцо согласованного хэширования аккаунтов по процессам.
+
+    Каждый процесс занимает replicas точек на кольце, аккаунт достаётся
+    процессу с ближайшей точкой по часовой стрелке. При изменении числа
+    процессов с N на N + 1 переезжает около 1 / (N + 1) аккаунтов.
+    """
+
+    def __init__(self, nodes, replicas=RING_REPLICAS):
+        """Кольцо из replicas точек на каждый процесс из nodes."""
+        points = sorted(
+            (ring_hash(f'{node}#{replica}'), node)
+            for node in nodes for replica in range(replicas)
+        )
+        self.hashes = [point for point, _ in points]
+        self.nodes = [node for _, node in points]
+
+    def node_for(self, key):
+        """Процесс, которому принадлежит ключ."""
+        index = bisect.bisect(self.hashes, ring_hash(key))
+        return self.nodes[index % len(self.nodes)]
+
+
+def assign_shards(items, workers, key=str):
+    """Разбиение аккаунтов на workers частей согласованным хэшированием."""
+    ring = HashRing(range(workers))
+    shards = {index: [] for index in range(workers)}
+    for item in items:
+        shards[ring.node_for(key(item))].append(item)
+    return shards
+
+
+def shard_log_file(index, log_file=LOG_FILE):
+    """Отдельный файл журнала для процесса: bot.log -> bot.0.log."""
+    if not log_file:
+        return log_file
+    root, extension = os.path.splitext(log_file)
+    return f'{root}.{index}{extension}'
+
+
+def run_shard(shard, index, workers, control):
+    """Опрос части аккаунтов в процессе-исполнителе.
+
+    Лимит Telegram делится между процессами поровну, метрики каждого
+    процесса доступны на своём порту METRICS_PORT + 1 + index. Из канала
+    control приходят новые пары (часть аккаунтов, число процессов) при
+    изменении числа процессов.
+    """
+    setup_logging(CURRENT_ACCOUNT, log_file=shard_log_file(index))
+
+    def assignments():
+        update = None
+        while control.poll():
+            items, count = control.recv()
+            update = (items, GLOBAL_RATE / count)
+        return update
+
+    accounts.serve(
+        shard, global_rate=GLOBAL_RATE / workers,
+        metrics_port=METRICS_PORT + 1 + index, assignments=assignments
+    )
+
+
+class Supervisor:
+    """Процесс-надсмотрщик над исполнителями, каждый со своей частью.
+
+    Упавший исполнитель перезапускается: пауза перед перезапуском
+    удваивается, если процесс не проработал STABLE_UPTIME секунд.
+    При изменении числа процессов работающие исполнители не
+    перезапускаются: новая часть аккаунтов и доля лимита Telegram
+    передаются им через канал управления, и они продолжают опрос
+    оставшихся аккаунтов с прежним состоянием. Останавливаются только
+    исполнители, которым не осталось аккаунтов.
+    """
+
+    def __init__(
+        self, items, workers=WORKER_PROCESSES, target=run_shard,
+        key=str, context=None, clock=time.monotonic
+    ):
+        """Разбиение items на workers частей; процессы ещё не запущены."""
+        self.items = items
+        self.target = target
+        self.key = key
+        self.context = context or multiprocessing.get_context(START_METHOD)
+        self.clock = clock
+        self.workers = workers
+        self.shards = assign_shards(items, workers, key)
+        self.processes = {}
+        self.controls = {}
+        self.started = {}
+        self.delays = {}
+        self.restart_at = {}
+
+    def start_worker(self, index):
+        """Запуск исполнителя для части index."""
+        shard = self.shards[index]
+        receiver, sender = self.context.Pipe(duplex=False)
+        process = self.context.Process(
+            target=self.target, args=(shard, index, self.workers, receiver),
+            name=f'shard-{index}', daemon=True
+        )
+        process.start()
+        receiver.close()
+        self.processes[index] = process
+        self.controls[index] = sender
+        self.started[index] = self.clock()
+        self.restart_at.pop(index, None)
+        logger.info(LazyMessage(
+            WORKER_STARTED_LOG, name=process.name, pid=process.pid,
+            count=len(shard)
+        ))
+
+    def stop_worker(self, index):
+        """Остановка исполнителя части index."""
+        process = self.processes.pop(index, None)
+        self.restart_at.pop(index, None)
+        control = self.controls.pop(index, None)
+        if control is not None:
+            control.close()
+        if process is not None and process.is_alive():
+            process.terminate()
+            process.join()
+
+    def start(self):
+        """Запуск всех исполнителей."""
+        for index, shard in self.shards.items():
+            if shard:
+                self.start_worker(index)
+        return self
+
+    def check(self):
+        """Перезапуск упавших исполнителей, когда истекла их пауза."""
+        now = self.clock()
+        for index, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            if index not in self.restart_at:
+                delay = self.delays.get(index, RESTART_DELAY)
+                if now - self.started[index] >= STABLE_UPTIME:
+                    delay = RESTART_DELAY
+                self.delays[index] = min(MAX_RESTART_DELAY, delay * 2)
+                self.restart_at[index] = now + delay
+                logger.error(LazyMessage(
+                    WORKER_EXITED_LOG, name=process.name,
+                    exitcode=process.exitcode, delay=delay
+                ))
+            elif now >= self.restart_at[index]:
+                self.start_worker(index)
+
+    def resize(self, workers):
+        """Новое число исполнителей с минимальным переносом аккаунтов."""
+        if workers < 1 or workers == self.workers:
+            return
+        shards = assign_shards(self.items, workers, self.key)
+        owners = {
+            self.key(item): index
+            for index, shard in self.shards.items() for item in shard
+        }
+        moved = sum(
+            owners[self.key(item)] != index
+            for index, shard in shards.items() for item in shard
+        )
+        logger.info(LazyMessage(
+            RESIZE_LOG, old=self.workers, new=workers, moved=moved
+        ))
+        self.workers = workers
+        self.shards = shards
+        for index in list(self.processes):
+            if shards.get(index):
+                self.reassign(index)
+            else:
+                self.stop_worker(index)
+        for index, shard in shards.items():
+            if shard and index not in self.processes:
+                self.delays.pop(index, None)
+                self.start_worker(index)
+
+    def reassign(self, index):
+        """Передача исполнителю его новой части и числа процессов.
+
+        Упавший исполнитель сообщение не получит, но при перезапуске
+        возьмёт новую часть.
+        """
+        try:
+            self.controls[index].send((self.shards[index], self.workers))
+        except OSError:
+            pass
+
+    def stop(self):
+        """Остановка всех исполнителей."""
+        for index in list(self.processes):
+            self.stop_worker(index)
+
+
+def main():
+    """Опрос аккаунтов из файла в WORKER_PROCESSES процессах.
+
+    SIGTTIN добавляет процесс, SIGTTOU убирает один процесс.
+    """
+    if not homework.TELEGRAM_TOKEN:
+        logger.critical(LazyMessage(
+            homework.CRITICAL_MISSING_TOKENS,
+            missing_tokens=['TELEGRAM_TOKEN']
+        ))
+        return
+    path = sys.argv[1] if len(sys.argv) > 1 else accounts.ACCOUNTS_FILE
+    items = accounts.load_accounts(path)
+    supervisor = Supervisor(items, key=lambda account: account.name).start()
+    requested = [supervisor.workers]
+
+    def grow(signum, frame):
+        requested[0] += 1
+
+    def shrink(signum, frame):
+        requested[0] = max(1, requested[0] - 1)
+
+    signal.signal(signal.SIGTTIN, grow)
+    signal.signal(signal.SIGTTOU, shrink)
+    try:
+        while True:
+            supervisor.resize(requested[0])
+            supervisor.check()
+            time.sleep(WATCH_INTERVAL)
+    finally:
+        supervisor.stop()
+
+
+if __name__ == '__main__':
+    setup_logging(CURRENT_ACCOUNT)
+
+    main()
@@ -0,0 +1,258 @@
+"""Симуляция основного цикла бота на виртуальных часах.
+
+Сценарий — JSON-список событий со временем в секундах от начала:
+
+    [
+        {"at": 3600, "homework_name": "hw1.zip", "status": "reviewing"},
+        {"at": 90000, "outage": 1800},
+        {"at": 180000, "homework_name": "hw1.zip", "status": "approved"}
+    ]
+
+Событие со status меняет статус работы, событие с outage делает API
+недоступным (ответ 500) на outage секунд. Цикл опроса идёт через
+run_once, а паузы между циклами переводят виртуальные часы, поэтому
+недели опроса раз в 600 секунд укладываются в секунды:
+
+    python simulation.py timeline.json --days 14
+"""
+import argparse
+import json
+import logging
+import sys
+from collections import namedtuple
+from contextlib import contextmanager
+from http import HTTPStatus
+
+import homework
+from circuit_breaker import CircuitBreaker
+
+START_TIME = 1700000000
+DAY = 24 * 60 * 60
+DEFAULT_TIMELINE = [
+    {'at': 2 * 60 * 60, 'homework_name': 'hw1.zip', 'status': 'reviewing'},
+    {'at': 26 * 60 * 60, 'homework_name': 'hw1.zip', 'status': 'rejected'},
+    {'at': 30 * 60 * 60, 'outage': 3 * 60 * 60},
+    {'at': 50 * 60 * 60, 'homework_name': 'hw1.zip', 'status': 'reviewing'},
+    {'at': 75 * 60 * 60, 'homework_name': 'hw1.zip', 'status': 'approved'},
+]
+
+REPORT = (
+    'Смоделировано {days:.1f} сут. за {cycles} циклов опроса.\n'
+    'Запросов к API: {requests}, из них с ошибкой: {failed}.\n'
+    'Сообщений в Telegram: {messages}, из них об ошибках: {errors}.\n'
+    'Доставлено изменений статуса: {delivered} из {changes}, '
+    'задержка доставки: средняя {mean_delay:.0f} с, '
+    'максимальная {max_delay:.0f} с.'
+)
+
+Change = namedtuple('Change', 'at homework_name status')
+Outage = namedtuple('Outage', 'start end')
+SimulationReport = namedtuple(
+    'SimulationReport',
+    'duration cycles requests failed messages errors delays changes'
+)
+
+
+class VirtualClock:
+    """Часы, которые идут только при вызове sleep или advance.
+
+    Совместимы с модулем time в части time, monotonic и sleep.
+    """
+
+    def __init__(self, start=START_TIME):
+        """Часы, показывающие start секунд эпохи."""
+        self.now = start
+
+    def time(self):
+        """Текущее виртуальное время в секундах эпохи."""
+        return self.now
+
+    monotonic = time
+
+    def sleep(self, seconds):
+        """Перевод часов вперёд вместо ожидания."""
+        self.now += seconds
+
+    advance = sleep
+
+
+def load_timeline(events):
+    """Изменения статусов и перерывы API из списка событий сценария."""
+    changes = []
+    outages = []
+    for event in events:
+        if 'outage' in event:
+            outages.append(Outage(event['at'], event['at'] + event['outage']))
+        else:
+            changes.append(Change(
+                event['at'], event['homework_name'], event['status']
+            ))
+    return sorted(changes), sorted(outages)
+
+
+class SimulatedResponse:
+    """Ответ API в объёме, который читает get_api_answer."""
+
+    def __init__(self, status_code, data):
+        """Ответ со статусом status_code и телом data."""
+        self.status_code = status_code
+        self.headers = {}
+        self.data = data
+
+    def json(self):
+        """Тело ответа."""
+        return self.data
+
+
+class SimulatedApi:
+    """API Практикума по сценарию: работы, изменённые после from_date.
+
+    Подставляется в homework.HTTP_SESSION и отвечает без сети.
+    """
+
+    def __init__(self, clock, changes, outages, start):
+        """API по сценарию, отсчитываемому от момента start."""
+        self.clock = clock
+        self.changes = changes
+        self.outages = outages
+        self.start = start
+        self.requests = 0
+        self.failed = 0
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        """Ответ на запрос статусов в текущий момент виртуального времени."""
+        self.requests += 1
+        elapsed = self.clock.time() - self.start
+        if any(outage.start <= elapsed < outage.end
+               for outage in self.outages):
+            self.failed += 1
+            return SimulatedResponse(
+                HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'outage'}
+            )
+        from_date = params['from_date'] - self.start
+        latest = {}
+        for change in self.changes:
+            if change.at > elapsed:
+                break
+            if change.at >= from_date:
+                latest[change.homework_name] = change
+        return SimulatedResponse(HTTPStatus.OK, {
+            'homeworks': [
+                {
+                    'id': index,
+                    'homework_name': change.homework_name,
+                    'status': change.status,
+                    'date_updated': int(self.start + change.at),
+                }
+                for index, change in enumerate(latest.values())
+            ],
+            'current_date': int(self.clock.time()),
+        })
+
+
+class SimulatedBot:
+    """Бот, который запоминает сообщения с виртуальным временем отправки."""
+
+    def __init__(self, clock):
+        """Бот без сообщений, время отправки — по часам clock."""
+        self.clock = clock
+        self.messages = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        """Сообщение записывается вместо отправки."""
+        self.messages.append((self.clock.time(), text))
+
+
+def delivery_delays(changes, messages, start):
+    """Задержки доставки изменений статуса в секундах."""
+    delays = []
+    for change in changes:
+        expected = homework.INFO_STATUS_CHANGE.format(
+            homework_name=change.homework_name,
+            verdict=homework.HOMEWORK_VERDICTS[change.status]
+        )
+        for sent_at, text in messages:
+            if sent_at - start >= change.at and expected in text.split('\n'):
+                delays.append(sent_at - start - change.at)
+                break
+    return delays
+
+
+@contextmanager
+def simulated_api(api, clock):
+    """Подмена сетевых настроек homework на время симуляции."""
+    saved = (
+        homework.HTTP_SESSION, homework.RESPONSE_CACHE, homework.API_BREAKER,
+        homework.LEASES, homework.RECORDER
+    )
+    homework.HTTP_SESSION = api
+    homework.RESPONSE_CACHE = None
+    homework.API_BREAKER = CircuitBreaker('simulation', clock=clock.monotonic)
+    homework.LEASES = None
+    homework.RECORDER = None
+    try:
+        yield
+    finally:
+        (
+            homework.HTTP_SESSION, homework.RESPONSE_CACHE,
+            homework.API_BREAKER, homework.LEASES, homework.RECORDER
+        ) = saved
+
+
+def simulate(events, duration, clock=None):
+    """Прогон цикла опроса по сценарию на duration виртуальных секунд."""
+    clock = clock or VirtualClock()
+    start = clock.time()
+    changes, outages = load_timeline(events)
+    api = SimulatedApi(clock, changes, outages, start)
+    bot = SimulatedBot(clock)
+    state = homework.PollState(timestamp=int(start), clock=clock)
+    cycles = 0
+    with simulated_api(api, clock):
+        while clock.time() - start < duration:
+            clock.sleep(homework.run_once(bot, state))
+            cycles += 1
+    errors = sum(
+        text.startswith(homework.ERROR_MESSAGE.split('{')[0])
+        for _, text in bot.messages
+    )
+    return SimulationReport(
+        duration, cycles, api.requests, api.failed, len(bot.messages),
+        errors, delivery_delays(changes, bot.messages, start), len(changes)
+    )
+
+
+def format_report(report):
+    """Текст отчёта о симуляции."""
+    delays = report.delays or [0]
+    return REPORT.format(
+        days=report.duration / DAY, cycles=report.cycles,
+        requests=report.requests, failed=report.failed,
+        messages=report.messages, errors=report.errors,
+        delivered=len(report.delays), changes=report.changes,
+        mean_delay=sum(delays) / len(delays), max_delay=max(delays)
+    )
+
+
+def parse_args(argv=None):
+    """Параметры симуляции из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('timeline', nargs='?')
+    parser.add_argument('--days', type=float, default=7)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Симуляция по сценарию из файла или по встроенному сценарию."""
+    args = parse_args(argv)
+    # Ошибки во время перерывов API ожидаемы и попадают в отчёт.
+    logging.disable(logging.CRITICAL)
+    events = DEFAULT_TIMELINE
+    if args.timeline:
+        with open(args.timeline) as timeline:
+            events = json.load(timeline)
+    print(format_report(simulate(events, args.days * DAY)))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
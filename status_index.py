@@ -0,0 +1,80 @@
+import os
+import threading
+from collections import OrderedDict
+
+from records import intern_status
+
+STATUS_INDEX_SIZE = int(os.getenv('STATUS_INDEX_SIZE', 256))
+INDEX_TOTALS = {'hits': 0, 'misses': 0}
+INDEX_TOTALS_LOCK = threading.Lock()
+
+
+class StatusIndex:
+    """Последние известные (status, date_updated) работ по их id.
+
+    Размер ограничен capacity: при переполнении вытесняются работы,
+    которые дольше всех не встречались в ответах API (LRU). Строки
+    статусов общие для всех записей, в том числе восстановленных из
+    контрольной точки, где SQLite возвращает новую строку на каждую строку
+    таблицы.
+    hits — сколько записей отброшено как неизменившиеся,
+    misses — сколько пропущено дальше как новые или изменившиеся.
+    INDEX_TOTALS суммирует оба счётчика по всем индексам процесса.
+    """
+
+    def __init__(self, capacity=STATUS_INDEX_SIZE):
+        """Пустой индекс не больше чем на capacity работ."""
+        self.capacity = capacity
+        self.records = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        """Число работ в индексе."""
+        return len(self.records)
+
+    def __contains__(self, homework_id):
+        """Есть ли работа в индексе."""
+        return homework_id in self.records
+
+    def get(self, homework_id):
+        """Запись о работе или None."""
+        return self.records.get(homework_id)
+
+    def changed(self, homeworks):
+        """Работы, статус которых отличается от известного."""
+        result = []
+        hits = 0
+        for homework in homeworks:
+            homework_id = homework.get('id')
+            record = self.records.get(homework_id)
+            if record is not None:
+                self.records.move_to_end(homework_id)
+                if record == (
+                    homework.get('status'), homework.get('date_updated')
+                ):
+                    hits += 1
+                    continue
+            result.append(homework)
+        self.hits += hits
+        self.misses += len(result)
+        with INDEX_TOTALS_LOCK:
+            INDEX_TOTALS['hits'] += hits
+            INDEX_TOTALS['misses'] += len(result)
+        return result
+
+    def put(self, homework_id, status, date_updated=None):
+        """Запоминание записи с вытеснением самой старой."""
+        self.records[homework_id] = (intern_status(status), date_updated)
+        self.records.move_to_end(homework_id)
+        while len(self.records) > self.capacity:
+            self.records.popitem(last=False)
+
+    def remember(self, homeworks):
+        """Запоминание статусов отправленных работ."""
+        for homework in homeworks:
+            if 'id' in homework:
+                self.put(
+                    homework['id'], homework['status'],
+                    homework.get('date_updated')
+                )
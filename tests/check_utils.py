@@ -1,6 +1,7 @@
 import logging
 import signal
 import re
+import threading
 from collections import namedtuple
 from contextlib import contextmanager
 from functools import wraps
@@ -116,6 +117,42 @@ class MockTelegramBot:
         self.text = text
 
 
+class RecordingBot(MockTelegramBot):
+    """Bot that records (chat_id, text) of sent messages.
+
+    Exceptions from `failures` are raised by the first sends in order.
+    """
+
+    def __init__(self, *args, failures=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failures = list(failures)
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if self.failures:
+            raise self.failures.pop(0)
+        super().send_message(chat_id, text, **kwargs)
+        with self.lock:
+            self.sent.append((chat_id, text))
+        return True
+
+
+class FakeClock:
+    """Manually advanced clock: call it for time, `sleep` moves it on."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
 class BreakInfiniteLoop(BaseException):
     pass
 
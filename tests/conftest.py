@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 import pytest_timeout
 
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -19,6 +20,8 @@ if (
         f'с домашней работой `{HOMEWORK_FILENAME}`. '
     )
 
+from tests.check_utils import FakeClock  # noqa: E402
+
 pytest_plugins = [
     'tests.fixtures.fixture_data'
 ]
@@ -53,3 +56,8 @@ pytest_timeout.write = write_timeout_reasons
 os.environ['PRACTICUM_TOKEN'] = 'sometoken'
 os.environ['TELEGRAM_TOKEN'] = '1234:abcdefg'
 os.environ['TELEGRAM_CHAT_ID'] = '12345'
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
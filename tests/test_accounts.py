@@ -0,0 +1,170 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http import HTTPStatus
+from operator import attrgetter
+
+import pytest
+import requests
+
+import accounts
+import homework
+import tests.check_utils as check_utils
+from scheduling import PollScheduler
+
+
+@pytest.fixture
+def accounts_file(tmp_path):
+    path = tmp_path / 'accounts.json'
+    path.write_text(json.dumps([
+        {'name': 'alice', 'practicum_token': 'token-a', 'chat_id': 1},
+        {'practicum_token': 'token-b', 'chat_id': 2},
+    ]), encoding='utf-8')
+    return path
+
+
+def test_load_accounts(accounts_file):
+    loaded = accounts.load_accounts(accounts_file)
+    assert loaded == [
+        homework.Account('alice', 'token-a', 1),
+        homework.Account('1', 'token-b', 2),
+    ]
+
+
+def test_load_accounts_missing_key(tmp_path):
+    path = tmp_path / 'accounts.json'
+    path.write_text(json.dumps([{'chat_id': 1}]), encoding='utf-8')
+    with pytest.raises(KeyError):
+        accounts.load_accounts(path)
+
+
+@pytest.mark.parametrize('items', [
+    [{'name': 'alice'}, {'name': 'alice'}],
+    [{}, {'name': '0'}],
+])
+def test_load_accounts_rejects_duplicate_names(tmp_path, items):
+    path = tmp_path / 'accounts.json'
+    path.write_text(json.dumps([
+        {'practicum_token': 'token', 'chat_id': index, **item}
+        for index, item in enumerate(items)
+    ]), encoding='utf-8')
+    with pytest.raises(ValueError):
+        accounts.load_accounts(path)
+
+
+def test_poll_account_uses_account_token_and_chat(
+        monkeypatch, accounts_file, data_with_new_hw_status
+):
+    seen_headers = []
+
+    def mock_get(*args, **kwargs):
+        seen_headers.append(kwargs['headers']['Authorization'])
+        return check_utils.MockResponseGET(
+            *args, http_status=HTTPStatus.OK,
+            data=data_with_new_hw_status, **kwargs
+        )
+
+    monkeypatch.setattr(requests, 'get', mock_get)
+    bot = check_utils.RecordingBot()
+    states = {
+        account: homework.PollState(0)
+        for account in accounts.load_accounts(accounts_file)
+    }
+    scheduler = PollScheduler(0, key=attrgetter('name'))
+    scheduler.spread(states)
+    running = {}
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        accounts.submit_due(
+            executor, scheduler, running,
+            partial(accounts.poll_account, bot), states, 2
+        )
+        while running:
+            accounts.collect_done(scheduler, running, 1)
+
+    assert not scheduler.in_flight
+    assert sorted(seen_headers) == ['OAuth token-a', 'OAuth token-b']
+    assert sorted(chat_id for chat_id, _ in bot.sent) == [1, 2]
+    current_date = data_with_new_hw_status['current_date']
+    assert all(
+        state.timestamp == current_date for state in states.values()
+    )
+    assert homework.CURRENT_ACCOUNT.get() is None
+
+
+STATES = {'slow': None, 'fast': None}
+
+
+def test_slow_account_does_not_block_others():
+    clock = check_utils.FakeClock()
+    scheduler = PollScheduler(10, jitter=0, clock=clock)
+    scheduler.spread(['slow', 'fast'])
+    release = threading.Event()
+    polls = []
+
+    def poll(account, state):
+        polls.append(account)
+        if account == 'slow':
+            release.wait(5)
+        return 10
+
+    running = {}
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        clock.now = 10
+        accounts.submit_due(
+            executor, scheduler, running, poll, STATES, 2
+        )
+        accounts.collect_done(scheduler, running, timeout=5)
+        assert list(running.values()) == ['slow']
+        assert accounts.wait_timeout(scheduler, running, 2) == 10
+        clock.now = 20
+        accounts.submit_due(
+            executor, scheduler, running, poll, STATES, 2
+        )
+        accounts.collect_done(scheduler, running, timeout=5)
+        release.set()
+        accounts.collect_done(scheduler, running, timeout=5)
+
+    assert polls.count('fast') == 2
+    assert polls.count('slow') == 1
+    assert running == {}
+    assert scheduler.report().kwargs['peak'] == 2
+
+
+def test_wait_timeout_when_pool_is_busy():
+    clock = check_utils.FakeClock()
+    scheduler = PollScheduler(10, clock=clock)
+    scheduler.spread(['a'])
+    assert accounts.wait_timeout(scheduler, {'future': 'b'}, 1) is None
+    clock.now = 100
+    assert accounts.wait_timeout(scheduler, {}, 1) == 0
+    assert accounts.wait_timeout(scheduler, {'future': 'b'}, 1, cap=2) == 2
+
+
+def test_assign_keeps_schedule_of_remaining_accounts():
+    clock = check_utils.FakeClock()
+    scheduler = PollScheduler(10, clock=clock, key=attrgetter('name'))
+    states = {}
+    alice, bob, carol = (
+        homework.Account(name, 'token', index)
+        for index, name in enumerate(['alice', 'bob', 'carol'])
+    )
+    accounts.assign(scheduler, states, [alice, bob])
+    alice_state = states[alice]
+    clock.now = 10
+    assert sorted(scheduler.pop_due(), key=attrgetter('name')) == [alice, bob]
+    scheduler.reschedule(alice, 10)
+    accounts.assign(scheduler, states, [alice, carol])
+    assert states[alice] is alice_state
+    assert set(states) == {alice, carol}
+    scheduler.reschedule(bob, 10)
+    assert len(scheduler) == 2
+    clock.now = 30
+    assert sorted(scheduler.pop_due(), key=attrgetter('name')) == [
+        alice, carol
+    ]
+
+
+def test_run_accounts_without_accounts_returns(monkeypatch):
+    monkeypatch.setattr(accounts, 'open_store', lambda: None)
+    assert accounts.run_accounts(check_utils.RecordingBot(), []) is None
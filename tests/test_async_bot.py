@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+import homework
+from fake_servers import (HOMEWORK_STATUSES_PATH, HomeworkStatusesHandler,
+                          server_url, start_server)
+
+async_bot = pytest.importorskip('async_bot')
+
+
+class RecordingAsyncBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+@pytest.fixture
+def local_endpoint(monkeypatch):
+    server = start_server(HomeworkStatusesHandler)
+    monkeypatch.setattr(
+        homework, 'ENDPOINT', server_url(server, HOMEWORK_STATUSES_PATH)
+    )
+    yield
+    server.shutdown()
+    server.server_close()
+
+
+def run_cycle(bot, state):
+    async def cycle():
+        async with async_bot.create_client_session() as session:
+            return await async_bot.poll_cycle(
+                bot, async_bot.AsyncRateLimiter(), session, state
+            )
+    return asyncio.run(cycle())
+
+
+def test_poll_cycle_without_new_homeworks(local_endpoint):
+    bot = RecordingAsyncBot()
+    delay = run_cycle(bot, homework.PollState(0))
+    assert delay == homework.RETRY_PERIOD
+    assert bot.sent == []
+
+
+def test_poll_cycle_reports_api_errors_once(monkeypatch):
+    monkeypatch.setattr(homework, 'ENDPOINT', 'http://127.0.0.1:1/')
+    monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', 42)
+    bot = RecordingAsyncBot()
+    state = homework.PollState(0)
+    run_cycle(bot, state)
+    run_cycle(bot, state)
+    assert len(bot.sent) == 1
+    assert bot.sent[0][0] == 42
@@ -0,0 +1,131 @@
+from http import HTTPStatus
+
+import pytest
+import requests
+
+import homework
+from checkpoints import CheckpointStore
+from circuit_breaker import (CLOSED, HALF_OPEN, OPEN, CircuitBreaker,
+                             CircuitOpenError)
+from retries import TransientError
+from scheduling import REASON_ERROR
+import tests.check_utils as check_utils
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(
+        'test', failure_threshold=3, reset_timeout=10, clock=clock
+    )
+
+
+def test_breaker_opens_after_threshold(breaker):
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_success_resets_failure_count(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_single_probe(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 10
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+
+def test_failed_probe_reopens(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 10
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.now = 15
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_stuck_probe_is_replaced(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 10
+    breaker.before_call()
+    clock.now = 20
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+
+
+@pytest.mark.parametrize('status, state', [
+    (HTTPStatus.INTERNAL_SERVER_ERROR, OPEN),
+    (HTTPStatus.TOO_MANY_REQUESTS, OPEN),
+    (HTTPStatus.NOT_FOUND, CLOSED),
+    (HTTPStatus.OK, CLOSED),
+])
+def test_record_status(breaker, status, state):
+    for _ in range(3):
+        breaker.record_status(status)
+    assert breaker.state == state
+
+
+def test_open_breaker_skips_request_and_error_message(
+    monkeypatch, breaker, tmp_path
+):
+    for _ in range(3):
+        breaker.record_failure()
+    monkeypatch.setattr(homework, 'API_BREAKER', breaker)
+
+    def fail_get(*args, **kwargs):
+        raise AssertionError('Запрос при разомкнутом предохранителе.')
+
+    monkeypatch.setattr(requests, 'get', fail_get)
+    bot = check_utils.MockTelegramBot()
+    sent = []
+    monkeypatch.setattr(
+        homework, 'send_message', lambda bot, message: sent.append(message)
+    )
+    state = homework.PollState(
+        0, store=CheckpointStore(tmp_path / 'state.db')
+    )
+    delay = homework.poll_cycle(bot, state)
+    assert sent == []
+    assert state.errors.fingerprint is None
+    assert delay == homework.RETRY_PERIOD
+    assert state.interval.reason == REASON_ERROR
+
+
+def test_server_errors_open_api_breaker(monkeypatch, breaker):
+    monkeypatch.setattr(homework, 'API_BREAKER', breaker)
+
+    def mock_get(*args, **kwargs):
+        response = check_utils.MockResponseGET(
+            *args, http_status=HTTPStatus.INTERNAL_SERVER_ERROR,
+            data={}, **kwargs
+        )
+        response.headers = {}
+        return response
+
+    monkeypatch.setattr(requests, 'get', mock_get)
+    for _ in range(3):
+        with pytest.raises(TransientError):
+            homework.get_api_answer(0)
+    with pytest.raises(CircuitOpenError):
+        homework.get_api_answer(0)
@@ -0,0 +1,87 @@
+import pytest
+import requests
+from telebot import TeleBot, apihelper
+
+import homework
+from circuit_breaker import CircuitBreaker
+from deadlines import (API_STAGE, CURRENT_DEADLINE, SEND_STAGE, Deadline,
+                       DeadlineExceeded, deadline_scope, socket_timeout)
+from fake_servers import (TELEGRAM_API_PATH, TelegramHandler, configured,
+                          server_url, start_server)
+from metrics import DEADLINE_EXCEEDED
+from retries import RetryPolicy
+from tests.check_utils import FakeClock
+
+
+def exceeded_count(stage):
+    return DEADLINE_EXCEEDED.values.get((stage,), 0)
+
+
+def test_timeout_is_capped_by_stage_budget():
+    clock = FakeClock()
+    deadline = Deadline(budget=10, clock=clock)
+    assert deadline.timeout(API_STAGE, 30) == 5
+    assert deadline.timeout(SEND_STAGE, 3) == 3
+    clock.now = 4
+    assert deadline.timeout(API_STAGE, 30) == 1
+    assert deadline.timeout(SEND_STAGE, 30) == 6
+
+
+def test_spent_stage_budget_raises_and_counts():
+    clock = FakeClock()
+    deadline = Deadline(budget=10, clock=clock)
+    clock.now = 5
+    before = exceeded_count(API_STAGE)
+    with pytest.raises(DeadlineExceeded):
+        deadline.timeout(API_STAGE, 30)
+    assert exceeded_count(API_STAGE) == before + 1
+    assert deadline.timeout(SEND_STAGE, 30) == 5
+
+
+def test_socket_timeout_without_deadline_is_unchanged():
+    assert CURRENT_DEADLINE.get() is None
+    assert socket_timeout(API_STAGE, 30) == 30
+    with deadline_scope(budget=4):
+        assert socket_timeout(API_STAGE, 30) <= 2
+    assert CURRENT_DEADLINE.get() is None
+
+
+def test_api_overrun_is_not_retried(monkeypatch):
+    clock = FakeClock()
+    timeouts = []
+
+    class HangingClient:
+        def get(self, url, headers=None, params=None, timeout=None):
+            timeouts.append(timeout)
+            clock.now += timeout[1]
+            raise requests.ReadTimeout('read timed out')
+
+    monkeypatch.setattr(homework, 'HTTP_SESSION', HangingClient())
+    monkeypatch.setattr(homework, 'API_BREAKER', CircuitBreaker('test'))
+    monkeypatch.setattr(
+        homework, 'API_RETRY', RetryPolicy(attempts=3, sleep=lambda _: None)
+    )
+    token = CURRENT_DEADLINE.set(Deadline(budget=20, clock=clock))
+    try:
+        with pytest.raises(DeadlineExceeded):
+            homework.get_api_answer(0)
+    finally:
+        CURRENT_DEADLINE.reset(token)
+    assert timeouts == [(homework.CONNECT_TIMEOUT, 10)]
+
+
+def test_hung_telegram_send_is_cut_by_deadline(monkeypatch):
+    server = start_server(configured(TelegramHandler, latency=1))
+    monkeypatch.setattr(
+        apihelper, 'API_URL', server_url(server, TELEGRAM_API_PATH)
+    )
+    before = exceeded_count(SEND_STAGE)
+    try:
+        with deadline_scope(budget=0.2):
+            assert not homework.send_message(
+                TeleBot(token='1234:abcdefg'), 'Привет'
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert exceeded_count(SEND_STAGE) == before + 1
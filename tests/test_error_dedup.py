@@ -0,0 +1,91 @@
+import homework
+from checkpoints import CheckpointStore
+from error_dedup import ErrorDeduplicator, fingerprint
+from tests.check_utils import FakeClock
+
+
+def request_error(params, port):
+    return ConnectionError(homework.REQUEST_EXCEPTION_MESSAGE.format(
+        endpoint=homework.ENDPOINT, params=params,
+        headers={'Authorization': 'OAuth token'},
+        error=f'HTTPConnectionPool(port={port}): timed out'
+    ))
+
+
+def test_fingerprint_ignores_volatile_values():
+    first = request_error({'from_date': 1700000000}, 443)
+    second = request_error({'from_date': 1700000600}, 8443)
+    assert fingerprint(first) == fingerprint(second)
+
+
+def test_fingerprint_depends_on_type_and_template():
+    message = 'Эндпоинт недоступен.'
+    assert fingerprint(ConnectionError(message)) != fingerprint(
+        TimeoutError(message)
+    )
+    assert fingerprint(KeyError('homeworks')) != fingerprint(
+        KeyError('status')
+    )
+
+
+def test_repeats_are_suppressed_within_window():
+    clock = FakeClock()
+    errors = ErrorDeduplicator(window=600, clock=clock)
+    assert errors.message(ValueError('1'), 'first') == 'first'
+    errors.sent()
+    for second in (100, 200, 300):
+        clock.now = second
+        assert errors.message(ValueError(str(second)), 'again') is None
+    clock.now = 900
+    summary = errors.message(ValueError('900'), 'again')
+    assert summary.startswith('again')
+    assert '4 раз' in summary
+    assert '15 мин' in summary
+    errors.sent()
+    clock.now = 1000
+    assert errors.message(ValueError('1000'), 'again') is None
+
+
+def test_new_error_is_sent_immediately():
+    clock = FakeClock()
+    errors = ErrorDeduplicator(window=600, clock=clock)
+    errors.message(ValueError('1'), 'first')
+    errors.sent()
+    assert errors.message(KeyError('x'), 'second') == 'second'
+
+
+def test_unsent_message_is_retried():
+    clock = FakeClock()
+    errors = ErrorDeduplicator(window=600, clock=clock)
+    assert errors.message(ValueError('1'), 'first') == 'first'
+    assert errors.message(ValueError('2'), 'first') == 'first'
+
+
+def test_fingerprint_survives_restart(tmp_path):
+    store = CheckpointStore(tmp_path / 'state.db')
+    state = homework.PollState(0, store=store)
+    error = request_error({'from_date': 1}, 443)
+    message = state.new_error_message(error)
+    assert message is not None
+    state.error_sent(message)
+
+    restored = homework.PollState(0, store=store)
+    assert restored.new_error_message(
+        request_error({'from_date': 2}, 443)
+    ) is None
+
+
+def test_alternating_errors_are_suppressed():
+    clock = FakeClock()
+    errors = ErrorDeduplicator(window=600, clock=clock)
+    outage = [TimeoutError('read timed out'), ConnectionError('502'),
+              ConnectionError('503 Service Unavailable')]
+    sent = []
+    for cycle in range(9):
+        clock.now = cycle * 60
+        error = outage[cycle % len(outage)]
+        message = errors.message(error, str(error))
+        if message:
+            errors.sent()
+            sent.append(message)
+    assert len(sent) == len(outage)
@@ -0,0 +1,96 @@
+from http import HTTPStatus
+
+import pytest
+from telebot import TeleBot, apihelper
+from telebot.apihelper import ApiTelegramException
+
+import homework
+from circuit_breaker import CircuitBreaker
+from fake_servers import (HOMEWORK_STATUSES_PATH, TELEGRAM_API_PATH,
+                          HomeworkStatusesHandler, TelegramHandler,
+                          configured, server_url, start_server)
+from outbound import get_retry_after
+from retries import TransientError
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(handler_class):
+        server = start_server(handler_class)
+        servers.append(server)
+        return server
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def telegram(serve, monkeypatch):
+    def start(**options):
+        handler_class = configured(TelegramHandler, **options)
+        server = serve(handler_class)
+        monkeypatch.setattr(
+            apihelper, 'API_URL', server_url(server, TELEGRAM_API_PATH)
+        )
+        return handler_class.stats
+    return start
+
+
+@pytest.fixture
+def practicum(serve, monkeypatch):
+    def start(**options):
+        handler_class = configured(HomeworkStatusesHandler, **options)
+        server = serve(handler_class)
+        monkeypatch.setattr(
+            homework, 'ENDPOINT', server_url(server, HOMEWORK_STATUSES_PATH)
+        )
+        monkeypatch.setattr(homework, 'API_BREAKER', CircuitBreaker('test'))
+        return handler_class.stats
+    return start
+
+
+def test_send_message_through_telegram_stand_in(telegram):
+    stats = telegram()
+    bot = TeleBot(token='1234:abcdefg')
+    assert homework.send_message(bot, 'Привет')
+    assert stats.messages == [(homework.TELEGRAM_CHAT_ID, 'Привет')]
+
+
+def test_telegram_stand_in_throttles(telegram):
+    stats = telegram(throttle_rate=1, retry_after=7)
+    bot = TeleBot(token='1234:abcdefg')
+    with pytest.raises(ApiTelegramException) as error:
+        bot.send_message(chat_id=1, text='x')
+    assert get_retry_after(error.value) == 7
+    assert (stats.throttled, stats.messages) == (1, [])
+
+
+def test_practicum_stand_in_payload(practicum):
+    practicum(homeworks=3, latency=0.01)
+    response = homework.get_api_answer(0)
+    homeworks = homework.check_response(response)
+    assert [item['id'] for item in homeworks] == [0, 1, 2]
+
+
+@pytest.mark.parametrize('options, status', [
+    ({'error_rate': 1}, HTTPStatus.INTERNAL_SERVER_ERROR),
+    ({'throttle_rate': 1}, HTTPStatus.TOO_MANY_REQUESTS),
+])
+def test_practicum_stand_in_failures(practicum, options, status):
+    stats = practicum(retry_after=5, **options)
+    with pytest.raises(TransientError) as error:
+        homework.get_api_answer(0)
+    assert str(status.value) in str(error.value)
+    if status == HTTPStatus.TOO_MANY_REQUESTS:
+        assert error.value.retry_after == 5
+    assert stats.requests == 1
+
+
+def test_error_rate_is_deterministic_for_seed():
+    first = configured(HomeworkStatusesHandler, error_rate=0.5, seed=1)
+    second = configured(HomeworkStatusesHandler, error_rate=0.5, seed=1)
+    rolls = [first.random.random() for _ in range(10)]
+    assert rolls == [second.random.random() for _ in range(10)]
@@ -0,0 +1,130 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+import async_bot
+import homework
+from checkpoints import CheckpointStore
+from leases import LeaseStore
+
+
+@pytest.fixture
+def stores(tmp_path, clock):
+    path = tmp_path / 'leases.db'
+    return [
+        LeaseStore(path, ttl=30, owner=owner, clock=clock)
+        for owner in ('first', 'second')
+    ]
+
+
+def test_lease_is_exclusive(stores):
+    first, second = stores
+    assert first.acquire('alice')
+    assert not second.acquire('alice')
+    assert second.acquire('bob')
+    assert first.acquire('alice')
+    assert first.holds('alice') and not second.holds('alice')
+
+
+def test_expired_lease_fails_over(stores, clock):
+    first, second = stores
+    first.acquire('alice')
+    clock.now += 31
+    assert second.acquire('alice')
+    assert not first.acquire('alice')
+    assert not first.holds('alice')
+
+
+def test_renew_keeps_lease(stores, clock):
+    first, second = stores
+    first.acquire('alice')
+    clock.now += 20
+    assert first.renew() == 1
+    clock.now += 20
+    assert not second.acquire('alice')
+
+
+def test_renew_skips_stuck_cycle(stores, clock):
+    first, second = stores
+    first.acquire('alice')
+    first.acquire('bob')
+    first.expect('bob', 600)
+    clock.now += 20
+    assert first.renew() == 2
+    clock.now += 20
+    assert first.renew() == 1
+    clock.now += 20
+    assert second.acquire('alice')
+    assert not second.acquire('bob')
+
+
+def test_poll_cycle_reports_next_cycle_to_leases(monkeypatch, stores, clock):
+    first, _ = stores
+    monkeypatch.setattr(
+        homework, 'get_api_answer',
+        lambda timestamp: {'homeworks': [], 'current_date': timestamp}
+    )
+    monkeypatch.setattr(homework, 'LEASES', first)
+    state = homework.PollState(0)
+    delay = homework.poll_cycle(None, state)
+    assert first.due[state.key] == clock.now + delay
+
+
+def test_release_frees_leases(stores):
+    first, second = stores
+    first.acquire('alice')
+    first.release()
+    assert second.acquire('alice')
+
+
+def test_poll_cycle_runs_only_for_lease_holder(
+    monkeypatch, stores, clock, tmp_path
+):
+    first, second = stores
+    checkpoints = CheckpointStore(tmp_path / 'state.db')
+    calls = []
+    monkeypatch.setattr(
+        homework, 'get_api_answer',
+        lambda timestamp: calls.append(timestamp) or {
+            'homeworks': [], 'current_date': timestamp
+        }
+    )
+    active = homework.PollState(0, store=checkpoints)
+    standby = homework.PollState(0, store=checkpoints)
+
+    monkeypatch.setattr(homework, 'LEASES', first)
+    homework.poll_cycle(None, active)
+    active.timestamp = 500
+    active.checkpoint()
+    monkeypatch.setattr(homework, 'LEASES', second)
+    assert homework.poll_cycle(None, standby) == second.ttl
+    assert calls == [0]
+
+    clock.now += 31
+    homework.poll_cycle(None, standby)
+    assert calls == [0, 500]
+
+
+def locked(*args):
+    raise sqlite3.OperationalError('database is locked')
+
+
+def test_locked_lease_database_skips_cycle(monkeypatch, stores, caplog):
+    first, _ = stores
+    monkeypatch.setattr(first, 'acquire', locked)
+    monkeypatch.setattr(homework, 'LEASES', first)
+    state = homework.PollState(0)
+    assert homework.poll_cycle(None, state) == first.ttl
+    assert asyncio.run(
+        async_bot.poll_cycle(None, None, None, state)
+    ) == first.ttl
+    assert 'database is locked' in caplog.text
+
+
+def test_failed_checkpoint_does_not_escape(monkeypatch, tmp_path, caplog):
+    checkpoints = CheckpointStore(tmp_path / 'state.db')
+    state = homework.PollState(0, store=checkpoints)
+    monkeypatch.setattr(checkpoints, 'save', locked)
+    state.error_sent('Сбой')
+    assert 'database is locked' in caplog.text
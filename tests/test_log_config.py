@@ -0,0 +1,133 @@
+import atexit
+import gzip
+import json
+import logging
+import time
+
+from homework import CURRENT_ACCOUNT, Account
+from log_config import (AccountFilter, CompressedRotatingFileHandler,
+                        JsonLinesFormatter, LazyMessage, SamplingFilter,
+                        setup_logging)
+
+
+class CountingTemplate(str):
+    calls = 0
+
+    def format(self, *args, **kwargs):
+        CountingTemplate.calls += 1
+        return super().format(*args, **kwargs)
+
+
+def make_record(message, **extra):
+    record = logging.LogRecord(
+        'homework', logging.INFO, __file__, 1, message, None, None
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+def test_lazy_message_is_not_formatted_when_level_disabled():
+    logger = logging.getLogger('tests.lazy')
+    logger.setLevel(logging.INFO)
+    template = CountingTemplate('value {value}')
+    logger.debug(LazyMessage(template, value=1))
+    assert CountingTemplate.calls == 0
+    assert str(LazyMessage(template, value=1)) == 'value 1'
+
+
+def test_json_lines_formatter_adds_structured_fields():
+    record = make_record(
+        LazyMessage('sent {text}', text='hi'), homework_id=7, latency=0.5
+    )
+    token = CURRENT_ACCOUNT.set(Account('alice', 'token', 1))
+    try:
+        AccountFilter(CURRENT_ACCOUNT).filter(record)
+    finally:
+        CURRENT_ACCOUNT.reset(token)
+    data = json.loads(JsonLinesFormatter().format(record))
+    assert data['message'] == 'sent hi'
+    assert data['account'] == 'alice'
+    assert data['homework_id'] == 7
+    assert data['latency'] == 0.5
+
+
+def test_setup_logging_writes_through_queue(tmp_path):
+    log_file = tmp_path / 'bot.log'
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    listener = setup_logging(
+        CURRENT_ACCOUNT, log_file=log_file, json_lines=True, level='INFO'
+    )
+    atexit.unregister(listener.stop)
+    try:
+        logging.getLogger('tests.queue').info('queued')
+    finally:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        root.handlers[:] = handlers
+        root.setLevel(level)
+    record = json.loads(log_file.read_text(encoding='utf-8'))
+    assert record['message'] == 'queued'
+    assert record['level'] == 'INFO'
+
+
+def test_sampling_filter_suppresses_and_reports_repeats():
+    now = [0]
+    sampler = SamplingFilter(window=60, burst=1, clock=lambda: now[0])
+    passed = [sampler.filter(make_record('same')) for _ in range(4)]
+    assert passed == [True, False, False, False]
+    assert sampler.filter(make_record('other'))
+    now[0] = 61
+    record = make_record('same')
+    assert sampler.filter(record)
+    assert record.getMessage() == (
+        'same (подавлено одинаковых сообщений: 3)'
+    )
+
+
+def test_rotated_files_are_gzipped(tmp_path):
+    log_file = tmp_path / 'bot.log'
+    handler = CompressedRotatingFileHandler(
+        str(log_file), max_bytes=100, backup_count=2
+    )
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    for index in range(10):
+        handler.emit(make_record(f'line {index} ' + 'x' * 40))
+    handler.close()
+    archives = sorted(path.name for path in tmp_path.iterdir())
+    assert archives == ['bot.log', 'bot.log.1.gz', 'bot.log.2.gz']
+    with gzip.open(tmp_path / 'bot.log.1.gz', 'rt', encoding='utf-8') as f:
+        assert f.read().startswith('line')
+
+
+def test_flush_is_throttled_until_error(tmp_path):
+    log_file = tmp_path / 'bot.log'
+    handler = CompressedRotatingFileHandler(
+        str(log_file), max_bytes=10000, flush_interval=3600
+    )
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    handler.flush(force=True)
+    for index in range(3):
+        handler.handle(make_record(f'line {index}'))
+    assert log_file.read_text(encoding='utf-8') == ''
+    error = make_record('boom')
+    error.levelno = logging.ERROR
+    handler.handle(error)
+    assert log_file.read_text(encoding='utf-8').splitlines() == [
+        'line 0', 'line 1', 'line 2', 'boom'
+    ]
+    handler.close()
+
+
+def test_last_line_is_flushed_by_timer(tmp_path):
+    log_file = tmp_path / 'bot.log'
+    handler = CompressedRotatingFileHandler(
+        str(log_file), flush_interval=0.05
+    )
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    handler.flush(force=True)
+    handler.handle(make_record('last'))
+    time.sleep(0.2)
+    assert log_file.read_text(encoding='utf-8') == 'last\n'
+    handler.close()
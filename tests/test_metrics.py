@@ -0,0 +1,69 @@
+import pytest
+import requests
+
+import homework
+import metrics
+
+
+def test_histogram_is_cumulative():
+    histogram = metrics.Histogram('test_seconds', 'Test.', buckets=(0.1, 1))
+    metrics.REGISTRY.remove(histogram)
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value)
+    lines = list(histogram.collect())
+    assert 'test_seconds_bucket{le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{le="1"} 2' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 3' in lines
+    assert 'test_seconds_count 3' in lines
+
+
+def test_validation_errors_are_counted_by_type():
+    key = ('parse_status', 'ValueError')
+    before = metrics.VALIDATION_ERRORS.values.get(key, 0)
+    with pytest.raises(ValueError):
+        homework.parse_status({'homework_name': 'hw', 'status': 'unknown'})
+    assert metrics.VALIDATION_ERRORS.values[key] == before + 1
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    server = metrics.start_metrics_server(port=0)
+    try:
+        port = server.server_address[1]
+        response = requests.get(f'http://127.0.0.1:{port}/metrics')
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert response.status_code == 200
+    assert '# TYPE homework_bot_api_request_seconds histogram' in (
+        response.text
+    )
+    assert 'homework_bot_seconds_since_last_poll' in response.text
+
+
+def test_response_cache_counters_are_exported(monkeypatch):
+    cache = homework.ResponseCache()
+    cache.not_modified, cache.bytes_saved = 3, 2048
+    monkeypatch.setattr(homework, 'RESPONSE_CACHE', cache)
+    text = metrics.render()
+    assert '# TYPE homework_bot_response_cache_not_modified_total counter' in (
+        text
+    )
+    assert 'homework_bot_response_cache_not_modified_total 3' in text
+    assert 'homework_bot_response_cache_bytes_saved_total 2048' in text
+    monkeypatch.setattr(homework, 'RESPONSE_CACHE', None)
+    assert 'homework_bot_response_cache_misses_total 0' in metrics.render()
+
+
+def test_status_index_counters_are_summed_over_indexes():
+    before = dict(homework.INDEX_TOTALS)
+    first, second = homework.StatusIndex(), homework.StatusIndex()
+    first.put(1, 'approved')
+    second.put(2, 'reviewing')
+    first.changed([{'id': 1, 'status': 'approved'}, {'id': 3}])
+    second.changed([{'id': 2, 'status': 'reviewing'}])
+    text = metrics.render()
+    assert '# TYPE homework_bot_status_index_hits_total counter' in text
+    hits = before['hits'] + 2
+    misses = before['misses'] + 1
+    assert f'homework_bot_status_index_hits_total {hits}' in text
+    assert f'homework_bot_status_index_misses_total {misses}' in text
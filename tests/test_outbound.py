@@ -0,0 +1,194 @@
+import time
+from concurrent.futures import Future, wait
+
+import pytest
+from telebot.apihelper import ApiTelegramException
+
+import homework
+from deadlines import (SEND_STAGE, Deadline, DeadlineExceeded,
+                       deadline_scope)
+from metrics import DEADLINE_EXCEEDED
+from outbound import OutboundQueue, TokenBucket
+from tests.check_utils import FakeClock, RecordingBot
+
+
+def too_many_requests(retry_after):
+    return ApiTelegramException('sendMessage', None, {
+        'error_code': 429,
+        'description': 'Too Many Requests',
+        'parameters': {'retry_after': retry_after},
+    })
+
+
+def test_token_bucket_reservations():
+    bucket = TokenBucket(rate=2, capacity=2)
+    assert [bucket.reserve(0) for _ in range(4)] == [0, 0, 0.5, 1.0]
+    assert bucket.reserve(10) == 10
+
+
+def test_send_message_only_enqueues():
+    bot = RecordingBot()
+    outbound = OutboundQueue(bot)
+    outbound.send_message(chat_id=1, text='hello')
+    assert bot.sent == []
+    assert outbound.queue.qsize() == 1
+
+
+def test_per_chat_limit_does_not_block_other_chats():
+    bot = RecordingBot()
+    outbound = OutboundQueue(bot, global_rate=1000, chat_rate=20).start()
+    for text in ('a1', 'a2', 'a3'):
+        outbound.send_message(chat_id='a', text=text)
+    outbound.send_message(chat_id='b', text='b1')
+    outbound.stop(timeout=1)
+    assert bot.sent.index(('b', 'b1')) < bot.sent.index(('a', 'a3'))
+    assert [text for chat, text in bot.sent if chat == 'a'] == [
+        'a1', 'a2', 'a3'
+    ]
+
+
+def test_retry_after_is_honored():
+    bot = RecordingBot(failures=[too_many_requests(0)])
+    outbound = OutboundQueue(bot, global_rate=1000, chat_rate=1000).start()
+    outbound.send_message(chat_id=1, text='hello')
+    outbound.stop(timeout=1)
+    assert bot.sent == [(1, 'hello')]
+
+
+def test_delivery_failure_is_reported():
+    bot = RecordingBot(failures=[ConnectionError('Telegram недоступен')])
+    outbound = OutboundQueue(bot, global_rate=1000, chat_rate=1000).start()
+    delivery = outbound.send_message(chat_id=1, text='hello')
+    with pytest.raises(ConnectionError):
+        delivery.result(timeout=1)
+    assert outbound.send_message(chat_id=1, text='hello').result(timeout=1)
+    outbound.stop(timeout=1)
+    assert bot.sent == [(1, 'hello')]
+
+
+def test_state_advances_only_after_delivery(monkeypatch):
+    bot = RecordingBot(failures=[ConnectionError('Telegram недоступен')])
+    outbound = OutboundQueue(bot, global_rate=1000, chat_rate=1000).start()
+    response = {
+        'homeworks': [
+            {'id': 1, 'homework_name': 'hw', 'status': 'approved'}
+        ],
+        'current_date': 100,
+    }
+    monkeypatch.setattr(homework, 'get_api_answer', lambda timestamp: response)
+    state = homework.PollState(0)
+
+    def poll_and_deliver():
+        homework.poll_cycle(outbound, state)
+        wait(state.pending[0], timeout=1)
+
+    poll_and_deliver()
+    poll_and_deliver()
+    assert state.timestamp == 0
+    homework.poll_cycle(outbound, state)
+    outbound.stop(timeout=1)
+    assert state.timestamp == 100
+    assert state.pending is None
+    assert len(bot.sent) == 1
+
+
+def test_poll_cycle_does_not_wait_for_delivery(monkeypatch):
+    bot = RecordingBot(failures=[too_many_requests(3)])
+    outbound = OutboundQueue(bot, global_rate=1000, chat_rate=1000).start()
+    monkeypatch.setattr(homework, 'get_api_answer', lambda timestamp: {
+        'homeworks': [{'id': 1, 'homework_name': 'hw', 'status': 'approved'}],
+        'current_date': 100,
+    })
+    state = homework.PollState(0)
+    start = time.monotonic()
+    homework.poll_cycle(outbound, state)
+    assert homework.poll_cycle(outbound, state) == state.interval.minimum
+    assert time.monotonic() - start < 0.5
+    assert state.timestamp == 0
+
+
+def test_retry_after_pauses_only_its_chat():
+    bot = RecordingBot(failures=[too_many_requests(3)])
+    outbound = OutboundQueue(bot, global_rate=1000, chat_rate=1000).start()
+    throttled = outbound.send_message(chat_id='a', text='a1')
+    other = outbound.send_message(chat_id='b', text='b1')
+    assert other.result(timeout=0.5)
+    assert not throttled.done()
+    assert bot.sent == [('b', 'b1')]
+
+
+class TimeoutBot(RecordingBot):
+    def __init__(self):
+        super().__init__()
+        self.timeouts = []
+
+    def send_message(self, chat_id=None, text=None, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        return super().send_message(chat_id, text, **kwargs)
+
+
+def test_send_timeout_is_computed_at_delivery():
+    clock = FakeClock()
+    bot = TimeoutBot()
+    outbound = OutboundQueue(bot, global_rate=1000, chat_rate=1000)
+    with deadline_scope(budget=10, clock=clock):
+        delivery = outbound.send_message(chat_id=1, text='hello', timeout=10)
+    clock.now = 7
+    outbound.start()
+    assert delivery.result(timeout=1)
+    outbound.stop(timeout=1)
+    assert bot.timeouts == [3]
+
+
+def test_message_expired_in_queue_is_not_sent():
+    clock = FakeClock()
+    bot = TimeoutBot()
+    outbound = OutboundQueue(bot, global_rate=1000, chat_rate=1000)
+    with deadline_scope(budget=10, clock=clock):
+        delivery = outbound.send_message(chat_id=1, text='hello', timeout=10)
+    clock.now = 11
+    before = DEADLINE_EXCEEDED.values.get((SEND_STAGE,), 0)
+    outbound.start()
+    with pytest.raises(DeadlineExceeded):
+        delivery.result(timeout=1)
+    outbound.stop(timeout=1)
+    assert bot.sent == []
+    assert DEADLINE_EXCEEDED.values.get((SEND_STAGE,), 0) == before + 1
+
+
+def test_sender_does_not_sleep_past_the_deadline():
+    clock = FakeClock()
+    sleeps = []
+    bot = RecordingBot()
+    outbound = OutboundQueue(
+        bot, global_rate=1000, chat_rate=0.1, clock=clock,
+        sleep=sleeps.append
+    ).start()
+    with deadline_scope(budget=10, clock=clock):
+        first = outbound.send_message(chat_id=1, text='first')
+        second = outbound.send_message(chat_id=1, text='second')
+    assert first.result(timeout=1)
+    with pytest.raises(DeadlineExceeded):
+        second.result(timeout=1)
+    outbound.stop(timeout=1)
+    assert sleeps == []
+    assert bot.sent == [(1, 'first')]
+
+
+def test_stalled_delivery_is_abandoned_after_send_budget():
+    clock = FakeClock()
+    delivered = []
+    state = homework.PollState(0)
+    stalled = Future()
+    state.defer(
+        [stalled], lambda: delivered.append(True),
+        Deadline(budget=10, clock=clock)
+    )
+    assert not state.settle()
+    clock.now = 10
+    before = DEADLINE_EXCEEDED.values.get((SEND_STAGE,), 0)
+    assert state.settle()
+    assert stalled.cancelled()
+    assert state.pending is None
+    assert delivered == []
+    assert DEADLINE_EXCEEDED.values.get((SEND_STAGE,), 0) == before + 1
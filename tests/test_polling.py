@@ -0,0 +1,97 @@
+from http import HTTPStatus
+
+import pytest
+import requests
+
+import homework
+from checkpoints import CheckpointStore
+import tests.check_utils as check_utils
+
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    def set_data(data):
+        def mock_get(*args, **kwargs):
+            return check_utils.MockResponseGET(
+                *args, http_status=HTTPStatus.OK, data=data, **kwargs
+            )
+        monkeypatch.setattr(requests, 'get', mock_get)
+    return set_data
+
+
+def test_build_messages_coalesces_and_batches():
+    homeworks = [
+        {'homework_name': 'hw1', 'status': 'approved'},
+        {'homework_name': 'hw1', 'status': 'approved'},
+        {'homework_name': 'hw2', 'status': 'rejected'},
+    ]
+    messages = homework.build_messages(homeworks)
+    assert len(messages) == 1
+    assert messages[0].splitlines() == [
+        homework.parse_status(homeworks[0]),
+        homework.parse_status(homeworks[2]),
+    ]
+
+
+def test_build_messages_respects_telegram_limit():
+    homeworks = [
+        {'homework_name': 'x' * 1000 + str(index), 'status': 'approved'}
+        for index in range(10)
+    ]
+    messages = homework.build_messages(homeworks)
+    assert len(messages) > 1
+    assert all(
+        len(message) <= homework.TELEGRAM_MESSAGE_LIMIT
+        for message in messages
+    )
+    assert sum(len(message.splitlines()) for message in messages) == 10
+
+
+def test_poll_cycle_sends_every_homework_once(mock_api):
+    mock_api({
+        'homeworks': [
+            {'homework_name': 'hw1', 'status': 'approved'},
+            {'homework_name': 'hw2', 'status': 'reviewing'},
+        ],
+        'current_date': 123,
+    })
+    bot = check_utils.RecordingBot()
+    state = homework.PollState(0)
+    homework.poll_cycle(bot, state)
+    assert len(bot.sent) == 1
+    _, text = bot.sent[0]
+    assert 'hw1' in text and 'hw2' in text
+    assert state.timestamp == 123
+
+
+def test_checkpoint_survives_restart(tmp_path, mock_api):
+    mock_api({
+        'homeworks': [{'id': 7, 'homework_name': 'hw', 'status': 'approved'}],
+        'current_date': 456,
+    })
+    path = tmp_path / 'state.db'
+    store = CheckpointStore(path)
+    homework.poll_cycle(
+        check_utils.RecordingBot(), homework.PollState(0, store=store)
+    )
+    store.close()
+
+    store = CheckpointStore(path)
+    restored = homework.PollState(0, store=store)
+    assert restored.timestamp == 456
+    assert restored.index.get(7) == ('approved', None)
+    assert homework.PollState(0, key='other', store=store).timestamp == 0
+    store.close()
+
+
+def test_poll_cycle_skips_already_sent_statuses(mock_api):
+    mock_api({
+        'homeworks': [{'id': 7, 'homework_name': 'hw', 'status': 'approved'}],
+        'current_date': 123,
+    })
+    bot = check_utils.RecordingBot()
+    state = homework.PollState(0)
+    homework.poll_cycle(bot, state)
+    homework.poll_cycle(bot, state)
+    assert len(bot.sent) == 1
+    assert state.index.hits == 1
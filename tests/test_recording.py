@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+import homework
+from circuit_breaker import CircuitBreaker
+from fake_servers import (HOMEWORK_STATUSES_PATH, HomeworkStatusesHandler,
+                          configured, server_url, start_server)
+from recording import API_EVENT, MESSAGE_EVENT, Recorder, read_recording
+from replay import format_report, replay
+from simulation import SimulatedBot, VirtualClock
+
+
+@pytest.fixture
+def recorded(tmp_path, monkeypatch):
+    server = start_server(configured(HomeworkStatusesHandler, homeworks=2))
+    monkeypatch.setattr(
+        homework, 'ENDPOINT', server_url(server, HOMEWORK_STATUSES_PATH)
+    )
+    monkeypatch.setattr(homework, 'API_BREAKER', CircuitBreaker('test'))
+    path = tmp_path / 'traffic.jsonl'
+    recorder = Recorder(path)
+    monkeypatch.setattr(homework, 'RECORDER', recorder)
+    state = homework.PollState(timestamp=0, clock=VirtualClock())
+    homework.run_once(SimulatedBot(VirtualClock()), state)
+    recorder.close()
+    server.shutdown()
+    server.server_close()
+    return path
+
+
+def test_recorder_appends_api_and_message_events(recorded):
+    api, message = read_recording(recorded)
+    assert api['k'] == API_EVENT
+    assert (api['a'], api['p'], api['s']) == ('default', {'from_date': 0}, 200)
+    assert api['h']['Content-Type'] == 'application/json'
+    assert len(json.loads(api['b'])['homeworks']) == 2
+    assert api['d'] >= 0
+    assert message['k'] == MESSAGE_EVENT
+    assert message['ok'] is True
+    assert 'student__hw0.zip' in message['m']
+
+
+def test_replay_reproduces_recorded_messages(recorded):
+    session = homework.HTTP_SESSION
+    report = replay(read_recording(recorded))
+    assert (report.requests, report.cycles) == (1, 1)
+    assert report.recorded == report.replayed == 1
+    assert report.differences == []
+    assert homework.HTTP_SESSION is session
+
+
+def test_replay_reports_differences(recorded):
+    api, message = read_recording(recorded)
+    message['m'] = 'Другое сообщение'
+    report = replay([api, message])
+    assert len(report.differences) == 1
+    assert 'расхождений: 1' in format_report(report)
+
+
+def test_replay_retries_recorded_transient_errors(recorded):
+    api, message = read_recording(recorded)
+    failure = dict(api, s=500, b='{}', h={})
+    network_error = {
+        **api, 's': None, 'e': 'Connection refused', 't': api['t'] + 1
+    }
+    slept = []
+    report = replay(
+        [failure, network_error, dict(api, t=api['t'] + 2), message],
+        speed=1, sleep=slept.append
+    )
+    assert (report.requests, report.cycles) == (3, 1)
+    assert report.differences == []
+    assert slept
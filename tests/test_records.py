@@ -0,0 +1,60 @@
+import pytest
+
+import homework
+from records import Homework
+from tests.check_utils import RecordingBot
+
+DATA = {
+    'id': 7,
+    'homework_name': 'student__hw.zip',
+    'status': 'approved',
+    'date_updated': '2024-01-01T00:00:00Z',
+    'reviewer_comment': 'Отлично!',
+    'lesson_name': 'Итоговый проект',
+}
+
+
+def test_record_keeps_only_used_fields():
+    record = Homework.from_dict(DATA)
+    assert not hasattr(record, '__dict__')
+    assert 'lesson_name' not in record
+    assert record.get('reviewer_comment') is None
+    assert (record['id'], record.status) == (7, 'approved')
+
+
+def test_statuses_are_interned():
+    first = Homework.from_dict(dict(DATA, status=''.join(['appr', 'oved'])))
+    second = Homework.from_dict(dict(DATA, status=''.join(['ap', 'proved'])))
+    assert first.status is second.status
+
+
+def test_missing_fields_behave_like_absent_keys():
+    record = Homework(homework_name='hw', status='approved')
+    assert 'id' not in record
+    assert record.get('id', 0) == 0
+    with pytest.raises(KeyError):
+        record['date_updated']
+
+
+def test_parse_status_accepts_records():
+    record = Homework.from_dict(DATA)
+    assert homework.parse_status(record) == homework.parse_status(DATA)
+    with pytest.raises(KeyError):
+        homework.parse_status(Homework(status='approved'))
+
+
+def test_changed_homeworks_reach_notifier_as_records(monkeypatch):
+    notified = []
+
+    def build_messages(homeworks):
+        notified.extend(homeworks)
+        return ['message']
+
+    monkeypatch.setattr(homework, 'get_api_answer', lambda timestamp: {
+        'homeworks': [DATA], 'current_date': 100,
+    })
+    monkeypatch.setattr(homework, 'build_messages', build_messages)
+    state = homework.PollState(0)
+    homework.poll_cycle(RecordingBot(), state)
+    assert notified == [Homework.from_dict(DATA)]
+    assert state.timestamp == 100
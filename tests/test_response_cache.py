@@ -0,0 +1,59 @@
+import pytest
+
+import homework
+from fake_servers import (HOMEWORK_STATUSES_PATH, HomeworkStatusesHandler,
+                          server_url, start_server)
+from response_cache import ResponseCache
+
+
+class ETagHandler(HomeworkStatusesHandler):
+    etag = '"v1"'
+
+
+class StableBodyHandler(HomeworkStatusesHandler):
+    current_date = 1700000000
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    servers = []
+
+    def start(handler_class):
+        server = start_server(handler_class)
+        servers.append(server)
+        monkeypatch.setattr(
+            homework, 'ENDPOINT', server_url(server, HOMEWORK_STATUSES_PATH)
+        )
+        monkeypatch.setattr(
+            homework, 'HTTP_SESSION', homework.create_session()
+        )
+        monkeypatch.setattr(homework, 'RESPONSE_CACHE', ResponseCache())
+        return homework.RESPONSE_CACHE
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_not_modified_is_served_from_cache(serve):
+    cache = serve(ETagHandler)
+    first = homework.get_api_answer(0)
+    assert homework.get_api_answer(0) == first
+    assert (cache.misses, cache.not_modified) == (1, 1)
+    assert cache.bytes_saved > 0
+
+
+def test_unchanged_body_skips_parsing(serve):
+    cache = serve(StableBodyHandler)
+    homework.get_api_answer(0)
+    homework.get_api_answer(0)
+    assert (cache.misses, cache.unchanged) == (1, 1)
+
+
+def test_cache_is_per_params(serve):
+    cache = serve(ETagHandler)
+    homework.get_api_answer(0)
+    assert cache.request_headers('default', {'from_date': 1}) == {}
+    homework.get_api_answer(1)
+    assert cache.misses == 2
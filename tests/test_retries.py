@@ -0,0 +1,124 @@
+from http import HTTPStatus
+
+import pytest
+import requests
+
+import homework
+from circuit_breaker import CircuitBreaker
+from deadlines import deadline_scope
+from retries import RetryPolicy, TransientError, parse_retry_after
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers or {}
+
+    def json(self):
+        return self.data
+
+
+def make_policy(clock, **kwargs):
+    return RetryPolicy(
+        clock=clock, sleep=clock.sleep, jitter=lambda: 1.0, **kwargs
+    )
+
+
+def failing(errors, result='ok'):
+    errors = list(errors)
+
+    def request():
+        if errors:
+            raise errors.pop(0)
+        return result
+    return request
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('120', 120.0),
+    ('Thu, 01 Jan 1970 00:01:40 GMT', 40.0),
+    ('Thu, 01 Jan 1970 00:00:00 GMT', 0.0),
+    ('soon', None),
+    (None, None),
+])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value, now=lambda: 60) == expected
+
+
+def test_exponential_backoff_until_success(clock):
+    policy = make_policy(clock, attempts=4, base=1, cap=10, budget=60)
+    request = failing([TransientError('502')] * 3)
+    assert policy.call(request) == 'ok'
+    assert clock.sleeps == [1, 2, 4]
+
+
+def test_retry_after_is_honored(clock):
+    policy = make_policy(clock, attempts=3, base=1, cap=10, budget=60)
+    request = failing([TransientError('429', retry_after=7)])
+    assert policy.call(request) == 'ok'
+    assert clock.sleeps == [7]
+
+
+def test_gives_up_after_attempts(clock):
+    policy = make_policy(clock, attempts=2, base=1, cap=10, budget=60)
+    with pytest.raises(TransientError):
+        policy.call(failing([TransientError('503')] * 3))
+    assert clock.sleeps == [1]
+
+
+def test_budget_limits_retries(clock):
+    policy = make_policy(clock, attempts=10, base=4, cap=100, budget=10)
+    with pytest.raises(TransientError):
+        policy.call(failing([TransientError('503')] * 10))
+    assert clock.sleeps == [4]
+
+
+def test_loop_deadline_limits_retries(clock):
+    policy = make_policy(clock, attempts=10, base=1, cap=100, budget=60)
+    with deadline_scope(budget=10, clock=clock):
+        with pytest.raises(TransientError):
+            policy.call(failing([TransientError('503')] * 10))
+    assert clock.sleeps == [1, 2]
+
+
+def test_other_errors_are_not_retried(clock):
+    policy = make_policy(clock)
+    with pytest.raises(ValueError):
+        policy.call(failing([ValueError('bad')]))
+    assert clock.sleeps == []
+
+
+def test_get_api_answer_retries_server_errors(monkeypatch, clock):
+    responses = [
+        FakeResponse(HTTPStatus.BAD_GATEWAY),
+        FakeResponse(
+            HTTPStatus.TOO_MANY_REQUESTS, headers={'Retry-After': '3'}
+        ),
+        FakeResponse(
+            HTTPStatus.OK, data={'homeworks': [], 'current_date': 1}
+        ),
+    ]
+    monkeypatch.setattr(
+        requests, 'get', lambda *args, **kwargs: responses.pop(0)
+    )
+    monkeypatch.setattr(homework, 'API_RETRY', make_policy(clock))
+    monkeypatch.setattr(homework, 'API_BREAKER', CircuitBreaker('test'))
+    assert homework.get_api_answer(0) == {
+        'homeworks': [], 'current_date': 1
+    }
+    assert clock.sleeps == [1, 3]
+
+
+def test_client_errors_are_not_retried(monkeypatch, clock):
+    calls = []
+
+    def mock_get(*args, **kwargs):
+        calls.append(kwargs)
+        return FakeResponse(HTTPStatus.UNAUTHORIZED)
+
+    monkeypatch.setattr(requests, 'get', mock_get)
+    monkeypatch.setattr(homework, 'API_RETRY', make_policy(clock))
+    with pytest.raises(ConnectionError):
+        homework.get_api_answer(0)
+    assert len(calls) == 1
@@ -0,0 +1,123 @@
+import pytest
+
+from collections import Counter
+
+from scheduling import (REASON_ERROR, REASON_IDLE, REASON_REVIEWING,
+                        REASON_UPDATE, AdaptiveInterval, PollScheduler,
+                        spread_offsets)
+from tests.check_utils import FakeClock
+
+
+@pytest.fixture
+def interval():
+    return AdaptiveInterval(
+        base=600, minimum=60, maximum=3600, reviewing=120, factor=2
+    )
+
+
+def test_update_uses_base_period(interval):
+    assert interval.next_interval([{'status': 'approved'}]) == 600
+    assert interval.reason == REASON_UPDATE
+
+
+def test_reviewing_shortens_until_verdict(interval):
+    assert interval.next_interval([{'status': 'reviewing'}]) == 120
+    assert interval.next_interval([]) == 120
+    assert interval.reason == REASON_REVIEWING
+    assert interval.next_interval([{'status': 'approved'}]) == 600
+
+
+def test_idle_backoff_is_bounded(interval):
+    delays = [interval.next_interval([]) for _ in range(5)]
+    assert delays == [600, 1200, 2400, 3600, 3600]
+    assert interval.reason == REASON_IDLE
+
+
+def test_error_backoff_resets_after_success(interval):
+    assert [interval.next_interval(None) for _ in range(3)] == [
+        600, 1200, 2400
+    ]
+    assert interval.reason == REASON_ERROR
+    assert interval.describe() == 'ошибка 3 раз подряд'
+    assert interval.next_interval([{'status': 'rejected'}]) == 600
+
+
+def test_minimum_bound():
+    interval = AdaptiveInterval(base=600, minimum=300, reviewing=10)
+    assert interval.next_interval([{'status': 'reviewing'}]) == 300
+
+
+def test_spread_offsets_are_even_and_deterministic():
+    keys = [f'account-{index}' for index in range(10000)]
+    offsets = spread_offsets(keys, 600)
+    assert offsets == spread_offsets(reversed(keys), 600)
+    assert all(0 <= offset < 600 for offset in offsets.values())
+    per_second = Counter(int(offset) for offset in offsets.values())
+    assert len(per_second) == 600
+    assert max(per_second.values()) <= 18
+
+
+def test_scheduler_pops_due_accounts_in_order():
+    clock = FakeClock()
+    scheduler = PollScheduler(600, clock=clock)
+    scheduler.spread(['a', 'b', 'c'])
+    offsets = spread_offsets(['a', 'b', 'c'], 600)
+    first = min(offsets, key=offsets.get)
+    assert scheduler.pop_due() == []
+    clock.now = offsets[first]
+    assert scheduler.pop_due() == [first]
+    clock.now = 600
+    assert sorted(scheduler.pop_due()) == sorted(set('abc') - {first})
+    assert scheduler.next_due() is None
+    assert len(scheduler) == 3
+
+
+def test_reschedule_adds_bounded_jitter():
+    clock = FakeClock()
+    scheduler = PollScheduler(600, jitter=0.1, clock=clock)
+    keys = [str(index) for index in range(100)]
+    scheduler.spread(keys)
+    clock.now = 600
+    for key in scheduler.pop_due():
+        scheduler.reschedule(key, 600)
+    dues = sorted(due for due, _, _ in scheduler.heap)
+    assert 600 + 570 <= dues[0] and dues[-1] <= 600 + 630
+    assert len(set(dues)) == 100
+
+
+def test_report_drift_and_peak_concurrency():
+    clock = FakeClock()
+    scheduler = PollScheduler(10, clock=clock)
+    scheduler.spread(['a', 'b'])
+    clock.now = 12
+    ready = scheduler.pop_due()
+    assert len(ready) == 2
+    scheduler.reschedule(ready[0], 10)
+    report = scheduler.report()
+    assert report.kwargs['peak'] == 2
+    assert report.kwargs['polls'] == 2
+    assert 2 < report.kwargs['maximum'] <= 12
+    assert scheduler.report().kwargs['peak'] == 1
+
+
+def test_pop_due_respects_limit():
+    clock = FakeClock()
+    scheduler = PollScheduler(10, clock=clock)
+    scheduler.spread(['a', 'b', 'c'])
+    clock.now = 10
+    assert len(scheduler.pop_due(2)) == 2
+    assert len(scheduler.pop_due(0)) == 0
+    assert len(scheduler.pop_due()) == 1
+
+
+def test_discarded_account_is_not_rescheduled():
+    clock = FakeClock()
+    scheduler = PollScheduler(10, clock=clock)
+    scheduler.spread(['a', 'b'])
+    clock.now = 10
+    scheduler.pop_due()
+    scheduler.discard('a')
+    scheduler.reschedule('a', 10)
+    scheduler.reschedule('b', 10)
+    assert len(scheduler) == 1
+    assert [item for _, _, item in scheduler.heap] == ['b']
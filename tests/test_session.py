@@ -0,0 +1,40 @@
+import pytest
+
+import homework
+from fake_servers import (HOMEWORK_STATUSES_PATH, HomeworkStatusesHandler,
+                          server_url, start_server)
+
+
+@pytest.fixture
+def local_endpoint(monkeypatch):
+    server = start_server(HomeworkStatusesHandler)
+    monkeypatch.setattr(
+        homework, 'ENDPOINT', server_url(server, HOMEWORK_STATUSES_PATH)
+    )
+    yield
+    server.shutdown()
+    server.server_close()
+
+
+def test_create_session_pool_size():
+    session = homework.create_session(pool_size=7)
+    adapter = session.get_adapter('https://practicum.yandex.ru/')
+    assert adapter._pool_maxsize == 7
+
+
+def test_session_is_reused_with_timeouts(monkeypatch, local_endpoint):
+    session = homework.create_session()
+    calls = []
+    original_get = session.get
+
+    def recording_get(*args, **kwargs):
+        calls.append(kwargs['timeout'])
+        return original_get(*args, **kwargs)
+
+    monkeypatch.setattr(session, 'get', recording_get)
+    monkeypatch.setattr(homework, 'HTTP_SESSION', session)
+    for _ in range(3):
+        assert homework.get_api_answer(0)['homeworks'] == []
+    assert calls == [(homework.CONNECT_TIMEOUT, homework.READ_TIMEOUT)] * 3
+    pool = session.get_adapter(homework.ENDPOINT).poolmanager
+    assert len(pool.pools) == 1
@@ -0,0 +1,135 @@
+import multiprocessing
+
+import sharding
+from sharding import HashRing, Supervisor, assign_shards
+from tests.check_utils import FakeClock
+
+KEYS = [f'account-{index}' for index in range(3000)]
+
+
+class FakeProcess:
+    started = []
+
+    def __init__(self, target, args, name, daemon):
+        self.args = args
+        self.name = name
+        self.pid = len(FakeProcess.started) + 1
+        self.alive = False
+        self.exitcode = None
+
+    def start(self):
+        self.alive = True
+        FakeProcess.started.append(self)
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.alive = False
+        self.exitcode = -15
+
+    def join(self, timeout=None):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.messages = []
+
+    def send(self, message):
+        self.messages.append(message)
+
+    def close(self):
+        pass
+
+
+class FakeContext:
+    Process = FakeProcess
+
+    @staticmethod
+    def Pipe(duplex=True):
+        connection = FakeConnection()
+        return connection, connection
+
+
+def exit_with_error(shard, index, workers, control):
+    raise SystemExit(3)
+
+
+def test_ring_is_balanced():
+    shards = assign_shards(KEYS, 4)
+    sizes = [len(shard) for shard in shards.values()]
+    assert sum(sizes) == len(KEYS)
+    assert max(sizes) < 1.3 * len(KEYS) / 4
+
+
+def test_adding_worker_moves_few_accounts():
+    before, after = HashRing(range(4)), HashRing(range(5))
+    moved = [
+        key for key in KEYS if before.node_for(key) != after.node_for(key)
+    ]
+    assert len(moved) < 1.5 * len(KEYS) / 5
+    assert all(after.node_for(key) == 4 for key in moved)
+
+
+def make_supervisor(workers=3):
+    FakeProcess.started = []
+    clock = FakeClock()
+    supervisor = Supervisor(
+        KEYS[:30], workers=workers, context=FakeContext(), clock=clock
+    )
+    return supervisor.start(), clock
+
+
+def test_crashed_worker_is_restarted_with_backoff():
+    supervisor, clock = make_supervisor()
+    assert len(FakeProcess.started) == 3
+    supervisor.processes[0].alive = False
+    supervisor.check()
+    assert len(FakeProcess.started) == 3
+    clock.now = sharding.RESTART_DELAY
+    supervisor.check()
+    assert len(FakeProcess.started) == 4
+    restarted = supervisor.processes[0]
+    assert restarted.args[0] == supervisor.shards[0]
+
+    restarted.alive = False
+    supervisor.check()
+    clock.now += sharding.RESTART_DELAY
+    supervisor.check()
+    assert supervisor.processes[0] is restarted
+    clock.now += sharding.RESTART_DELAY
+    supervisor.check()
+    assert supervisor.processes[0] is not restarted
+
+
+def test_resize_keeps_running_workers():
+    supervisor, _ = make_supervisor(workers=2)
+    old = dict(supervisor.processes)
+    supervisor.resize(3)
+    assert set(supervisor.processes) == {0, 1, 2}
+    assert len(FakeProcess.started) == 3
+    for index in (0, 1):
+        assert supervisor.processes[index] is old[index]
+        assert old[index].alive
+        assert old[index].args[3].messages == [(supervisor.shards[index], 3)]
+    assert supervisor.processes[2].args[0] == supervisor.shards[2]
+
+    supervisor.resize(2)
+    assert set(supervisor.processes) == {0, 1}
+    assert supervisor.processes[0] is old[0]
+    assert not FakeProcess.started[2].alive
+    supervisor.stop()
+    assert supervisor.processes == {}
+
+
+def test_real_worker_exit_is_detected():
+    supervisor = Supervisor(
+        ['a'], workers=1, target=exit_with_error,
+        context=multiprocessing.get_context('fork')
+    ).start()
+    process = supervisor.processes[0]
+    process.join(1)
+    supervisor.check()
+    assert process.exitcode == 3
+    assert 0 in supervisor.restart_at
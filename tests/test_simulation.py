@@ -0,0 +1,47 @@
+import homework
+from scheduling import MAX_RETRY_PERIOD, REVIEWING_RETRY_PERIOD
+from simulation import (DAY, DEFAULT_TIMELINE, SimulatedBot, VirtualClock,
+                        format_report, simulate)
+
+
+def test_virtual_clock_advances_only_on_sleep():
+    clock = VirtualClock(start=100)
+    assert clock.time() == clock.monotonic() == 100
+    clock.sleep(600)
+    assert clock.time() == 700
+
+
+def test_run_once_returns_delay_without_sleeping(monkeypatch):
+    monkeypatch.setattr(
+        homework, 'get_api_answer',
+        lambda timestamp: {'homeworks': [], 'current_date': timestamp}
+    )
+    clock = VirtualClock()
+    state = homework.PollState(timestamp=0, clock=clock)
+    delay = homework.run_once(SimulatedBot(clock), state)
+    assert delay == homework.RETRY_PERIOD
+    assert state.next_poll_at == clock.time() + delay
+
+
+def test_simulation_delivers_every_change():
+    session, breaker = homework.HTTP_SESSION, homework.API_BREAKER
+    report = simulate([
+        {'at': 1000, 'homework_name': 'hw.zip', 'status': 'reviewing'},
+        {'at': 5000, 'homework_name': 'hw.zip', 'status': 'approved'},
+    ], duration=DAY)
+    assert report.changes == len(report.delays) == 2
+    reviewing_delay, approved_delay = report.delays
+    assert 0 <= reviewing_delay <= MAX_RETRY_PERIOD
+    assert 0 <= approved_delay <= REVIEWING_RETRY_PERIOD
+    assert report.requests == report.cycles
+    assert report.failed == report.errors == 0
+    assert (homework.HTTP_SESSION, homework.API_BREAKER) == (session, breaker)
+
+
+def test_simulation_reports_outage_once_per_window():
+    report = simulate(DEFAULT_TIMELINE, duration=14 * DAY)
+    assert report.cycles > 1000
+    assert report.failed > 0
+    assert 0 < report.errors < report.failed
+    assert len(report.delays) == report.changes
+    assert 'Доставлено изменений статуса: 4 из 4' in format_report(report)
@@ -0,0 +1,38 @@
+from status_index import StatusIndex
+
+HOMEWORK = {'id': 1, 'status': 'reviewing', 'date_updated': '2024-01-01'}
+
+
+def test_unchanged_records_are_dropped():
+    index = StatusIndex()
+    assert index.changed([HOMEWORK]) == [HOMEWORK]
+    index.remember([HOMEWORK])
+    assert index.changed([HOMEWORK]) == []
+    approved = dict(HOMEWORK, status='approved', date_updated='2024-01-02')
+    assert index.changed([HOMEWORK, approved]) == [approved]
+    assert (index.hits, index.misses) == (2, 2)
+
+
+def test_records_without_id_always_pass():
+    index = StatusIndex()
+    homework = {'homework_name': 'hw', 'status': 'approved'}
+    index.remember([homework])
+    assert index.changed([homework]) == [homework]
+    assert len(index) == 0
+
+
+def test_lru_eviction():
+    index = StatusIndex(capacity=2)
+    index.put(1, 'approved')
+    index.put(2, 'approved')
+    index.changed([{'id': 1, 'status': 'approved'}])
+    index.put(3, 'approved')
+    assert 1 in index and 3 in index
+    assert 2 not in index
+
+
+def test_restored_statuses_share_one_string():
+    index = StatusIndex()
+    index.put(1, ''.join(['appr', 'oved']))
+    index.put(2, ''.join(['ap', 'proved']))
+    assert index.get(1)[0] is index.get(2)[0]
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+import homework
+import validation
+from validation import ResponseValidator
+
+
+@pytest.fixture
+def validator():
+    return ResponseValidator(homework.HOMEWORK_VERDICTS)
+
+
+def test_valid_response_is_returned_without_copy(validator):
+    homeworks = [
+        {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+        {'id': 2, 'homework_name': 'hw2', 'status': 'reviewing'},
+    ]
+    assert validator.validate({'homeworks': homeworks}) is homeworks
+
+
+@pytest.mark.parametrize('response, exception, text', [
+    ([], TypeError, 'list'),
+    ({'code': 'not_authenticated'}, ConnectionError, 'not_authenticated'),
+    ({'error': {'error': 'Wrong from_date'}}, ConnectionError, 'from_date'),
+    ({'current_date': 1}, KeyError, 'ключи'),
+    ({'homeworks': {}}, TypeError, 'dict'),
+    ({'homeworks': [{'status': 'approved'}, 'hw']}, KeyError, '0'),
+    ({'homeworks': [
+        {'homework_name': 'hw', 'status': 'approved'}, 'hw'
+    ]}, TypeError, 'str'),
+    ({'homeworks': [{'homework_name': 'hw'}]}, KeyError, 'status'),
+    ({'homeworks': [
+        {'homework_name': 'hw', 'status': 'approved'},
+        {'homework_name': 'hw', 'status': 'lost'},
+    ]}, ValueError, 'работы 1: lost'),
+])
+def test_invalid_responses(validator, response, exception, text):
+    with pytest.raises(exception, match=text):
+        validator.validate(response)
+
+
+def test_check_response_uses_validator():
+    with pytest.raises(ValueError):
+        homework.check_response(
+            {'homeworks': [{'homework_name': 'hw', 'status': 'lost'}]}
+        )
+
+
+def test_loads_falls_back_to_json(monkeypatch):
+    body = json.dumps({'homeworks': [], 'current_date': 1}).encode()
+    expected = {'homeworks': [], 'current_date': 1}
+    assert validation.loads(body) == expected
+    monkeypatch.setattr(validation, 'orjson', None)
+    assert validation.loads(body) == expected
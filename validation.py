@@ -0,0 +1,97 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+API_RESPONSE_ERROR_MESSAGE = (
+    'Ошибка в ответе API: ключ — {error_key}, значение — {error_value}.'
+)
+API_RESPONSE_TYPE_ERROR = 'Ответ API должен быть словарём, а не {actual_type}.'
+API_RESPONSE_KEY_ERROR = 'Отсутствуют ожидаемые ключи в ответе API.'
+API_HOMEWORKS_TYPE_ERROR = (
+    'Неверный формат данных в ответе API: '
+    'ожидается список, получен {actual_type}.'
+)
+HOMEWORK_TYPE_ERROR = (
+    'Работа {index} должна быть словарём, а не {actual_type}.'
+)
+HOMEWORK_KEY_ERROR = 'В работе {index} отсутствует ключ "{key}".'
+HOMEWORK_STATUS_ERROR = 'Неизвестный статус работы {index}: {status}'
+ERROR_KEYS = ('code', 'error')
+
+
+def loads(body):
+    """Разбор JSON: orjson, если он установлен, иначе json."""
+    if orjson is None:
+        return json.loads(body)
+    return orjson.loads(body)
+
+
+class ResponseValidator:
+    """Проверка ответа API за один проход.
+
+    Проверяет тип ответа, отсутствие ключей ошибки, список homeworks и
+    каждую работу в нём: тип, наличие homework_name и известный статус.
+    Возвращает список работ без копирования. Место и причина ошибки
+    ищутся отдельным проходом, только если быстрая проверка не прошла.
+    """
+
+    def __init__(self, statuses):
+        """Проверка с допустимыми статусами statuses."""
+        self.statuses = frozenset(statuses)
+
+    def validate(self, response):
+        """Список работ из ответа API или исключение с первой ошибкой."""
+        homeworks = self._homeworks(response)
+        statuses = self.statuses
+        try:
+            for homework in homeworks:
+                if (
+                    homework['status'] not in statuses
+                    or 'homework_name' not in homework
+                ):
+                    break
+            else:
+                return homeworks
+        except (KeyError, TypeError):
+            pass
+        self._raise_invalid(homeworks)
+
+    def _raise_invalid(self, homeworks):
+        for index, homework in enumerate(homeworks):
+            if not isinstance(homework, dict):
+                raise TypeError(HOMEWORK_TYPE_ERROR.format(
+                    index=index, actual_type=type(homework).__name__
+                ))
+            for key in ('homework_name', 'status'):
+                if key not in homework:
+                    raise KeyError(HOMEWORK_KEY_ERROR.format(
+                        index=index, key=key
+                    ))
+            if homework['status'] not in self.statuses:
+                raise ValueError(HOMEWORK_STATUS_ERROR.format(
+                    index=index, status=homework['status']
+                ))
+
+    @staticmethod
+    def _homeworks(response):
+        if not isinstance(response, dict):
+            raise TypeError(API_RESPONSE_TYPE_ERROR.format(
+                actual_type=type(response).__name__
+            ))
+        for error_key in ERROR_KEYS:
+            if error_key in response:
+                raise ConnectionError(API_RESPONSE_ERROR_MESSAGE.format(
+                    error_key=error_key, error_value=response[error_key]
+                ))
+        try:
+            homeworks = response['homeworks']
+        except KeyError:
+            raise KeyError(API_RESPONSE_KEY_ERROR) from None
+        if not isinstance(homeworks, list):
+            raise TypeError(API_HOMEWORKS_TYPE_ERROR.format(
+                actual_type=type(homeworks).__name__
+            ))
+        return homeworks